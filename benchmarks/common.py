@@ -0,0 +1,83 @@
+import json
+import math
+import os
+import sys
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+
+def setup_django() -> None:
+    """
+    Configure Django for a standalone benchmark script.
+    Environment variables (upstream base urls, database credentials)
+    must be set before calling this function, as settings read them
+    at import time.
+    """
+    os.environ.setdefault(
+        'DJANGO_SETTINGS_MODULE', 'challange_jobandtalent.settings'
+    )
+    import django
+
+    django.setup()
+
+
+@contextmanager
+def test_database(keep: bool = False) -> Iterator[str]:
+    """
+    Create a throwaway test database, the same way `manage.py test`
+    does, so benchmarks never touch real registry data.
+
+    :param keep: keep the database once the benchmark is over.
+    :return: the name of the test database.
+    """
+    from django.db import connection
+
+    old_name = connection.settings_dict['NAME']
+    test_name = connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, keepdb=keep
+    )
+    try:
+        yield test_name
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keep)
+
+
+def percentile(values: List[float], rank: float) -> float:
+    """
+    Nearest-rank percentile of a list of values.
+
+    :param values: unsorted samples.
+    :param rank: percentile between 0 and 100.
+    :return: the percentile or 0.0 if there are no samples.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, math.ceil(rank / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def summarise_latencies(latencies: List[float]) -> Dict[str, float]:
+    """
+    Summarise latencies given in seconds as milliseconds.
+    """
+    return {
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'max_ms': round(max(latencies, default=0.0) * 1000, 3),
+    }
+
+
+def write_report(report: Any, output: Optional[str] = None) -> None:
+    """
+    Write a machine-readable report to a file, or stdout when
+    no output path is given. Keys are sorted so two reports can
+    be diffed between runs.
+    """
+    content = json.dumps(report, indent=2, sort_keys=True, default=str)
+    if output:
+        with open(output, 'w') as report_file:
+            report_file.write(content + '\n')
+    else:
+        sys.stdout.write(content + '\n')
@@ -0,0 +1,175 @@
+"""
+Benchmark of the JSON codecs on payloads shaped like the ones the
+service parses and renders:
+    - `github_orgs`: users/{login}/orgs responses, parsed
+    - `github_graphql`: organizations of 50 users in a GraphQL response,
+      parsed
+    - `registry`: registry histories, rendered by the API with dates
+      and organizations
+
+For every payload size it reports the median time to decode and encode
+the payload with each installed codec, and with DRF's JSONRenderer and
+JSONParser as the baseline of the API.
+
+No database is needed.
+
+Usage:
+    python -m benchmarks.json_codec --output json_codec.json
+    python -m benchmarks.json_codec --sizes 10 1000 --repeat 50
+"""
+import argparse
+import io
+import statistics
+import time
+from datetime import timedelta
+from typing import Any, Callable, Dict, List
+
+from benchmarks.common import setup_django, write_report
+
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+GRAPHQL_USERS = 50
+
+
+def github_organizations(count: int) -> List[Dict[str, Any]]:
+    """
+    Organizations as listed by the GitHub REST API.
+    """
+    base = 'https://api.github.com/orgs'
+    return [
+        {
+            'login': f'organization-{index}',
+            'id': 1000000 + index,
+            'node_id': f'MDEyOk9yZ2FuaXphdGlvbj{index:08d}',
+            'url': f'{base}/organization-{index}',
+            'repos_url': f'{base}/organization-{index}/repos',
+            'events_url': f'{base}/organization-{index}/events',
+            'hooks_url': f'{base}/organization-{index}/hooks',
+            'issues_url': f'{base}/organization-{index}/issues',
+            'members_url': f'{base}/organization-{index}/members{{/member}}',
+            'public_members_url': (
+                f'{base}/organization-{index}/public_members{{/member}}'
+            ),
+            'avatar_url': (
+                f'https://avatars.githubusercontent.com/u/{index}?v=4'
+            ),
+            'description': f'Organization number {index}, with ünicode',
+        }
+        for index in range(count)
+    ]
+
+
+def github_graphql(organizations_per_user: int) -> Dict[str, Any]:
+    return {
+        'data': {
+            f'u{user}': {
+                'organizations': {
+                    'pageInfo': {'hasNextPage': False, 'endCursor': 'Y3Vy'},
+                    'nodes': [
+                        {'login': f'organization-{index}'}
+                        for index in range(organizations_per_user)
+                    ],
+                }
+            }
+            for user in range(GRAPHQL_USERS)
+        }
+    }
+
+
+def registry_history(rows: int) -> List[Dict[str, Any]]:
+    """
+    History of a pair of developers as returned by the registry
+    endpoint, every other check being connected.
+    """
+    from django.utils import timezone
+
+    start = timezone.now() - timedelta(minutes=rows)
+    history = []
+    for index in range(rows):
+        item = {
+            'registered_at': start + timedelta(minutes=index),
+            'connected': index % 2 == 1,
+        }
+        if item['connected']:
+            item['organizations'] = ['organization-1', 'organization-2']
+        history.append(item)
+    return history
+
+
+def median_ms(function: Callable[[], Any], repeat: int) -> float:
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return round(statistics.median(durations) * 1000, 4)
+
+
+def benchmark_payload(payload: Any, repeat: int) -> Dict[str, Any]:
+    """
+    Decode and encode times of `payload` with DRF, which the API used
+    before the codecs, and with each installed codec.
+    """
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from social_connected.json_codec import CODECS, orjson
+
+    document = JSONRenderer().render(payload)
+    result = {
+        'bytes': len(document),
+        'drf': {
+            'decode_ms': median_ms(
+                lambda: JSONParser().parse(io.BytesIO(document)), repeat
+            ),
+            'encode_ms': median_ms(
+                lambda: JSONRenderer().render(payload), repeat
+            ),
+        },
+    }
+    for name, codec_class in CODECS.items():
+        if name == 'orjson' and orjson is None:
+            continue
+        codec = codec_class()
+        result[name] = {
+            'decode_ms': median_ms(lambda: codec.loads(document), repeat),
+            'encode_ms': median_ms(lambda: codec.dumps(payload), repeat),
+        }
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument(
+        '--sizes', nargs='+', type=int, default=DEFAULT_SIZES,
+        help='organizations or registry rows per payload',
+    )
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--output', help='write the JSON report to a file')
+    args = parser.parse_args()
+
+    setup_django()
+    payloads = {
+        'github_orgs': github_organizations,
+        # organizations per user, of GRAPHQL_USERS users.
+        'github_graphql': lambda size: github_graphql(
+            max(size // GRAPHQL_USERS, 1)
+        ),
+        'registry': registry_history,
+    }
+    write_report(
+        {
+            'repeat': args.repeat,
+            'results': {
+                name: {
+                    str(size): benchmark_payload(build(size), args.repeat)
+                    for size in args.sizes
+                }
+                for name, build in payloads.items()
+            },
+        },
+        args.output,
+    )
+
+
+if __name__ == '__main__':
+    main()
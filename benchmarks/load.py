@@ -0,0 +1,189 @@
+"""
+End-to-end load benchmark of the `connected/realtime` and
+`connected/register` endpoints against the stub servers.
+
+The application is served in-process by a threaded WSGI server and
+backed by a throwaway test database, so the database settings
+(HOST, POSTGRES_*) must point to a server the test database can
+be created on. For every server mode it reports throughput,
+latency percentiles, response statuses and upstream call counts.
+
+Usage:
+    python -m benchmarks.load --requests 500 --concurrency 8
+    python -m benchmarks.load --modes fast long_tail --output load.json
+"""
+import argparse
+import os
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from socketserver import ThreadingMixIn
+from typing import Any, Dict, List, Tuple
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from benchmarks.common import (
+    setup_django,
+    summarise_latencies,
+    test_database,
+    write_report,
+)
+from benchmarks.stub_servers import (
+    SERVER_MODES,
+    GithubStubServer,
+    TwitterStubServer,
+)
+
+ENDPOINTS = {
+    'realtime': '/connected/realtime/{}/{}',
+    'register': '/connected/register/{}/{}',
+}
+
+
+class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, format: str, *args: Any) -> None:
+        """
+        Silence per-request logging.
+        """
+
+
+def developer_pairs(
+    count: int, developers: int, missing_ratio: float, seed: int = 0
+) -> List[Tuple[str, str]]:
+    """
+    Random pairs of developers drawn from a fixed population.
+    A `missing_ratio` share of the pairs contain an unknown developer.
+    """
+    rand = random.Random(seed)
+    pairs = []
+    for _ in range(count):
+        source, target = rand.sample(range(developers), 2)
+        target_name = f'dev{target}'
+        if rand.random() < missing_ratio:
+            target_name = f'missing{target}'
+        pairs.append((f'dev{source}', target_name))
+    return pairs
+
+
+def run_load(
+    base_url: str,
+    endpoint: str,
+    pairs: List[Tuple[str, str]],
+    concurrency: int,
+) -> Dict[str, Any]:
+    """
+    Fire one request per pair with `concurrency` clients.
+    """
+    import requests
+
+    local = threading.local()
+
+    def call(pair: Tuple[str, str]) -> Tuple[float, int]:
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        url = base_url + ENDPOINTS[endpoint].format(*pair)
+        start = time.perf_counter()
+        try:
+            status = local.session.get(url).status_code
+        except requests.RequestException:
+            status = 0
+        return time.perf_counter() - start, status
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(call, pairs))
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for latency, _ in results]
+    report = {
+        'requests': len(results),
+        'duration_s': round(elapsed, 3),
+        'requests_per_second': round(len(results) / elapsed, 2),
+        'statuses': dict(Counter(str(status) for _, status in results)),
+    }
+    report.update(summarise_latencies(latencies))
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument(
+        '--modes', nargs='+', default=list(SERVER_MODES),
+        choices=list(SERVER_MODES),
+    )
+    parser.add_argument(
+        '--endpoints', nargs='+', default=list(ENDPOINTS),
+        choices=list(ENDPOINTS),
+    )
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--developers', type=int, default=50)
+    parser.add_argument('--missing-ratio', type=float, default=0.1)
+    parser.add_argument('--output', help='write the JSON report to a file')
+    args = parser.parse_args()
+
+    github = GithubStubServer().start()
+    twitter = TwitterStubServer().start()
+    # settings read the upstream urls from the environment.
+    os.environ['GITHUB_API_BASE_URL'] = github.base_url
+    os.environ['TWITTER_API_BASE_URL'] = twitter.base_url
+    os.environ.setdefault('TWITTER_API_TOKEN', 'Bearer stub')
+    setup_django()
+
+    from django.core.wsgi import get_wsgi_application
+
+    report: Dict[str, Any] = {
+        'parameters': {
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'developers': args.developers,
+            'missing_ratio': args.missing_ratio,
+        },
+        'modes': {},
+    }
+    pairs = developer_pairs(
+        args.requests, args.developers, args.missing_ratio
+    )
+
+    with test_database():
+        server = make_server(
+            '127.0.0.1', 0, get_wsgi_application(),
+            server_class=_ThreadingWSGIServer, handler_class=_QuietHandler,
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        app_url = f'http://127.0.0.1:{server.server_address[1]}'
+        try:
+            for mode in args.modes:
+                mode_report = report['modes'][mode] = {}
+                for endpoint in args.endpoints:
+                    github.reset(SERVER_MODES[mode])
+                    twitter.reset(SERVER_MODES[mode])
+                    result = run_load(
+                        app_url, endpoint, pairs, args.concurrency
+                    )
+                    result['upstream_calls'] = {
+                        f'github:{name}': count
+                        for name, count in github.calls.items()
+                    }
+                    result['upstream_calls'].update(
+                        {
+                            f'twitter:{name}': count
+                            for name, count in twitter.calls.items()
+                        }
+                    )
+                    mode_report[endpoint] = result
+        finally:
+            server.shutdown()
+            github.stop()
+            twitter.stop()
+
+    write_report(report, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+"""
+Micro-benchmarks of the registry read path and of the registry write
+done by every realtime check, on synthetic histories.
+
+For every history size (rows per developer pair) and organization
+count, a throwaway test database is filled with synthetic
+`SocialRegistry`/`CommonOrganizations` rows and the benchmark
+measures query count, wall time and peak Python memory of:
+    - `Registry.retrieve_registries`
+    - the `connected/register/<source>/<target>` endpoint
+    - `SocialConnected._save_response`
+
+Usage:
+    python -m benchmarks.registry --output registry.json
+    python -m benchmarks.registry --sizes 10 1000 --org-counts 0 10
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+import uuid
+from datetime import timedelta
+from typing import Any, Callable, Dict, List
+
+from benchmarks.common import setup_django, test_database, write_report
+
+SOURCE, TARGET = 'bench-source', 'bench-target'
+BATCH_SIZE = 5000
+
+
+def populate(rows: int, organizations: int) -> None:
+    """
+    Create a history of `rows` checks for the benchmark pair, every
+    other check being connected. `organizations` connected checks get
+    an organization, linked to the first registry like the
+    application does.
+    """
+    from django.utils import timezone
+
+    from social_connected.models import CommonOrganizations, SocialRegistry
+
+    SocialRegistry.objects.all().delete()
+    start = timezone.now() - timedelta(minutes=rows)
+
+    first_registry = None
+    created_orgs = 0
+    for offset in range(0, rows, BATCH_SIZE):
+        registries = SocialRegistry.objects.bulk_create(
+            SocialRegistry(
+                source_developer=SOURCE,
+                target_developer=TARGET,
+                transaction_id=str(uuid.uuid4()),
+                connected=index % 2 == 1,
+                registered_at=start + timedelta(minutes=index),
+            )
+            for index in range(offset, min(offset + BATCH_SIZE, rows))
+        )
+        if first_registry is None:
+            # bulk_create only sets primary keys on postgres.
+            first_registry = SocialRegistry.objects.filter(
+                source_developer=SOURCE, target_developer=TARGET,
+            ).first()
+
+        orgs = []
+        for registry in registries:
+            if created_orgs == organizations:
+                break
+            if registry.connected:
+                orgs.append(
+                    CommonOrganizations(
+                        social_registry=first_registry,
+                        transaction_id=registry.transaction_id,
+                        organization=f'org-{created_orgs}',
+                    )
+                )
+                created_orgs += 1
+        CommonOrganizations.objects.bulk_create(orgs)
+
+
+def measure(
+    function: Callable[[], Any], repeat: int, setup: Callable[[], Any] = None
+) -> Dict[str, Any]:
+    """
+    Measure the query count, median wall time and peak memory of a call.
+    Memory is traced on a separate call, tracing slows the code down.
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    timings = []
+    queries = 0
+    for _ in range(repeat):
+        if setup:
+            setup()
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            function()
+            timings.append(time.perf_counter() - start)
+        queries = len(context.captured_queries)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'queries': queries,
+        'wall_time_ms': round(statistics.median(timings) * 1000, 3),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+def benchmark_size(
+    rows: int, organizations: int, repeat: int
+) -> Dict[str, Any]:
+    from django.db.models import Max
+    from rest_framework.test import APIClient
+
+    from social_connected.controller_logic.registry import Registry
+    from social_connected.controller_logic.social_connected import (
+        SocialConnected,
+    )
+    from social_connected.models import CommonOrganizations, SocialRegistry
+
+    populate(rows, organizations)
+    client = APIClient()
+    url = f'/connected/register/{SOURCE}/{TARGET}'
+    social_connected = SocialConnected(SOURCE, TARGET)
+    saved_orgs = [f'org-{index}' for index in range(max(organizations, 1))]
+
+    def endpoint() -> None:
+        response = client.get(url, format='json')
+        assert response.status_code == 200, response.status_code
+
+    def save_response() -> None:
+        social_connected._save_response(True, saved_orgs)
+
+    last_registry = SocialRegistry.objects.aggregate(last=Max('id'))['last']
+    last_org = CommonOrganizations.objects.aggregate(last=Max('id'))['last']
+
+    def remove_saved() -> None:
+        # keep the history at its nominal size between iterations.
+        SocialRegistry.objects.filter(id__gt=last_registry or 0).delete()
+        CommonOrganizations.objects.filter(id__gt=last_org or 0).delete()
+
+    return {
+        'rows': rows,
+        'organizations': organizations,
+        'retrieve_registries': measure(
+            lambda: Registry(SOURCE, TARGET).retrieve_registries(), repeat
+        ),
+        'registry_endpoint': measure(endpoint, repeat),
+        'save_response': measure(save_response, repeat, remove_saved),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument(
+        '--sizes', nargs='+', type=int, default=[10, 1000, 100000, 1000000],
+        help='rows per developer pair',
+    )
+    parser.add_argument(
+        '--org-counts', nargs='+', type=int, default=[0, 10, 1000],
+        help='organization rows per developer pair',
+    )
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='write the JSON report to a file')
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.conf import settings
+    from django.db import connection
+
+    results: List[Dict[str, Any]] = []
+    with test_database():
+        for rows in args.sizes:
+            for organizations in args.org_counts:
+                if organizations > rows // 2:
+                    continue
+                results.append(
+                    benchmark_size(rows, organizations, args.repeat)
+                )
+
+    write_report(
+        {
+            'database': connection.vendor,
+            'debug': settings.DEBUG,
+            'repeat': args.repeat,
+            'results': results,
+        },
+        args.output,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+"""
+Startup benchmark of the settings profiles, e.g. the full settings and
+the API only one, as gunicorn workers load them.
+
+Every measure runs in a fresh interpreter. For every profile it reports
+the time to import the WSGI app and its URLconf, the number of loaded
+modules and the resident memory, then forks workers like gunicorn does,
+with the app preloaded in the master or loaded by every worker, and
+reports the memory each worker shares with the others and the memory
+private to it (Linux only, from /proc/self/smaps_rollup).
+
+No database is queried, but the database backend of the profile must be
+importable.
+
+Usage:
+    python -m benchmarks.startup --output startup.json
+    python -m benchmarks.startup --workers 4 --profiles \\
+        challange_jobandtalent.settings challange_jobandtalent.settings_api
+"""
+import argparse
+import gc
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+from benchmarks.common import write_report
+
+PROFILES = [
+    'challange_jobandtalent.settings',
+    'challange_jobandtalent.settings_api',
+]
+
+
+def load_app() -> None:
+    """
+    Load the WSGI app and its URLconf, as a worker does before
+    serving its first request.
+    """
+    import wsgi  # noqa: F401
+    from django.urls import get_resolver
+
+    get_resolver().url_patterns
+
+
+def memory() -> Dict[str, int]:
+    """
+    Memory of the current process in kB. Shared and private memory
+    are only known on Linux.
+    """
+    try:
+        with open('/proc/self/smaps_rollup') as smaps:
+            fields = {
+                line.split(':')[0]: int(line.split()[1])
+                for line in smaps
+                if line.rstrip().endswith('kB')
+            }
+    except OSError:
+        import resource
+
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kB on Linux, bytes on macOS.
+        return {'rss_kb': usage // 1024 if sys.platform == 'darwin' else usage}
+    return {
+        'rss_kb': fields['Rss'],
+        'pss_kb': fields['Pss'],
+        'shared_kb': fields['Shared_Clean'] + fields['Shared_Dirty'],
+        'private_kb': fields['Private_Clean'] + fields['Private_Dirty'],
+    }
+
+
+def measure_import() -> Dict[str, Any]:
+    started_at = time.perf_counter()
+    load_app()
+    return {
+        'import_seconds': time.perf_counter() - started_at,
+        'modules': len(sys.modules),
+        **memory(),
+    }
+
+
+def measure_workers(workers: int, preload: bool) -> List[Dict[str, int]]:
+    """
+    Fork `workers` processes, after loading the app in this one when
+    `preload`, and return the memory of each once it has loaded the
+    app and run a garbage collection.
+    """
+    if preload:
+        load_app()
+        gc.freeze()
+
+    pipes = []
+    for _ in range(workers):
+        read, write = os.pipe()
+        if os.fork() == 0:
+            os.close(read)
+            if not preload:
+                load_app()
+            gc.collect()
+            os.write(write, json.dumps(memory()).encode())
+            os._exit(0)
+        os.close(write)
+        pipes.append(read)
+
+    measures = []
+    for read in pipes:
+        with os.fdopen(read) as pipe:
+            measures.append(json.loads(pipe.read()))
+    while True:
+        try:
+            os.wait()
+        except ChildProcessError:
+            break
+    return measures
+
+
+def run_child(settings: str, *arguments: str) -> Any:
+    """
+    Run a measure in a fresh interpreter with the `settings` profile.
+    """
+    completed = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.startup', '--child', *arguments],
+        env={**os.environ, 'DJANGO_SETTINGS_MODULE': settings},
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return json.loads(completed.stdout.splitlines()[-1])
+
+
+def mean(measures: List[Dict[str, int]], key: str) -> float:
+    return round(statistics.mean(measure[key] for measure in measures), 1)
+
+
+def benchmark_profile(
+    settings: str, repeat: int, workers: int
+) -> Dict[str, Any]:
+    imports = [run_child(settings, 'import') for _ in range(repeat)]
+    result = {
+        'settings': settings,
+        'import_seconds_median': round(
+            statistics.median(run['import_seconds'] for run in imports), 4
+        ),
+        'modules': imports[0]['modules'],
+        'rss_kb': imports[0]['rss_kb'],
+    }
+    if sys.platform.startswith('linux'):
+        for preload in (False, True):
+            measures = run_child(
+                settings, 'workers', str(workers), str(preload)
+            )
+            result['preloaded' if preload else 'not_preloaded'] = {
+                'worker_private_kb': mean(measures, 'private_kb'),
+                'worker_shared_kb': mean(measures, 'shared_kb'),
+                'worker_pss_kb': mean(measures, 'pss_kb'),
+            }
+    return result
+
+
+def main() -> None:
+    if sys.argv[1:2] == ['--child']:
+        if sys.argv[2] == 'import':
+            result = measure_import()
+        else:
+            result = measure_workers(int(sys.argv[3]), sys.argv[4] == 'True')
+        sys.stdout.write(json.dumps(result) + '\n')
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument(
+        '--profiles', nargs='+', default=PROFILES,
+        help='settings modules to compare',
+    )
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument(
+        '--workers', type=int, default=2, help='workers forked per profile'
+    )
+    parser.add_argument('--output', help='write the JSON report to a file')
+    args = parser.parse_args()
+
+    write_report(
+        {
+            'python': sys.version.split()[0],
+            'repeat': args.repeat,
+            'workers': args.workers,
+            'results': [
+                benchmark_profile(settings, args.repeat, args.workers)
+                for settings in args.profiles
+            ],
+        },
+        args.output,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,427 @@
+"""
+In-process stub servers mimicking the GitHub and Twitter endpoints
+used by the application. They allow measuring the application
+without hitting the real APIs nor their rate limits.
+
+Users exist unless their login starts with `missing`. Every existing
+user belongs to `StubConfig.organizations_per_user` organizations,
+the first one (`stub-org-0`) being shared by everybody, and every
+pair of existing users follow each other on Twitter.
+"""
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+from zlib import crc32
+
+
+class StubConfig:
+    """
+    Behaviour of a stub server.
+
+    :param latency_ms: base latency of every response.
+    :param jitter_ms: uniform random latency added to the base latency.
+    :param tail_ratio: ratio of responses taking `tail_latency_ms`.
+    :param tail_latency_ms: latency of the slow responses.
+    :param error_rate: ratio of responses failing with a 500.
+    :param rate_limit: number of calls allowed per window,
+     None means unlimited.
+    :param rate_limit_window: duration of a rate limit window in seconds.
+    :param organizations_per_user: organizations each GitHub user has.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        tail_ratio: float = 0.0,
+        tail_latency_ms: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit: Optional[int] = None,
+        rate_limit_window: float = 60.0,
+        organizations_per_user: int = 3,
+    ) -> None:
+        self.latency_ms: float = latency_ms
+        self.jitter_ms: float = jitter_ms
+        self.tail_ratio: float = tail_ratio
+        self.tail_latency_ms: float = tail_latency_ms
+        self.error_rate: float = error_rate
+        self.rate_limit: Optional[int] = rate_limit
+        self.rate_limit_window: float = rate_limit_window
+        self.organizations_per_user: int = organizations_per_user
+
+
+# Named server modes the load driver iterates over.
+SERVER_MODES: Dict[str, StubConfig] = {
+    'fast': StubConfig(latency_ms=5),
+    'slow': StubConfig(latency_ms=150, jitter_ms=50),
+    'long_tail': StubConfig(
+        latency_ms=20, jitter_ms=10, tail_ratio=0.05, tail_latency_ms=1000
+    ),
+    'flaky': StubConfig(latency_ms=20, jitter_ms=10, error_rate=0.1),
+    'rate_limited': StubConfig(latency_ms=20, rate_limit=100),
+}
+
+
+def user_exists(login: str) -> bool:
+    return not login.startswith('missing')
+
+
+def user_id(login: str) -> int:
+    """
+    Stable numeric id of a stub user.
+    """
+    return crc32(login.encode())
+
+
+def user_organizations(login: str, count: int) -> List[Dict[str, Any]]:
+    """
+    Organizations of a stub GitHub user, shaped like the
+    `users/{login}/orgs` response.
+    """
+    organizations = [{'login': 'stub-org-0', 'id': 0}]
+    organizations.extend(
+        {'login': f'stub-org-{login}-{index}', 'id': user_id(login) + index}
+        for index in range(1, count)
+    )
+    return organizations[:count]
+
+
+class _StubRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # headers and body are written separately, avoid delayed acks
+    # adding tens of milliseconds to keep-alive connections.
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:  # noqa: N802
+        self._respond()
+
+    def do_POST(self) -> None:  # noqa: N802
+        length = int(self.headers.get('Content-Length', 0))
+        self._respond(json.loads(self.rfile.read(length) or 'null'))
+
+    def _respond(self, request_body: Any = None) -> None:
+        parsed = urlparse(self.path)
+        stub: 'StubServer' = self.server.stub
+        status, headers, body = stub.handle(
+            parsed.path, parse_qs(parsed.query), request_body
+        )
+        content = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """
+        Silence per-request logging, it would dominate benchmark output.
+        """
+
+
+class StubServer:
+    """
+    Base stub server. Listens on a random localhost port and
+    serves requests from a daemon thread.
+    """
+
+    rate_limit_headers: Tuple[str, str, str] = ('', '', '')
+
+    def __init__(self, config: Optional[StubConfig] = None) -> None:
+        self.config: StubConfig = config or StubConfig()
+        self.calls: Counter = Counter()
+        self._lock = threading.Lock()
+        self._window_start: float = time.time()
+        self._window_calls: int = 0
+        self._random = random.Random(0)
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    @property
+    def base_url(self) -> str:
+        return f'http://127.0.0.1:{self.port}/'
+
+    def start(self) -> 'StubServer':
+        self._server = ThreadingHTTPServer(
+            ('127.0.0.1', 0), _StubRequestHandler
+        )
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={'poll_interval': 0.05},
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> 'StubServer':
+        return self.start()
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+    def reset(self, config: Optional[StubConfig] = None) -> None:
+        """
+        Reset call counters and rate limits, optionally switching
+        to another configuration.
+        """
+        with self._lock:
+            if config:
+                self.config = config
+            self.calls.clear()
+            self._window_start = time.time()
+            self._window_calls = 0
+
+    def handle(
+        self, path: str, query: Dict[str, List[str]], body: Any = None
+    ) -> Tuple[int, Dict[str, str], Any]:
+        """
+        Apply latency, errors and rate limits before
+        dispatching to the endpoint implementation.
+        """
+        endpoint = self.endpoint_name(path)
+        with self._lock:
+            self.calls[endpoint] += 1
+            delay, failed = self._draw()
+            remaining, reset = self._consume_rate_limit()
+
+        if delay:
+            time.sleep(delay)
+
+        headers = self._rate_limit_headers(remaining, reset)
+        if remaining is not None and remaining < 0:
+            return self.rate_limited_response(headers)
+        if failed:
+            return 500, headers, {'message': 'Stub server error'}
+
+        status, body = self.respond(path, query, body)
+        return status, headers, body
+
+    def _draw(self) -> Tuple[float, bool]:
+        config = self.config
+        delay = config.latency_ms + self._random.uniform(0, config.jitter_ms)
+        if config.tail_ratio and self._random.random() < config.tail_ratio:
+            delay = config.tail_latency_ms
+        failed = bool(
+            config.error_rate and self._random.random() < config.error_rate
+        )
+        return delay / 1000, failed
+
+    def _consume_rate_limit(self) -> Tuple[Optional[int], float]:
+        config = self.config
+        now = time.time()
+        if now - self._window_start >= config.rate_limit_window:
+            self._window_start = now
+            self._window_calls = 0
+        self._window_calls += 1
+        reset = self._window_start + config.rate_limit_window
+        if config.rate_limit is None:
+            return None, reset
+        return config.rate_limit - self._window_calls, reset
+
+    def _rate_limit_headers(
+        self, remaining: Optional[int], reset: float
+    ) -> Dict[str, str]:
+        if remaining is None:
+            return {}
+        limit_header, remaining_header, reset_header = self.rate_limit_headers
+        return {
+            limit_header: str(self.config.rate_limit),
+            remaining_header: str(max(remaining, 0)),
+            reset_header: str(int(reset)),
+        }
+
+    def endpoint_name(self, path: str) -> str:  # pragma: no cover
+        raise NotImplementedError
+
+    def respond(
+        self, path: str, query: Dict[str, List[str]], body: Any = None
+    ) -> Tuple[int, Any]:  # pragma: no cover
+        raise NotImplementedError
+
+    def rate_limited_response(
+        self, headers: Dict[str, str]
+    ) -> Tuple[int, Dict[str, str], Any]:  # pragma: no cover
+        raise NotImplementedError
+
+
+class GithubStubServer(StubServer):
+    """
+    Mimics `users/{login}/orgs` of the GitHub REST API, and the
+    organizations queries of the GraphQL API (`graphql`). GraphQL
+    queries are not parsed, users are read from their `login{N}`
+    variables and answered as `u{N}` aliases, as queried by
+    `GithubGraphQLOrganizations`.
+    """
+
+    rate_limit_headers = (
+        'X-RateLimit-Limit',
+        'X-RateLimit-Remaining',
+        'X-RateLimit-Reset',
+    )
+
+    def endpoint_name(self, path: str) -> str:
+        if path.startswith('/users/') and path.endswith('/orgs'):
+            return 'users/orgs'
+        if path == '/graphql':
+            return 'graphql'
+        return path
+
+    def respond(
+        self, path: str, query: Dict[str, List[str]], body: Any = None
+    ) -> Tuple[int, Any]:
+        if path == '/graphql':
+            return self._graphql(body or {})
+        parts = path.strip('/').split('/')
+        if len(parts) != 3 or parts[0] != 'users' or parts[2] != 'orgs':
+            return 404, {'message': 'Not Found'}
+
+        login = parts[1]
+        if not user_exists(login):
+            return 404, {'message': 'Not Found'}
+        return 200, user_organizations(
+            login, self.config.organizations_per_user
+        )
+
+    def _graphql(self, body: Dict[str, Any]) -> Tuple[int, Any]:
+        variables = body.get('variables') or {}
+        data, errors = {}, []
+        index = 0
+        while f'login{index}' in variables:
+            alias = f'u{index}'
+            login = variables[f'login{index}']
+            if user_exists(login):
+                data[alias] = self._graphql_organizations(
+                    login, variables.get(f'after{index}'), variables['first']
+                )
+            else:
+                data[alias] = None
+                errors.append(
+                    {
+                        'type': 'NOT_FOUND',
+                        'path': [alias],
+                        'message': 'Could not resolve to a User with '
+                        f"the login of '{login}'.",
+                    }
+                )
+            index += 1
+        if errors:
+            return 200, {'data': data, 'errors': errors}
+        return 200, {'data': data}
+
+    def _graphql_organizations(
+        self, login: str, cursor: Optional[str], first: int
+    ) -> Dict[str, Any]:
+        organizations = user_organizations(
+            login, self.config.organizations_per_user
+        )
+        # cursors are the offsets of the next pages.
+        start = int(cursor or 0)
+        end = start + first
+        return {
+            'organizations': {
+                'pageInfo': {
+                    'hasNextPage': end < len(organizations),
+                    'endCursor': str(end),
+                },
+                'nodes': [
+                    {'login': organization['login']}
+                    for organization in organizations[start:end]
+                ],
+            }
+        }
+
+    def rate_limited_response(
+        self, headers: Dict[str, str]
+    ) -> Tuple[int, Dict[str, str], Any]:
+        return 403, headers, {'message': 'API rate limit exceeded'}
+
+
+class TwitterStubServer(StubServer):
+    """
+    Mimics `users/lookup.json` and `friendships/show.json`
+    of the Twitter 1.1 API. The API version is part of `base_url`.
+    """
+
+    rate_limit_headers = (
+        'x-rate-limit-limit',
+        'x-rate-limit-remaining',
+        'x-rate-limit-reset',
+    )
+
+    @property
+    def base_url(self) -> str:
+        return f'http://127.0.0.1:{self.port}/1.1/'
+
+    def endpoint_name(self, path: str) -> str:
+        return path.replace('/1.1/', '', 1).replace('.json', '')
+
+    def respond(
+        self, path: str, query: Dict[str, List[str]], body: Any = None
+    ) -> Tuple[int, Any]:
+        endpoint = self.endpoint_name(path)
+        if endpoint == 'users/lookup':
+            return self._users_lookup(query)
+        if endpoint == 'friendships/show':
+            return self._friendships_show(query)
+        return 404, {'errors': [{'code': 34, 'message': 'Page not found'}]}
+
+    def _users_lookup(self, query: Dict[str, List[str]]) -> Tuple[int, Any]:
+        screen_names = ','.join(query.get('screen_name', [])).split(',')
+        users = [
+            {'id': user_id(name), 'screen_name': name}
+            for name in screen_names
+            if name and user_exists(name)
+        ]
+        if not users:
+            message = 'No user matches for specified terms.'
+            return 404, {'errors': [{'code': 17, 'message': message}]}
+        return 200, users
+
+    def _friendships_show(
+        self, query: Dict[str, List[str]]
+    ) -> Tuple[int, Any]:
+        source = query.get('source_screen_name', [''])[0]
+        target = query.get('target_screen_name', [''])[0]
+        if not (user_exists(source) and user_exists(target)):
+            message = 'User not found.'
+            return 404, {'errors': [{'code': 50, 'message': message}]}
+
+        def relationship(screen_name: str) -> Dict[str, Any]:
+            return {
+                'id': user_id(screen_name),
+                'screen_name': screen_name,
+                'following': True,
+                'followed_by': True,
+            }
+
+        return 200, {
+            'relationship': {
+                'source': relationship(source),
+                'target': relationship(target),
+            }
+        }
+
+    def rate_limited_response(
+        self, headers: Dict[str, str]
+    ) -> Tuple[int, Dict[str, str], Any]:
+        return 429, headers, {
+            'errors': [{'code': 88, 'message': 'Rate limit exceeded'}]
+        }
@@ -2,6 +2,7 @@
 ASGI config for challange_jobandtalent project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Besides the Django views, it serves the change stream of social_connected.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
@@ -13,4 +14,14 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'challange_jobandtalent.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# imported once Django is set up.
+from social_connected.streams import STREAM_PATH, change_stream  # noqa: E402
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http' and scope['path'] == STREAM_PATH:
+        await change_stream(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/3.2/ref/settings/
 from pathlib import Path
 from os.path import join
 from os import getenv
+from tempfile import gettempdir
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -27,8 +28,210 @@ SECRET_KEY = getenv('SECRET_KEY', 'test')
 
 TWITTER_API_TOKEN = getenv('TWITTER_API_TOKEN')
 TWITTER_API_BASE_URL = getenv('TWITTER_API_BASE_URL')
+# Read relationships with friendships/show only, users/lookup is only
+# called to tell which user is missing.
+TWITTER_FAST_MODE = getenv('TWITTER_FAST_MODE', 'false') == 'true'
 
 GITHUB_API_BASE_URL = getenv('GITHUB_API_BASE_URL')
+# Backend fetching the organizations of GitHub users: `rest` calls
+# users/{login}/orgs per user, `graphql` fetches many users in one query
+# of GITHUB_GRAPHQL_BATCH_SIZE users at most, and needs a token.
+GITHUB_ORGS_BACKEND = getenv('GITHUB_ORGS_BACKEND', 'rest')
+GITHUB_GRAPHQL_BATCH_SIZE = int(getenv('GITHUB_GRAPHQL_BATCH_SIZE', '50'))
+GITHUB_API_TOKEN = getenv('GITHUB_API_TOKEN')
+
+# Share of the requests timed by ServerTimingMiddleware, between 0 and 1.
+SERVER_TIMING_SAMPLE_RATE = float(getenv('SERVER_TIMING_SAMPLE_RATE', '0.1'))
+
+# Codec of the JSON of the upstream responses and of the API: orjson,
+# stdlib, or auto for orjson when installed and stdlib otherwise.
+JSON_CODEC = getenv('JSON_CODEC', 'auto')
+
+# Share of the requests and jobs traced, between 0 and 1. Spans of
+# traced operations are written as JSON lines to the TRACING_OUTPUT
+# file, or to stdout when `-`.
+TRACING_SAMPLE_RATE = float(getenv('TRACING_SAMPLE_RATE', '0'))
+TRACING_OUTPUT = getenv('TRACING_OUTPUT', '-')
+
+# Profiles of SocialConnectedView and RegistryView requests, taken for
+# callers sending the PROFILING_TOKEN in a X-Profile-Token header and
+# for a PROFILING_SAMPLE_RATE share of the requests, are written to
+# PROFILING_DIR. Stacks are sampled every PROFILING_INTERVAL seconds,
+# less often when sampling takes over PROFILING_MAX_OVERHEAD of the
+# request time, for PROFILING_MAX_DURATION seconds at most. Each worker
+# takes at most PROFILING_MAX_PER_MINUTE profiles, one at a time.
+PROFILING_TOKEN = getenv('PROFILING_TOKEN')
+PROFILING_SAMPLE_RATE = float(getenv('PROFILING_SAMPLE_RATE', '0'))
+PROFILING_DIR = getenv(
+    'PROFILING_DIR', join(gettempdir(), 'social_connected_profiles')
+)
+PROFILING_INTERVAL = float(getenv('PROFILING_INTERVAL', '0.005'))
+PROFILING_MAX_OVERHEAD = float(getenv('PROFILING_MAX_OVERHEAD', '0.05'))
+PROFILING_MAX_DURATION = float(getenv('PROFILING_MAX_DURATION', '30'))
+PROFILING_MAX_PER_MINUTE = int(getenv('PROFILING_MAX_PER_MINUTE', '6'))
+
+# Directory shared by the gunicorn workers to aggregate their metrics.
+# Metrics are per process when unset.
+METRICS_MULTIPROC_DIR = getenv('METRICS_MULTIPROC_DIR')
+# Seconds between two writes of a worker's metrics to the directory.
+METRICS_FLUSH_INTERVAL = float(getenv('METRICS_FLUSH_INTERVAL', '1.0'))
+
+# Default evaluation of realtime checks: `full` runs every provider and
+# reports all their errors, `lazy` checks the cheapest or most selective
+# provider first and skips the other one when the first says the
+# developers are not connected. Clients may pick one with ?evaluation=.
+SOCIAL_CONNECTED_EVALUATION = getenv('SOCIAL_CONNECTED_EVALUATION', 'full')
+
+# Timeout in seconds of upstream calls made without a request deadline.
+UPSTREAM_TIMEOUT = float(getenv('UPSTREAM_TIMEOUT', '10'))
+# Default deadline in seconds of a realtime check, clients may set their
+# own with the X-Request-Deadline-Ms header, between REQUEST_DEADLINE_MIN
+# and REQUEST_DEADLINE_MAX. The minimum leaves upstream calls enough time
+# to connect, so short client deadlines cannot trip the circuit breakers.
+REQUEST_DEADLINE = float(getenv('REQUEST_DEADLINE', '10'))
+REQUEST_DEADLINE_MIN = float(getenv('REQUEST_DEADLINE_MIN', '1'))
+REQUEST_DEADLINE_MAX = float(getenv('REQUEST_DEADLINE_MAX', '30'))
+
+# Hedging of upstream GETs: a second identical call is sent when the first
+# has not answered within the UPSTREAM_HEDGING_PERCENTILE of the latest
+# UPSTREAM_HEDGING_WINDOW latencies. Comma separated providers, e.g.
+# `github,twitter`, hedging is disabled when empty.
+UPSTREAM_HEDGING_PROVIDERS = [
+    provider
+    for provider in getenv('UPSTREAM_HEDGING_PROVIDERS', '').split(',')
+    if provider
+]
+UPSTREAM_HEDGING_PERCENTILE = float(getenv('UPSTREAM_HEDGING_PERCENTILE', '95'))
+UPSTREAM_HEDGING_WINDOW = int(getenv('UPSTREAM_HEDGING_WINDOW', '200'))
+# Delay in seconds used until UPSTREAM_HEDGING_MIN_SAMPLES are observed.
+UPSTREAM_HEDGING_MIN_SAMPLES = int(getenv('UPSTREAM_HEDGING_MIN_SAMPLES', '20'))
+UPSTREAM_HEDGING_DEFAULT_DELAY = float(
+    getenv('UPSTREAM_HEDGING_DEFAULT_DELAY', '0.5')
+)
+# Maximum share of the calls that may be hedged.
+UPSTREAM_HEDGING_MAX_RATE = float(getenv('UPSTREAM_HEDGING_MAX_RATE', '0.1'))
+UPSTREAM_HEDGING_MAX_WORKERS = int(getenv('UPSTREAM_HEDGING_MAX_WORKERS', '16'))
+
+# Circuit breaker per provider: it opens when, among the latest
+# CIRCUIT_BREAKER_WINDOW calls, the share of failed (5xx or no response)
+# or slow calls crosses its threshold, and probes the provider again
+# after CIRCUIT_BREAKER_OPEN_SECONDS.
+CIRCUIT_BREAKER_ENABLED = getenv('CIRCUIT_BREAKER_ENABLED', 'true') == 'true'
+CIRCUIT_BREAKER_WINDOW = int(getenv('CIRCUIT_BREAKER_WINDOW', '20'))
+CIRCUIT_BREAKER_MIN_CALLS = int(getenv('CIRCUIT_BREAKER_MIN_CALLS', '10'))
+CIRCUIT_BREAKER_FAILURE_RATE = float(getenv('CIRCUIT_BREAKER_FAILURE_RATE', '0.5'))
+CIRCUIT_BREAKER_SLOW_CALL_SECONDS = float(
+    getenv('CIRCUIT_BREAKER_SLOW_CALL_SECONDS', '5')
+)
+CIRCUIT_BREAKER_SLOW_CALL_RATE = float(
+    getenv('CIRCUIT_BREAKER_SLOW_CALL_RATE', '0.5')
+)
+CIRCUIT_BREAKER_OPEN_SECONDS = float(getenv('CIRCUIT_BREAKER_OPEN_SECONDS', '30'))
+CIRCUIT_BREAKER_HALF_OPEN_PROBES = int(
+    getenv('CIRCUIT_BREAKER_HALF_OPEN_PROBES', '1')
+)
+# What realtime checks return while a provider is unavailable:
+# `last_known` serves the latest registry of the developers, marked as
+# degraded, `fail_fast` returns a 503.
+CIRCUIT_BREAKER_FALLBACK = getenv('CIRCUIT_BREAKER_FALLBACK', 'last_known')
+
+# Whether developer logins exist in each provider is remembered for
+# IDENTITY_CACHE_POSITIVE_TTL seconds when they do and
+# IDENTITY_CACHE_NEGATIVE_TTL seconds when they do not, so that invalid
+# logins are answered without upstream calls.
+IDENTITY_CACHE_ENABLED = getenv('IDENTITY_CACHE_ENABLED', 'true') == 'true'
+IDENTITY_CACHE_POSITIVE_TTL = int(
+    getenv('IDENTITY_CACHE_POSITIVE_TTL', str(24 * 60 * 60))
+)
+IDENTITY_CACHE_NEGATIVE_TTL = int(getenv('IDENTITY_CACHE_NEGATIVE_TTL', '600'))
+
+# With RESULT_CACHE_ENABLED, successful realtime checks are cached for
+# RESULT_CACHE_TTL seconds, per unordered pair of developers, and may be
+# that old. The `results` cache must then be shared by the workers, e.g.
+# RESULT_CACHE_BACKEND=social_connected.cache_backends.SQLiteCache, so
+# that invalidations reach all of them. RESULT_CACHE_AUDIT is what a cache hit writes to the
+# registry: `full` the same rows as a check, `light` its registry and
+# organizations without reading the previous ones, `off` nothing.
+RESULT_CACHE_ENABLED = getenv('RESULT_CACHE_ENABLED', 'false') == 'true'
+RESULT_CACHE_TTL = int(getenv('RESULT_CACHE_TTL', '60'))
+RESULT_CACHE_AUDIT = getenv('RESULT_CACHE_AUDIT', 'light')
+
+# Successful provider responses, the GitHub organizations of a user and
+# the Twitter relationship of a pair, are cached for PROVIDER_CACHE_TTL
+# seconds in a SQLite file at PROVIDER_CACHE_PATH, shared by the workers
+# of a host and kept across restarts and deploys. At most
+# PROVIDER_CACHE_MAX_ENTRIES are kept. The directory of the file must be
+# private to the user of the workers, the default one is in their home.
+PROVIDER_CACHE_ENABLED = getenv('PROVIDER_CACHE_ENABLED', 'false') == 'true'
+PROVIDER_CACHE_TTL = int(getenv('PROVIDER_CACHE_TTL', '3600'))
+PROVIDER_CACHE_PATH = getenv(
+    'PROVIDER_CACHE_PATH',
+    join(
+        getenv('XDG_CACHE_HOME', join(Path.home(), '.cache')),
+        'social_connected',
+        'providers.db',
+    ),
+)
+PROVIDER_CACHE_MAX_ENTRIES = int(
+    getenv('PROVIDER_CACHE_MAX_ENTRIES', '100000')
+)
+
+# Asynchronous checks run by `manage.py run_connectivity_jobs`: number
+# of checks run concurrently by a worker, seconds between two polls of
+# an empty queue, and seconds after which a running job is considered
+# abandoned by its worker and claimed again, up to JOBS_MAX_ATTEMPTS
+# runs before it fails. A request submits at most JOBS_MAX_SUBMIT checks.
+JOBS_WORKERS = int(getenv('JOBS_WORKERS', '8'))
+JOBS_POLL_INTERVAL = float(getenv('JOBS_POLL_INTERVAL', '1.0'))
+JOBS_RUNNING_TIMEOUT = int(getenv('JOBS_RUNNING_TIMEOUT', '300'))
+JOBS_MAX_ATTEMPTS = int(getenv('JOBS_MAX_ATTEMPTS', '3'))
+JOBS_MAX_SUBMIT = int(getenv('JOBS_MAX_SUBMIT', '100'))
+
+# Admission control of realtime checks: each worker runs at most
+# ADMISSION_MAX_IN_FLIGHT of them at once, up to ADMISSION_MAX_QUEUE more
+# wait for ADMISSION_MAX_WAIT seconds, other requests get a 503 with a
+# Retry-After of ADMISSION_RETRY_AFTER seconds.
+ADMISSION_CONTROL_ENABLED = (
+    getenv('ADMISSION_CONTROL_ENABLED', 'true') == 'true'
+)
+ADMISSION_MAX_IN_FLIGHT = int(getenv('ADMISSION_MAX_IN_FLIGHT', '8'))
+ADMISSION_MAX_QUEUE = int(getenv('ADMISSION_MAX_QUEUE', '16'))
+ADMISSION_MAX_WAIT = float(getenv('ADMISSION_MAX_WAIT', '0.5'))
+ADMISSION_RETRY_AFTER = float(getenv('ADMISSION_RETRY_AFTER', '1'))
+
+# Maximum number of developer pairs of a bulk registry request.
+REGISTRY_BULK_MAX_PAIRS = int(getenv('REGISTRY_BULK_MAX_PAIRS', '100'))
+
+# How realtime checks are stored: `per_check` saves a registry per check,
+# `interval` a registry per period with the same outcome and organizations,
+# extended by every check until the outcome changes. `manage.py
+# compact_registry` compacts the existing history.
+REGISTRY_STORAGE_MODE = getenv('REGISTRY_STORAGE_MODE', 'per_check')
+
+# Checks recording another status than the previous one of the pair are
+# streamed as Server-Sent Events by the ASGI app (connected/stream). A
+# process streams to at most STREAM_MAX_SUBSCRIPTIONS clients, queues at
+# most STREAM_QUEUE_SIZE changes for a client and sends them a keepalive
+# every STREAM_HEARTBEAT seconds. Clients subscribe to at most
+# STREAM_MAX_PAIRS pairs of developers. Changes reach the ASGI app through
+# Postgres LISTEN/NOTIFY, the stream stays off on other databases as it
+# locks the latest registry of a pair on every check.
+CHANGE_STREAM_ENABLED = getenv('CHANGE_STREAM_ENABLED', 'false') == 'true'
+STREAM_MAX_SUBSCRIPTIONS = int(getenv('STREAM_MAX_SUBSCRIPTIONS', '1000'))
+STREAM_QUEUE_SIZE = int(getenv('STREAM_QUEUE_SIZE', '100'))
+STREAM_HEARTBEAT = float(getenv('STREAM_HEARTBEAT', '15'))
+STREAM_MAX_PAIRS = int(getenv('STREAM_MAX_PAIRS', '100'))
+
+# Registries are partitioned by month on Postgres. The maintenance
+# command creates the partitions of the next months, and expires the
+# registries older than the retention in months (0 keeps them forever)
+# once rolled up into daily aggregates. Expired partitions are dropped,
+# or detached and kept as archive tables with `detach`.
+REGISTRY_PARTITION_MONTHS_AHEAD = int(
+    getenv('REGISTRY_PARTITION_MONTHS_AHEAD', '3')
+)
+REGISTRY_RETENTION_MONTHS = int(getenv('REGISTRY_RETENTION_MONTHS', '0'))
+REGISTRY_ARCHIVE_MODE = getenv('REGISTRY_ARCHIVE_MODE', 'drop')
 
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = False
@@ -49,6 +252,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'social_connected.middleware.MetricsMiddleware',
+    'social_connected.middleware.ServerTimingMiddleware',
+    'social_connected.middleware.TracingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -60,9 +266,14 @@ MIDDLEWARE = [
 
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': (
-        'rest_framework.renderers.JSONRenderer',
+        'social_connected.renderers.CodecJSONRenderer',
         'rest_framework.renderers.BrowsableAPIRenderer',
     ),
+    'DEFAULT_PARSER_CLASSES': (
+        'social_connected.renderers.CodecJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
 }
@@ -101,6 +312,57 @@ DATABASES = {
     }
 }
 
+# Comma separated hosts of read replicas of the default database. Read
+# only paths (registry history, stats and bulk reads) are routed to them,
+# except for clients that ran a realtime check in the last sticky seconds.
+# Tests mirror them to the default database.
+DATABASE_REPLICA_HOSTS = [
+    host for host in getenv('DATABASE_REPLICA_HOSTS', '').split(',') if host
+]
+DATABASE_REPLICA_STICKY_SECONDS = int(
+    getenv('DATABASE_REPLICA_STICKY_SECONDS', '5')
+)
+for index, host in enumerate(DATABASE_REPLICA_HOSTS):
+    DATABASES[f'replica{index}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_REPLICAS = [
+    alias for alias in DATABASES if alias.startswith('replica')
+]
+DATABASE_ROUTERS = ['social_connected.db_router.ReplicaRouter']
+
+# Caches, per process by default. Set IDENTITY_CACHE_BACKEND and
+# IDENTITY_CACHE_LOCATION, or RESULT_CACHE_BACKEND and
+# RESULT_CACHE_LOCATION, to share a cache across workers,
+# e.g. with memcached, or across the workers of a host and restarts
+# with social_connected.cache_backends.SQLiteCache and a file path.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'identity': {
+        'BACKEND': getenv(
+            'IDENTITY_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': getenv('IDENTITY_CACHE_LOCATION', 'identity'),
+    },
+    'results': {
+        'BACKEND': getenv(
+            'RESULT_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': getenv('RESULT_CACHE_LOCATION', 'results'),
+    },
+    'providers': {
+        'BACKEND': 'social_connected.cache_backends.SQLiteCache',
+        'LOCATION': PROVIDER_CACHE_PATH,
+        'OPTIONS': {'MAX_ENTRIES': PROVIDER_CACHE_MAX_ENTRIES},
+    },
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -119,6 +381,20 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'social_connected': {
+            'handlers': ['console'],
+            'level': getenv('SOCIAL_CONNECTED_LOG_LEVEL', 'INFO'),
+        },
+    },
+}
+
 # Internationalization
 # https://docs.djangoproject.com/en/3.2/topics/i18n/
 
@@ -0,0 +1,36 @@
+"""
+API only settings profile of challange_jobandtalent.
+
+The service only serves JSON endpoints, this profile leaves out the admin,
+sessions, messages, static files and the browsable API, which every worker
+would otherwise import and keep in memory. Use it with
+DJANGO_SETTINGS_MODULE=challange_jobandtalent.settings_api, migrations of
+the left out apps must be run with the full settings.
+"""
+
+from challange_jobandtalent.settings import *  # noqa: F401,F403
+
+INSTALLED_APPS = [
+    'social_connected',
+]
+
+MIDDLEWARE = [
+    'social_connected.middleware.MetricsMiddleware',
+    'social_connected.middleware.ServerTimingMiddleware',
+    'social_connected.middleware.TracingMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
+# the endpoints are not authenticated, requests have no user.
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': (
+        'social_connected.renderers.CodecJSONRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': ('social_connected.renderers.CodecJSONParser',),
+    'DEFAULT_AUTHENTICATION_CLASSES': [],
+    'DEFAULT_PERMISSION_CLASSES': [],
+    'UNAUTHENTICATED_USER': None,
+}
+
+TEMPLATES = []
@@ -0,0 +1,16 @@
+"""
+Test settings profile of challange_jobandtalent.
+
+The full settings with a database alias, `replica0`, mirroring the
+default database, so that tests routing reads to it, with
+DATABASE_REPLICAS=['replica0'], run real queries on a second connection.
+`statistics.sh` runs the tests with
+--settings=challange_jobandtalent.settings_test.
+"""
+
+from challange_jobandtalent.settings import *  # noqa: F401,F403
+from challange_jobandtalent.settings import DATABASES
+
+DATABASES.setdefault(
+    'replica0', {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+)
@@ -13,21 +13,49 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.contrib import admin
+from django.apps import apps
 from django.urls import path
 
-from social_connected.views import SocialConnectedView, RegistryView
+from social_connected.views import (
+    SocialConnectedView,
+    RegistryView,
+    BulkRegistryView,
+    ConnectivityJobsView,
+    ConnectivityJobView,
+    metrics_view,
+)
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
     path(
         'connected/realtime/<str:source_dev>/<str:target_dev>',
         SocialConnectedView.as_view(),
         name='real-time-connected',
     ),
+    path(
+        'connected/register/bulk',
+        BulkRegistryView.as_view(),
+        name='bulk-registry',
+    ),
     path(
         'connected/register/<str:source_dev>/<str:target_dev>',
         RegistryView.as_view(),
         name='registry',
     ),
+    path(
+        'connected/jobs',
+        ConnectivityJobsView.as_view(),
+        name='connectivity-jobs',
+    ),
+    path(
+        'connected/jobs/<int:job_id>',
+        ConnectivityJobView.as_view(),
+        name='connectivity-job',
+    ),
+    path('metrics', metrics_view, name='metrics'),
 ]
+
+# the API only settings profile leaves the admin out.
+if apps.is_installed('django.contrib.admin'):
+    from django.contrib import admin
+
+    urlpatterns.append(path('admin/', admin.site.urls))
@@ -0,0 +1,47 @@
+"""
+Gunicorn settings of run.sh.
+
+The app is loaded and warmed up once in the master, forked workers share
+its memory copy on write instead of each importing it on their own.
+"""
+import gc
+import os
+from os import getenv
+
+from django.conf import settings
+
+os.environ.setdefault(
+    'DJANGO_SETTINGS_MODULE', 'challange_jobandtalent.settings'
+)
+
+bind = '0.0.0.0:80'
+workers = int(getenv('GUNICORN_WORKERS', '2'))
+# threaded workers run several realtime checks at once, bounded by
+# ADMISSION_MAX_IN_FLIGHT. There is one thread more than admission control
+# runs and queues, so that requests beyond its limits are shed with a 503
+# instead of waiting in the accept backlog.
+threads = int(
+    getenv(
+        'GUNICORN_THREADS',
+        settings.ADMISSION_MAX_IN_FLIGHT + settings.ADMISSION_MAX_QUEUE + 1,
+    )
+)
+preload_app = getenv('GUNICORN_PRELOAD', 'true') == 'true'
+
+
+def when_ready(server):
+    """
+    Import the views before workers are forked, Django only loads the
+    URLconf on the first request of every worker otherwise.
+    """
+    if not preload_app:
+        return
+    from django.db import connections
+    from django.urls import get_resolver
+
+    get_resolver().url_patterns
+    # workers must not share the connections of the master.
+    connections.close_all()
+    # objects of the master are left out of garbage collections, which
+    # would otherwise write to their pages and unshare them in workers.
+    gc.freeze()
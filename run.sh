@@ -1,5 +1,12 @@
 #!/usr/bin/env bash
 sleep 5
 python3 manage.py migrate
-python3 manage.py collectstatic --noinput
-gunicorn wsgi -b 0.0.0.0:80 -w 2
+# the API only settings profile has no static files.
+if [ "$DJANGO_SETTINGS_MODULE" != "challange_jobandtalent.settings_api" ]; then
+  python3 manage.py collectstatic --noinput
+fi
+# workers aggregate their metrics through this directory.
+export METRICS_MULTIPROC_DIR=${METRICS_MULTIPROC_DIR:-/tmp/challange_metrics}
+rm -rf "$METRICS_MULTIPROC_DIR" && mkdir -p "$METRICS_MULTIPROC_DIR"
+# bind address, workers, threads and preloading are in gunicorn.conf.py.
+gunicorn wsgi -c gunicorn.conf.py
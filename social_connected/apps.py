@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class SocialConnectedConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'social_connected'
+
+    def ready(self) -> None:
+        from social_connected.controller_logic.result_cache import (
+            RESULT_CACHE,
+        )
+
+        RESULT_CACHE.check_backend()
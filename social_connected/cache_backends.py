@@ -0,0 +1,314 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from itertools import count
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+logger = logging.getLogger(__name__)
+
+# Entries written by a process between two cullings.
+CULL_EVERY = 100
+# Keys read per query by get_many, below the SQLite variable limit.
+GET_MANY_CHUNK = 500
+
+
+class ConnectionPool:
+    """
+    Connections of a process to a SQLite database, shared by its
+    threads, e.g. the short lived ones of the executors of the checks.
+    At most `size` idle connections are kept. Connections are not shared
+    with processes forked after opening them, e.g. gunicorn workers of a
+    preloaded app.
+    """
+
+    def __init__(
+        self, open_connection: Callable[[], sqlite3.Connection], size: int
+    ) -> None:
+        self._open = open_connection
+        self._size: int = size
+        self._lock = threading.Lock()
+        self._idle: List[sqlite3.Connection] = []
+        self._pid: int = os.getpid()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            if self._pid != os.getpid():
+                # the parent process still uses them.
+                self._idle, self._pid = [], os.getpid()
+            connection = self._idle.pop() if self._idle else None
+        if connection is None:
+            connection = self._open()
+        try:
+            yield connection
+        except BaseException:
+            connection.close()
+            raise
+
+        with self._lock:
+            kept = len(self._idle) < self._size and self._pid == os.getpid()
+            if kept:
+                self._idle.append(connection)
+        if not kept:
+            connection.close()
+
+
+class SQLiteCache(BaseCache):
+    """
+    Cache stored in the SQLite database file LOCATION, shared by the
+    processes of a host and kept across restarts. Values are stored as
+    JSON, they must be JSON serializable. The directory of the file must
+    be private, owned by the user of the processes and writable by them
+    only, so that other users cannot plant entries. Nothing is loaded
+    upfront: connections are opened on first use, pooled per process,
+    and entries are read one query at a time. The database is in WAL
+    mode, readers do not block the writer. Expired entries are removed
+    when the cache is culled, every CULL_EVERY writes of a process.
+
+    A cache must not fail the checks using it: when SQLite fails, e.g.
+    the database stays locked by other writers for longer than
+    BUSY_TIMEOUT, or the directory is not private, the error is logged
+    and reads miss, writes are skipped.
+
+    OPTIONS are those of every Django cache, plus BUSY_TIMEOUT, the
+    seconds a write waits for another one to finish (1 by default), and
+    POOL_SIZE, the idle connections kept by a process (4 by default).
+    """
+
+    def __init__(self, location: str, params: Dict[str, Any]) -> None:
+        super().__init__(params)
+        self._path: str = location
+        options = params.get('OPTIONS') or {}
+        self._busy_timeout: float = float(options.get('BUSY_TIMEOUT', 1))
+        self._pool = ConnectionPool(
+            self._open, int(options.get('POOL_SIZE', 4))
+        )
+        self._writes = count(1)
+
+    def _open(self) -> sqlite3.Connection:
+        """
+        :raises PermissionError: if the directory of the file is not
+         private.
+        """
+        directory = os.path.dirname(os.path.abspath(self._path))
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        status = os.stat(directory)
+        if status.st_uid != os.getuid() or status.st_mode & 0o022:
+            raise PermissionError(
+                f'{directory} must be owned by the user of the process '
+                'and writable by them only'
+            )
+        connection = sqlite3.connect(
+            self._path,
+            timeout=self._busy_timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        connection.execute('PRAGMA journal_mode=WAL')
+        # a crash may lose the last writes, not corrupt the file.
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS cache_entries ('
+            'key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL)'
+        )
+        return connection
+
+    def _execute(
+        self, sql: str, params: Iterable[Any] = ()
+    ) -> Optional[Tuple[List[Tuple], int]]:
+        """
+        Run a statement on a pooled connection.
+
+        :return: the rows and the row count of the statement, or None if
+         it failed.
+        """
+        try:
+            with self._pool.connection() as connection:
+                cursor = connection.execute(sql, list(params))
+                return cursor.fetchall(), cursor.rowcount
+        except (sqlite3.Error, OSError):
+            logger.warning(
+                'Query of the cache %s failed', self._path, exc_info=True
+            )
+            return None
+
+    def _key(self, key: str, version: Optional[int]) -> str:
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    @staticmethod
+    def _dumps(value: Any) -> str:
+        return json.dumps(value, separators=(',', ':'))
+
+    def _loads(self, value: Any) -> Any:
+        """
+        :raises ValueError: if the value is not JSON, e.g. pickled by
+         previous versions of the cache.
+        """
+        if not isinstance(value, str):
+            raise ValueError(f'{type(value).__name__} entry in {self._path}')
+        return json.loads(value)
+
+    def add(
+        self,
+        key: str,
+        value: Any,
+        timeout: Any = DEFAULT_TIMEOUT,
+        version: Optional[int] = None,
+    ) -> bool:
+        result = self._execute(
+            'INSERT INTO cache_entries VALUES (?, ?, ?) '
+            'ON CONFLICT (key) DO UPDATE SET '
+            'value = excluded.value, expires = excluded.expires '
+            'WHERE cache_entries.expires <= ?',
+            [
+                self._key(key, version),
+                self._dumps(value),
+                self.get_backend_timeout(timeout),
+                time.time(),
+            ],
+        )
+        if result is None:
+            return False
+        self._wrote()
+        return result[1] == 1
+
+    def get(
+        self, key: str, default: Any = None, version: Optional[int] = None
+    ) -> Any:
+        result = self._execute(
+            'SELECT value FROM cache_entries WHERE key = ? '
+            'AND (expires IS NULL OR expires > ?)',
+            [self._key(key, version), time.time()],
+        )
+        if not result or not result[0]:
+            return default
+        try:
+            return self._loads(result[0][0][0])
+        except ValueError:
+            logger.warning('Invalid entry %s in the cache %s', key, self._path)
+            return default
+
+    def get_many(
+        self, keys: Iterable[str], version: Optional[int] = None
+    ) -> Dict[str, Any]:
+        keys = {self._key(key, version): key for key in keys}
+        found = {}
+        cache_keys = list(keys)
+        for start in range(0, len(cache_keys), GET_MANY_CHUNK):
+            chunk = cache_keys[start:start + GET_MANY_CHUNK]
+            result = self._execute(
+                'SELECT key, value FROM cache_entries '
+                f'WHERE key IN ({", ".join("?" * len(chunk))}) '
+                'AND (expires IS NULL OR expires > ?)',
+                [*chunk, time.time()],
+            )
+            if result is None:
+                continue
+            for cache_key, value in result[0]:
+                try:
+                    found[keys[cache_key]] = self._loads(value)
+                except ValueError:
+                    logger.warning(
+                        'Invalid entry %s in the cache %s',
+                        keys[cache_key],
+                        self._path,
+                    )
+        return found
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        timeout: Any = DEFAULT_TIMEOUT,
+        version: Optional[int] = None,
+    ) -> None:
+        result = self._execute(
+            'INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?)',
+            [
+                self._key(key, version),
+                self._dumps(value),
+                self.get_backend_timeout(timeout),
+            ],
+        )
+        if result is not None:
+            self._wrote()
+
+    def touch(
+        self,
+        key: str,
+        timeout: Any = DEFAULT_TIMEOUT,
+        version: Optional[int] = None,
+    ) -> bool:
+        result = self._execute(
+            'UPDATE cache_entries SET expires = ? WHERE key = ? '
+            'AND (expires IS NULL OR expires > ?)',
+            [
+                self.get_backend_timeout(timeout),
+                self._key(key, version),
+                time.time(),
+            ],
+        )
+        return result is not None and result[1] == 1
+
+    def delete(self, key: str, version: Optional[int] = None) -> bool:
+        result = self._execute(
+            'DELETE FROM cache_entries WHERE key = ?',
+            [self._key(key, version)],
+        )
+        return result is not None and result[1] == 1
+
+    def has_key(self, key: str, version: Optional[int] = None) -> bool:
+        result = self._execute(
+            'SELECT 1 FROM cache_entries WHERE key = ? '
+            'AND (expires IS NULL OR expires > ?)',
+            [self._key(key, version), time.time()],
+        )
+        return bool(result and result[0])
+
+    def clear(self) -> None:
+        self._execute('DELETE FROM cache_entries')
+
+    def cull(self) -> None:
+        """
+        Remove the expired entries, and 1/CULL_FREQUENCY of the entries
+        closest to expiring when there are more than MAX_ENTRIES.
+        """
+        self._execute(
+            'DELETE FROM cache_entries WHERE expires <= ?', [time.time()]
+        )
+        result = self._execute('SELECT COUNT(*) FROM cache_entries')
+        if result is None:
+            return
+        entries = result[0][0][0]
+        if entries <= self._max_entries:
+            return
+        if self._cull_frequency == 0:
+            self.clear()
+            return
+        self._execute(
+            'DELETE FROM cache_entries WHERE key IN ('
+            'SELECT key FROM cache_entries '
+            'ORDER BY expires IS NULL, expires LIMIT ?)',
+            [entries // self._cull_frequency],
+        )
+
+    def _wrote(self) -> None:
+        if next(self._writes) % CULL_EVERY == 0:
+            self.cull()
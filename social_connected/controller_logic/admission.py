@@ -0,0 +1,119 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from django.conf import settings
+
+from social_connected.metrics import Counter, Gauge
+
+ADMISSION_LIMIT = Gauge(
+    'admission_limit',
+    'Maximum in-flight requests per endpoint, summed over the workers.',
+    ['endpoint'],
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    'admission_in_flight',
+    'In-flight requests per endpoint.',
+    ['endpoint'],
+)
+ADMISSION_QUEUED = Gauge(
+    'admission_queued',
+    'Requests waiting to be admitted per endpoint.',
+    ['endpoint'],
+)
+ADMISSION_SHED = Counter(
+    'admission_shed_total',
+    'Requests shed per endpoint and reason (queue_full or timeout).',
+    ['endpoint', 'reason'],
+)
+
+
+class Overloaded(Exception):
+    """
+    Raised when a request is shed by admission control.
+    """
+
+    def __init__(self, endpoint: str, reason: str) -> None:
+        super().__init__(f'{endpoint} is overloaded, retry later')
+        self.endpoint: str = endpoint
+        self.reason: str = reason
+
+    @property
+    def retry_after(self) -> int:
+        """
+        Seconds clients should wait before retrying.
+        """
+        return max(1, math.ceil(settings.ADMISSION_RETRY_AFTER))
+
+
+class AdmissionController:
+    """
+    Bound the number of requests of an endpoint running at once in a
+    worker. Requests over ADMISSION_MAX_IN_FLIGHT wait in a queue of
+    at most ADMISSION_MAX_QUEUE requests, for up to ADMISSION_MAX_WAIT
+    seconds, and are shed once the queue is full or their wait is over.
+    """
+
+    def __init__(self, endpoint: str) -> None:
+        self.endpoint: str = endpoint
+        self.in_flight: int = 0
+        self.queued: int = 0
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def admit(self) -> Iterator[None]:
+        """
+        Run the block once admitted.
+
+        :raises Overloaded: if the request is shed.
+        """
+        if not settings.ADMISSION_CONTROL_ENABLED:
+            yield
+            return
+
+        limit = settings.ADMISSION_MAX_IN_FLIGHT
+        ADMISSION_LIMIT.set(limit, endpoint=self.endpoint)
+        with self._condition:
+            if self.in_flight >= limit:
+                self._wait(limit)
+            self.in_flight += 1
+            ADMISSION_IN_FLIGHT.set(self.in_flight, endpoint=self.endpoint)
+
+        try:
+            yield
+        finally:
+            with self._condition:
+                self.in_flight -= 1
+                ADMISSION_IN_FLIGHT.set(
+                    self.in_flight, endpoint=self.endpoint
+                )
+                self._condition.notify()
+
+    def _wait(self, limit: int) -> None:
+        """
+        Wait for a slot, with the condition held.
+        """
+        if self.queued >= settings.ADMISSION_MAX_QUEUE:
+            self._shed('queue_full')
+
+        self.queued += 1
+        ADMISSION_QUEUED.set(self.queued, endpoint=self.endpoint)
+        expires_at = time.monotonic() + settings.ADMISSION_MAX_WAIT
+        try:
+            while self.in_flight >= limit:
+                remaining = expires_at - time.monotonic()
+                if remaining <= 0:
+                    self._shed('timeout')
+                self._condition.wait(remaining)
+        finally:
+            self.queued -= 1
+            ADMISSION_QUEUED.set(self.queued, endpoint=self.endpoint)
+
+    def _shed(self, reason: str) -> None:
+        ADMISSION_SHED.inc(endpoint=self.endpoint, reason=reason)
+        raise Overloaded(self.endpoint, reason)
+
+
+REALTIME_ADMISSION = AdmissionController('realtime')
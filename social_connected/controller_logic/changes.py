@@ -0,0 +1,213 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, connections, transaction
+
+from social_connected.metrics import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+# Postgres channel status changes are notified on.
+CHANNEL = 'social_connected_changes'
+# NOTIFY payloads are limited to 8000 bytes.
+MAX_PAYLOAD = 7900
+
+STATUS_CHANGES = Counter(
+    'status_changes_total',
+    'Status changes of developer pairs published, per new status.',
+    ['connected'],
+)
+STREAM_SUBSCRIPTIONS = Gauge(
+    'stream_subscriptions',
+    'Open change stream subscriptions.',
+    [],
+)
+
+Pair = Tuple[str, str]
+
+
+def stream_enabled() -> bool:
+    """
+    Whether status changes are published: with CHANGE_STREAM_ENABLED on
+    Postgres only, other databases have no channel between processes.
+    """
+    return (
+        settings.CHANGE_STREAM_ENABLED
+        and connections['default'].vendor == 'postgresql'
+    )
+
+
+def publish_change(
+    source_developer: str,
+    target_developer: str,
+    connected: bool,
+    organizations: List[str],
+    previous_connected: Optional[bool],
+    registered_at: Any,
+) -> None:
+    """
+    Publish a status change of two developers once the current
+    transaction commits. On Postgres, the change is notified to the
+    listeners of every process, otherwise only to this one.
+    """
+    event = {
+        'source_dev': source_developer,
+        'target_dev': target_developer,
+        'connected': connected,
+        'previous_connected': previous_connected,
+        'organizations': sorted(organizations),
+        'registered_at': registered_at,
+    }
+    STATUS_CHANGES.inc(connected=str(connected).lower())
+    if connection.vendor != 'postgresql':
+        transaction.on_commit(lambda: CHANGE_BROKER.publish(event))
+        return
+
+    payload = json.dumps(event, cls=DjangoJSONEncoder)
+    if len(payload.encode()) > MAX_PAYLOAD:
+        # clients read the organizations from the registry.
+        event['organizations'] = None
+        payload = json.dumps(event, cls=DjangoJSONEncoder)
+    # notifications are only delivered on commit.
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_notify(%s, %s)', [CHANNEL, payload])
+
+
+class Subscription:
+    """
+    Status changes of some pairs of developers, queued for a client
+    of the event loop `loop`.
+    """
+
+    def __init__(
+        self, pairs: Iterable[Pair], loop: asyncio.AbstractEventLoop
+    ) -> None:
+        self.pairs: Set[Pair] = set(pairs)
+        self.loop: asyncio.AbstractEventLoop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(settings.STREAM_QUEUE_SIZE)
+        # set when the client does not keep up with its changes, its
+        # stream is then closed for it to reconnect.
+        self.lagging: bool = False
+
+    def push(self, event: Dict[str, Any]) -> None:
+        """
+        Queue a change, from the event loop of the subscription.
+        """
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.lagging = True
+
+
+class TooManySubscriptions(Exception):
+    """
+    Raised when a process already has STREAM_MAX_SUBSCRIPTIONS.
+    """
+
+
+class ChangeBroker:
+    """
+    Fan status changes out to the subscriptions of their pair of
+    developers. Changes may be published from any thread, they are
+    queued in the event loop of each subscription. On Postgres, a
+    thread listens to the changes notified by every process.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._subscriptions: Dict[Pair, Set[Subscription]] = {}
+        self._count: int = 0
+        self._listener: Optional[threading.Thread] = None
+
+    def subscribe(
+        self, pairs: Iterable[Pair], loop: asyncio.AbstractEventLoop
+    ) -> Subscription:
+        """
+        :raises TooManySubscriptions: if the process has too many.
+        """
+        subscription = Subscription(pairs, loop)
+        with self._lock:
+            if self._count >= settings.STREAM_MAX_SUBSCRIPTIONS:
+                raise TooManySubscriptions(
+                    'Too many change streams, retry later'
+                )
+            self._count += 1
+            for pair in subscription.pairs:
+                self._subscriptions.setdefault(pair, set()).add(subscription)
+            STREAM_SUBSCRIPTIONS.set(self._count)
+        self._ensure_listener()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._count -= 1
+            for pair in subscription.pairs:
+                subscriptions = self._subscriptions.get(pair, set())
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    self._subscriptions.pop(pair, None)
+            STREAM_SUBSCRIPTIONS.set(self._count)
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        pair = event['source_dev'], event['target_dev']
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(pair, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(
+                    subscription.push, event
+                )
+            except RuntimeError:
+                # the loop of the subscription is closed.
+                self.unsubscribe(subscription)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._subscriptions.clear()
+            self._count = 0
+            STREAM_SUBSCRIPTIONS.set(0)
+
+    def _ensure_listener(self) -> None:
+        if connections['default'].vendor != 'postgresql':
+            return
+        with self._lock:
+            if self._listener is not None and self._listener.is_alive():
+                return
+            self._listener = threading.Thread(
+                target=self._listen, name='change-listener', daemon=True
+            )
+            self._listener.start()
+
+    def _listen(self) -> None:
+        """
+        Publish the changes notified on CHANNEL, reconnecting
+        to the database on errors.
+        """
+        database = connections['default']
+        while True:
+            try:
+                listener = database.get_new_connection(
+                    database.get_connection_params()
+                )
+                listener.autocommit = True
+                with listener.cursor() as cursor:
+                    cursor.execute(f'LISTEN {CHANNEL}')
+                while True:
+                    select.select([listener], [], [], 5)
+                    listener.poll()
+                    while listener.notifies:
+                        notify = listener.notifies.pop(0)
+                        self.publish(json.loads(notify.payload))
+            except Exception:
+                logger.exception('Listening to status changes failed')
+                time.sleep(1)
+
+
+CHANGE_BROKER = ChangeBroker()
@@ -0,0 +1,148 @@
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Tuple
+
+from django.conf import settings
+
+from social_connected.metrics import Counter, Gauge
+
+CIRCUIT_BREAKER_STATE = Gauge(
+    'circuit_breaker_state',
+    'State of the circuit breaker per provider '
+    '(0 closed, 1 half open, 2 open).',
+    ['provider'],
+    multiprocess_mode='max',
+)
+CIRCUIT_BREAKER_REJECTED = Counter(
+    'circuit_breaker_rejected_total',
+    'Upstream calls rejected by an open circuit breaker per provider.',
+    ['provider'],
+)
+
+
+class UpstreamUnavailable(Exception):
+    """
+    Raised when an upstream API cannot be reached, either because
+    its circuit breaker is open or because the call failed.
+    """
+
+    def __init__(self, provider: str, reason: str) -> None:
+        super().__init__(f'{provider} is unavailable: {reason}')
+        self.provider: str = provider
+        self.reason: str = reason
+
+
+class CircuitBreaker:
+    """
+    Stop calling a provider once the share of failed or slow calls
+    among the latest ones crosses a threshold. After a cool down,
+    a few probe calls are let through (half open): the breaker
+    closes if they succeed, and opens again otherwise.
+    """
+
+    CLOSED, HALF_OPEN, OPEN = 0, 1, 2
+
+    def __init__(self, provider: str) -> None:
+        self.provider: str = provider
+        self.state: int = self.CLOSED
+        # (failed, slow) outcome of the latest calls.
+        self.outcomes: Deque[Tuple[bool, bool]] = deque(
+            maxlen=settings.CIRCUIT_BREAKER_WINDOW
+        )
+        self.opened_at: float = 0.0
+        self.probes: int = 0
+        self.probe_successes: int = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """
+        :return: whether a call to the provider may be done.
+        """
+        with self._lock:
+            if self.state == self.OPEN:
+                elapsed = time.monotonic() - self.opened_at
+                if elapsed < settings.CIRCUIT_BREAKER_OPEN_SECONDS:
+                    CIRCUIT_BREAKER_REJECTED.inc(provider=self.provider)
+                    return False
+                self._set_state(self.HALF_OPEN)
+                self.probes = self.probe_successes = 0
+
+            if self.state == self.HALF_OPEN:
+                if self.probes >= settings.CIRCUIT_BREAKER_HALF_OPEN_PROBES:
+                    CIRCUIT_BREAKER_REJECTED.inc(provider=self.provider)
+                    return False
+                self.probes += 1
+            return True
+
+    def record(self, failed: bool, latency: float) -> None:
+        """
+        Record the outcome of a call allowed by `allow`.
+        """
+        slow = latency >= settings.CIRCUIT_BREAKER_SLOW_CALL_SECONDS
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                if failed or slow:
+                    self._open()
+                else:
+                    self.probe_successes += 1
+                    probes = settings.CIRCUIT_BREAKER_HALF_OPEN_PROBES
+                    if self.probe_successes >= probes:
+                        self.outcomes.clear()
+                        self._set_state(self.CLOSED)
+                return
+
+            self.outcomes.append((failed, slow))
+            if self.state == self.CLOSED and self._should_trip():
+                self._open()
+
+    def release(self) -> None:
+        """
+        Forget a call allowed by `allow` whose outcome says nothing
+        about the provider, giving its probe back when half open.
+        """
+        with self._lock:
+            if self.state == self.HALF_OPEN and self.probes > 0:
+                self.probes -= 1
+
+    def _should_trip(self) -> bool:
+        calls = len(self.outcomes)
+        if calls < settings.CIRCUIT_BREAKER_MIN_CALLS:
+            return False
+        failures = sum(failed for failed, _ in self.outcomes)
+        slow_calls = sum(slow for _, slow in self.outcomes)
+        return (
+            failures / calls >= settings.CIRCUIT_BREAKER_FAILURE_RATE
+            or slow_calls / calls >= settings.CIRCUIT_BREAKER_SLOW_CALL_RATE
+        )
+
+    def _open(self) -> None:
+        self.opened_at = time.monotonic()
+        self._set_state(self.OPEN)
+
+    def _set_state(self, state: int) -> None:
+        self.state = state
+        CIRCUIT_BREAKER_STATE.set(state, provider=self.provider)
+
+
+class CircuitBreakers:
+    """
+    One circuit breaker per provider, shared by the threads of a process.
+    """
+
+    def __init__(self) -> None:
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, provider: str) -> CircuitBreaker:
+        with self._lock:
+            if provider not in self._breakers:
+                self._breakers[provider] = CircuitBreaker(provider)
+            return self._breakers[provider]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._breakers.clear()
+
+
+BREAKERS = CircuitBreakers()
@@ -0,0 +1,109 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+import requests
+
+from django.conf import settings
+
+from social_connected.controller_logic.circuit_breaker import (
+    UpstreamUnavailable,
+)
+
+# Header through which clients may set the deadline of their request.
+DEADLINE_HEADER = 'X-Request-Deadline-Ms'
+
+# Phases of a realtime check, in execution order, with their
+# share of the time left when they start.
+PHASE_WEIGHTS: Dict[str, float] = {
+    'github': 0.4,
+    'twitter_lookup': 0.2,
+    'twitter_friendship': 0.25,
+    'db': 0.15,
+}
+
+
+class DeadlineExceeded(Exception):
+    def __init__(self, phase: str) -> None:
+        super().__init__(f'Deadline exceeded during {phase}')
+        self.phase: str = phase
+
+
+class Deadline:
+    """
+    Time budget of a request, split across its phases. Each phase
+    gets its weight's share of the time left, relative to the phases
+    still to run, so time saved by a fast phase goes to later ones.
+    """
+
+    def __init__(self, seconds: float) -> None:
+        self.seconds: float = seconds
+        self.expires_at: float = time.monotonic() + seconds
+        self.exceeded: List[str] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_request(cls, request) -> 'Deadline':
+        """
+        Deadline set by the client header, bounded by REQUEST_DEADLINE_MIN
+        and REQUEST_DEADLINE_MAX, or REQUEST_DEADLINE by default.
+        """
+        seconds = settings.REQUEST_DEADLINE
+        header = request.headers.get(DEADLINE_HEADER)
+        if header:
+            try:
+                seconds = max(
+                    settings.REQUEST_DEADLINE_MIN, float(header) / 1000
+                )
+            except ValueError:
+                pass
+        return cls(min(seconds, settings.REQUEST_DEADLINE_MAX))
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def exceed(self, phase: str) -> None:
+        with self._lock:
+            if phase not in self.exceeded:
+                self.exceeded.append(phase)
+
+    def timeout(self, phase: str) -> float:
+        """
+        Time budget of a phase starting now.
+
+        :raises DeadlineExceeded: if there is no time left.
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            self.exceed(phase)
+            raise DeadlineExceeded(phase)
+
+        phases = list(PHASE_WEIGHTS)
+        weights = [PHASE_WEIGHTS[name] for name in phases]
+        later_weights = sum(weights[phases.index(phase):])
+        return remaining * PHASE_WEIGHTS[phase] / later_weights
+
+
+@contextmanager
+def phase_timeout(deadline: Optional[Deadline], phase: str) -> Iterator[float]:
+    """
+    Yield the timeout of an upstream call made during `phase` and
+    turn a timed out call into DeadlineExceeded. Without a deadline
+    the timeout is UPSTREAM_TIMEOUT.
+    """
+    if deadline is None:
+        yield settings.UPSTREAM_TIMEOUT
+        return
+
+    timeout = deadline.timeout(phase)
+    try:
+        yield timeout
+    except UpstreamUnavailable as exception:
+        if isinstance(exception.__cause__, requests.Timeout):
+            deadline.exceed(phase)
+            raise DeadlineExceeded(phase) from exception
+        raise
@@ -1,5 +1,5 @@
 from urllib.parse import urljoin
-from typing import Dict, List, Union, Tuple
+from typing import Dict, List, Optional, Union, Tuple
 import concurrent.futures
 import threading
 
@@ -12,6 +12,17 @@ from rest_framework.status import (
 
 from django.conf import settings
 
+from social_connected.controller_logic import upstream
+from social_connected.controller_logic.deadline import Deadline, phase_timeout
+from social_connected.controller_logic.github_graphql import (
+    GithubGraphQLOrganizations,
+    OrganizationsResult,
+)
+from social_connected.controller_logic.identity_cache import IDENTITY_CACHE
+from social_connected.controller_logic.provider_cache import PROVIDER_CACHE
+from social_connected.json_codec import response_json
+from social_connected.tracing import propagate, span
+
 
 class GithubConnected:
     """
@@ -20,9 +31,21 @@ class GithubConnected:
     if they have at least one organization in common.
     """
 
-    def __init__(self, source_dev: str = '', target_dev: str = ''):
+    def __init__(
+        self,
+        source_dev: str = '',
+        target_dev: str = '',
+        deadline: Optional[Deadline] = None,
+        organizations: Optional[Dict[str, OrganizationsResult]] = None,
+    ):
         self.source_dev: str = source_dev
         self.target_dev: str = target_dev
+        self.deadline: Optional[Deadline] = deadline
+        # organizations fetched beforehand for many developers at once,
+        # by login, e.g. for a batch of jobs.
+        self.organizations: Dict[str, OrganizationsResult] = (
+            organizations or {}
+        )
 
     def connected(
         self,
@@ -33,16 +56,9 @@ class GithubConnected:
 
         :return: a dict if users are connected or a dict with a list of errors.
         """
-        # Non-blocking requests to github urls of the two developers.
-        # Returns a result of type generator.
-        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-            results = executor.map(
-                self._fetch_developer_organizations,
-                (self.target_dev, self.source_dev),
-            )
-
-        first_response, first_status = next(results)
-        second_response, second_status = next(results)
+        first_result, second_result = self._fetch_organizations()
+        first_response, first_status = first_result
+        second_response, second_status = second_result
 
         def check_repeated_error(thread_response):
             """
@@ -96,6 +112,33 @@ class GithubConnected:
 
         return response, status
 
+    def _fetch_organizations(
+        self
+    ) -> Tuple[OrganizationsResult, OrganizationsResult]:
+        """
+        Organizations of the target and source developers, fetched
+        beforehand, in one GraphQL query or with one REST call per
+        developer as set by GITHUB_ORGS_BACKEND.
+        """
+        logins = self.target_dev, self.source_dev
+        if all(login in self.organizations for login in logins):
+            return self.organizations[logins[0]], self.organizations[logins[1]]
+
+        if settings.GITHUB_ORGS_BACKEND == 'graphql':
+            results = GithubGraphQLOrganizations(self.deadline).fetch(
+                list(logins)
+            )
+            return results[logins[0]], results[logins[1]]
+
+        # Non-blocking requests to github urls of the two developers.
+        # Returns a result of type generator.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            # the fetches are spans of the current trace.
+            results = executor.map(
+                propagate(self._fetch_developer_organizations), logins
+            )
+        return next(results), next(results)
+
     def _get_session(self) -> requests.Session:
         """
         Create a request session for each thread. It's not clear
@@ -120,22 +163,57 @@ class GithubConnected:
         :return: a list of developer's organizations or a dict with
          an error if request is not successful.
         """
+        with span(
+            'github.organizations', provider='github', developer=developer_name
+        ) as fetch_span:
+            response, status = self._fetch_organizations_of(developer_name)
+            fetch_span.set_attribute('status', status)
+        return response, status
+
+    def _fetch_organizations_of(
+        self, developer_name: str
+    ) -> Union[Tuple[List[Dict[str, str]], int], Tuple[Dict[str, str], int]]:
+        identity = IDENTITY_CACHE.get('github', developer_name)
+        if identity is not None and not identity.exists:
+            return self._not_found_error(developer_name)
+        organizations = PROVIDER_CACHE.get_organizations(developer_name)
+        if organizations is not None:
+            return organizations, HTTP_200_OK
+
         headers = {'Accept': 'application/vnd.github.v3+json'}
         url: str = self._github_org_endpoint(developer_name)
 
         session = self._get_session()
-        response = session.get(url, headers=headers)
+        with phase_timeout(self.deadline, 'github') as timeout:
+            response = upstream.get(
+                'github',
+                'users/orgs',
+                session.get,
+                url,
+                headers=headers,
+                timeout=timeout,
+            )
 
         if response.status_code == HTTP_404_NOT_FOUND:
-            return (
-                {'error': f'{developer_name} is not a valid user in github',},
-                HTTP_404_NOT_FOUND,
-            )
+            IDENTITY_CACHE.remember('github', developer_name, exists=False)
+            return self._not_found_error(developer_name)
 
         if response.status_code == HTTP_403_FORBIDDEN:
-            return {'error': response.json()}, HTTP_403_FORBIDDEN
+            return {'error': response_json(response)}, HTTP_403_FORBIDDEN
 
-        return response.json(), HTTP_200_OK
+        organizations = response_json(response)
+        if response.status_code == HTTP_200_OK:
+            # users/{login}/orgs does not give the id of the user.
+            IDENTITY_CACHE.remember('github', developer_name, exists=True)
+            PROVIDER_CACHE.set_organizations(developer_name, organizations)
+        return organizations, HTTP_200_OK
+
+    @staticmethod
+    def _not_found_error(developer_name: str) -> Tuple[Dict[str, str], int]:
+        return (
+            {'error': f'{developer_name} is not a valid user in github',},
+            HTTP_404_NOT_FOUND,
+        )
 
     @staticmethod
     def _github_org_endpoint(developer_login: str) -> str:
@@ -0,0 +1,169 @@
+from typing import Dict, List, Optional, Tuple, Union
+from urllib.parse import urljoin
+
+import requests
+from rest_framework.status import (
+    HTTP_200_OK,
+    HTTP_403_FORBIDDEN,
+    HTTP_404_NOT_FOUND,
+)
+
+from django.conf import settings
+
+from social_connected.controller_logic import upstream
+from social_connected.controller_logic.deadline import Deadline, phase_timeout
+from social_connected.controller_logic.identity_cache import IDENTITY_CACHE
+from social_connected.controller_logic.provider_cache import PROVIDER_CACHE
+from social_connected.json_codec import response_json
+from social_connected.tracing import span
+
+# Organizations of a user, shaped like `users/{login}/orgs`, or an error.
+OrganizationsResult = Tuple[Union[List[Dict[str, str]], Dict[str, str]], int]
+
+# Organizations read per user and query, the maximum GitHub allows.
+PAGE_SIZE = 100
+
+USER_QUERY = (
+    'u{index}: user(login: $login{index}) {{ '
+    'organizations(first: $first, after: $after{index}) {{ '
+    'pageInfo {{ hasNextPage endCursor }} nodes {{ login }} }} }}'
+)
+
+
+def organizations_query(count: int) -> str:
+    """
+    GraphQL query of the organizations of `count` users, aliased
+    `u0`, `u1`... with their login and page cursor as variables
+    `login0`, `after0`...
+    """
+    variables = ', '.join(
+        f'$login{index}: String!, $after{index}: String'
+        for index in range(count)
+    )
+    users = ' '.join(USER_QUERY.format(index=index) for index in range(count))
+    return f'query($first: Int!, {variables}) {{ {users} }}'
+
+
+class GithubGraphQLOrganizations:
+    """
+    Fetch the organizations of many GitHub users with the GraphQL API,
+    GITHUB_GRAPHQL_BATCH_SIZE users per query instead of one REST call
+    per user. Users with more organizations than a page are queried
+    again with their cursor, alone with the other unfinished users.
+    """
+
+    def __init__(self, deadline: Optional[Deadline] = None) -> None:
+        self.deadline: Optional[Deadline] = deadline
+
+    def fetch(self, logins: List[str]) -> Dict[str, OrganizationsResult]:
+        """
+        :return: the organizations, or the error, of each login.
+        """
+        results = {}
+        pending = []
+        for login in dict.fromkeys(logins):
+            identity = IDENTITY_CACHE.get('github', login)
+            if identity is not None and not identity.exists:
+                results[login] = self._not_found_error(login)
+            else:
+                pending.append(login)
+        cached = PROVIDER_CACHE.get_many_organizations(pending)
+        results.update(
+            (login, (organizations, HTTP_200_OK))
+            for login, organizations in cached.items()
+        )
+        pending = [login for login in pending if login not in cached]
+
+        size = settings.GITHUB_GRAPHQL_BATCH_SIZE
+        for start in range(0, len(pending), size):
+            results.update(self._fetch_batch(pending[start:start + size]))
+        return results
+
+    def _fetch_batch(
+        self, logins: List[str]
+    ) -> Dict[str, OrganizationsResult]:
+        results = {}
+        organizations: Dict[str, List[Dict[str, str]]] = {
+            login: [] for login in logins
+        }
+        cursors: Dict[str, Optional[str]] = dict.fromkeys(logins)
+        while cursors:
+            response = self._query(cursors)
+            if response.status_code != HTTP_200_OK:
+                # GitHub answers 403 once the rate limit is exhausted.
+                error = {'error': response_json(response)}
+                results.update(
+                    (login, (error, response.status_code)) for login in cursors
+                )
+                break
+
+            body = response_json(response)
+            data = body.get('data') or {}
+            missing = {
+                error['path'][0]
+                for error in body.get('errors', [])
+                if error.get('type') == 'NOT_FOUND' and error.get('path')
+            }
+            next_cursors = {}
+            for index, login in enumerate(cursors):
+                user = data.get(f'u{index}')
+                if user is None:
+                    if f'u{index}' in missing:
+                        IDENTITY_CACHE.remember('github', login, exists=False)
+                        results[login] = self._not_found_error(login)
+                    else:
+                        # e.g. a RATE_LIMITED error, which has no data.
+                        results[login] = (
+                            {'error': body.get('errors')},
+                            HTTP_403_FORBIDDEN,
+                        )
+                    continue
+
+                page = user['organizations']
+                organizations[login].extend(
+                    {'login': node['login']} for node in page['nodes']
+                )
+                if page['pageInfo']['hasNextPage']:
+                    next_cursors[login] = page['pageInfo']['endCursor']
+                else:
+                    IDENTITY_CACHE.remember('github', login, exists=True)
+                    PROVIDER_CACHE.set_organizations(
+                        login, organizations[login]
+                    )
+                    results[login] = organizations[login], HTTP_200_OK
+            cursors = next_cursors
+        return results
+
+    def _query(self, cursors: Dict[str, Optional[str]]) -> requests.Response:
+        variables = {'first': PAGE_SIZE}
+        for index, (login, cursor) in enumerate(cursors.items()):
+            variables[f'login{index}'] = login
+            variables[f'after{index}'] = cursor
+
+        headers = {}
+        if settings.GITHUB_API_TOKEN:
+            headers['Authorization'] = f'bearer {settings.GITHUB_API_TOKEN}'
+        with span(
+            'github.graphql', provider='github', users=len(cursors)
+        ) as query_span, phase_timeout(self.deadline, 'github') as timeout:
+            response = upstream.get(
+                'github',
+                'graphql',
+                requests.post,
+                urljoin(settings.GITHUB_API_BASE_URL, 'graphql'),
+                json={
+                    'query': organizations_query(len(cursors)),
+                    'variables': variables,
+                },
+                headers=headers,
+                timeout=timeout,
+            )
+            query_span.set_attribute('status', response.status_code)
+        return response
+
+    @staticmethod
+    def _not_found_error(developer_name: str) -> OrganizationsResult:
+        return (
+            {'error': f'{developer_name} is not a valid user in github'},
+            HTTP_404_NOT_FOUND,
+        )
@@ -0,0 +1,173 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+from django.conf import settings
+
+from social_connected.metrics import Counter
+
+UPSTREAM_HEDGES = Counter(
+    'upstream_hedges_total',
+    'Hedged upstream calls per provider, endpoint and outcome '
+    '(won when the hedge answered first, lost otherwise).',
+    ['provider', 'endpoint', 'outcome'],
+)
+
+
+class LatencyTracker:
+    """
+    Keep the latest latencies of an endpoint to derive
+    an adaptive hedging threshold from them.
+    """
+
+    def __init__(self, window: int) -> None:
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float) -> None:
+        with self._lock:
+            self.latencies.append(latency)
+
+    def percentile(self, rank: float, min_samples: int) -> Optional[float]:
+        """
+        :return: the percentile of the recorded latencies or None
+         if there are not enough samples yet.
+        """
+        with self._lock:
+            if len(self.latencies) < min_samples:
+                return None
+            ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(rank / 100 * len(ordered)))]
+
+
+class HedgeBudget:
+    """
+    Token bucket capping hedges to a share of the calls:
+    every call earns `max_rate` tokens and every hedge costs one.
+    """
+
+    def __init__(self, max_rate: float, capacity: float = 10.0) -> None:
+        self.max_rate: float = max_rate
+        self.capacity: float = capacity
+        self.tokens: float = 0.0
+        self._lock = threading.Lock()
+
+    def earn(self) -> None:
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + self.max_rate)
+
+    def spend(self) -> bool:
+        with self._lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class Hedger:
+    """
+    Send idempotent upstream calls and, when one has not answered
+    within the observed latency percentile of its endpoint, send an
+    identical call and use whichever answers first.
+    """
+
+    def __init__(self) -> None:
+        self._trackers: Dict[Tuple[str, str], LatencyTracker] = {}
+        self._budgets: Dict[str, HedgeBudget] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def enabled(provider: str) -> bool:
+        return provider in settings.UPSTREAM_HEDGING_PROVIDERS
+
+    def tracker(self, provider: str, endpoint: str) -> LatencyTracker:
+        with self._lock:
+            return self._trackers.setdefault(
+                (provider, endpoint),
+                LatencyTracker(settings.UPSTREAM_HEDGING_WINDOW),
+            )
+
+    def budget(self, provider: str) -> HedgeBudget:
+        with self._lock:
+            return self._budgets.setdefault(
+                provider, HedgeBudget(settings.UPSTREAM_HEDGING_MAX_RATE)
+            )
+
+    def executor(self) -> ThreadPoolExecutor:
+        """
+        Executor created lazily, and again in forked processes,
+        as threads do not survive a fork.
+        """
+        with self._lock:
+            if self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(
+                    max_workers=settings.UPSTREAM_HEDGING_MAX_WORKERS,
+                    thread_name_prefix='upstream-hedge',
+                )
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def threshold(self, provider: str, endpoint: str) -> float:
+        threshold = self.tracker(provider, endpoint).percentile(
+            settings.UPSTREAM_HEDGING_PERCENTILE,
+            settings.UPSTREAM_HEDGING_MIN_SAMPLES,
+        )
+        if threshold is None:
+            return settings.UPSTREAM_HEDGING_DEFAULT_DELAY
+        return threshold
+
+    def call(
+        self, provider: str, endpoint: str, send: Callable, *args, **kwargs
+    ):
+        tracker = self.tracker(provider, endpoint)
+        budget = self.budget(provider)
+        budget.earn()
+
+        def timed_send():
+            start = time.perf_counter()
+            response = send(*args, **kwargs)
+            tracker.record(time.perf_counter() - start)
+            return response
+
+        executor = self.executor()
+        primary = executor.submit(timed_send)
+        done, _ = wait([primary], timeout=self.threshold(provider, endpoint))
+        if done or not budget.spend():
+            return primary.result()
+
+        hedge = executor.submit(timed_send)
+        winner = self._first_successful(primary, hedge)
+        UPSTREAM_HEDGES.inc(
+            provider=provider,
+            endpoint=endpoint,
+            outcome='won' if winner is hedge else 'lost',
+        )
+        # the slower call cannot be cancelled, its result is dropped.
+        return winner.result()
+
+    @staticmethod
+    def _first_successful(primary: Future, hedge: Future) -> Future:
+        """
+        The first call answering without an exception, or
+        the primary call if both fail.
+        """
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in (primary, hedge):
+                if future in done and future.exception() is None:
+                    return future
+        return primary
+
+
+HEDGER = Hedger()
@@ -0,0 +1,89 @@
+from typing import Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+from social_connected.metrics import CACHE_REQUESTS
+
+
+class Identity:
+    """
+    Whether a login exists in a provider, and its stable
+    numeric id when it does and the provider gave it.
+    """
+
+    def __init__(self, exists: bool, user_id: Optional[int] = None) -> None:
+        self.exists: bool = exists
+        self.user_id: Optional[int] = user_id
+
+
+class IdentityCache:
+    """
+    Remember which developer logins exist in each provider, so that
+    invalid logins (typos, renamed accounts) do not cost upstream
+    calls. Positive and negative entries have their own TTLs,
+    IDENTITY_CACHE_POSITIVE_TTL and IDENTITY_CACHE_NEGATIVE_TTL.
+    Entries live in the `identity` cache of CACHES.
+    """
+
+    alias: str = 'identity'
+
+    @staticmethod
+    def _key(provider: str, login: str) -> str:
+        # logins are case insensitive in GitHub and Twitter.
+        return f'identity:{provider}:{login.lower()}'
+
+    def _cache(self):
+        return caches[self.alias]
+
+    def get(self, provider: str, login: str) -> Optional[Identity]:
+        return self.get_many(provider, [login]).get(login)
+
+    def get_many(
+        self, provider: str, logins: Iterable[str]
+    ) -> Dict[str, Identity]:
+        """
+        :return: identities of the known logins only.
+        """
+        logins = list(logins)
+        if not settings.IDENTITY_CACHE_ENABLED:
+            return {}
+
+        keys = {self._key(provider, login): login for login in logins}
+        entries = self._cache().get_many(list(keys))
+        identities = {
+            keys[key]: Identity(entry['exists'], entry['id'])
+            for key, entry in entries.items()
+        }
+        for login in logins:
+            CACHE_REQUESTS.inc(
+                cache='identity',
+                result='hit' if login in identities else 'miss',
+            )
+        return identities
+
+    def remember(
+        self,
+        provider: str,
+        login: str,
+        exists: bool,
+        user_id: Optional[int] = None,
+    ) -> None:
+        if not settings.IDENTITY_CACHE_ENABLED:
+            return
+        ttl = (
+            settings.IDENTITY_CACHE_POSITIVE_TTL
+            if exists
+            else settings.IDENTITY_CACHE_NEGATIVE_TTL
+        )
+        self._cache().set(
+            self._key(provider, login),
+            {'exists': exists, 'id': user_id},
+            ttl,
+        )
+
+    def clear(self) -> None:
+        self._cache().clear()
+
+
+IDENTITY_CACHE = IdentityCache()
@@ -0,0 +1,222 @@
+import concurrent.futures
+import logging
+import time
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from social_connected.controller_logic.deadline import Deadline
+from social_connected.controller_logic.github_graphql import (
+    GithubGraphQLOrganizations,
+    OrganizationsResult,
+)
+from social_connected.controller_logic.social_connected import SocialConnected
+from social_connected.metrics import Counter
+from social_connected.models import ConnectivityJob
+from social_connected.tracing import trace
+
+logger = logging.getLogger(__name__)
+
+CONNECTIVITY_JOBS = Counter(
+    'connectivity_jobs_total',
+    'Connectivity jobs submitted, done and failed.',
+    ['status'],
+)
+
+
+def submit(checks: List[Dict[str, str]]) -> List[ConnectivityJob]:
+    """
+    Queue connectivity checks of developer pairs.
+
+    :param checks: dicts with the `source_dev` and `target_dev` of a check.
+    :return: the pending jobs.
+    """
+    jobs = ConnectivityJob.objects.bulk_create(
+        [
+            ConnectivityJob(
+                source_developer=check['source_dev'],
+                target_developer=check['target_dev'],
+            )
+            for check in checks
+        ]
+    )
+    CONNECTIVITY_JOBS.inc(len(jobs), status='submitted')
+    return jobs
+
+
+def job_response(job: ConnectivityJob) -> Dict[str, Any]:
+    """
+    Status of a job, with the response of its check once done.
+    """
+    response = {
+        'id': job.id,
+        'source_dev': job.source_developer,
+        'target_dev': job.target_developer,
+        'status': job.status,
+        'created_at': job.created_at,
+        'started_at': job.started_at,
+        'finished_at': job.finished_at,
+    }
+    if job.status in (ConnectivityJob.DONE, ConnectivityJob.FAILED):
+        response['result'] = job.result
+        response['result_status'] = job.result_status
+    return response
+
+
+def claim(limit: int) -> List[ConnectivityJob]:
+    """
+    Mark up to `limit` queued jobs as running, oldest first. Rows locked
+    by other workers are skipped, so workers never claim the same job.
+    Jobs running for longer than JOBS_RUNNING_TIMEOUT, e.g. of a killed
+    worker, are claimed again, or fail after JOBS_MAX_ATTEMPTS runs, so
+    that a job killing its workers is not run forever.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.JOBS_RUNNING_TIMEOUT)
+    with transaction.atomic():
+        abandoned = ConnectivityJob.objects.filter(
+            status=ConnectivityJob.RUNNING,
+            started_at__lt=stale,
+            attempts__gte=settings.JOBS_MAX_ATTEMPTS,
+        ).update(
+            status=ConnectivityJob.FAILED,
+            result={
+                'errors': [
+                    f'Abandoned after {settings.JOBS_MAX_ATTEMPTS} attempts'
+                ]
+            },
+            finished_at=now,
+        )
+        if abandoned:
+            logger.warning('%s connectivity jobs abandoned', abandoned)
+            CONNECTIVITY_JOBS.inc(abandoned, status=ConnectivityJob.FAILED)
+        ids = list(
+            ConnectivityJob.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=ConnectivityJob.PENDING)
+                | Q(status=ConnectivityJob.RUNNING, started_at__lt=stale)
+            )
+            .order_by('created_at', 'id')
+            .values_list('id', flat=True)[:limit]
+        )
+        ConnectivityJob.objects.filter(id__in=ids).update(
+            status=ConnectivityJob.RUNNING,
+            started_at=now,
+            attempts=F('attempts') + 1,
+        )
+    return list(ConnectivityJob.objects.filter(id__in=ids).order_by('id'))
+
+
+def run(
+    job: ConnectivityJob,
+    github_organizations: Optional[Dict[str, OrganizationsResult]] = None,
+) -> ConnectivityJob:
+    """
+    Run the check of a claimed job, which saves it to the registry,
+    and store its response.
+
+    :param github_organizations: GitHub organizations of developers
+     fetched beforehand, by login.
+    """
+    with trace('job', job_id=job.id) as job_span:
+        try:
+            social_connected = SocialConnected(
+                job.source_developer,
+                job.target_developer,
+                Deadline(settings.REQUEST_DEADLINE),
+                github_organizations=github_organizations,
+            )
+            job.result, job.result_status = social_connected.connected()
+            job.status = ConnectivityJob.DONE
+        except Exception as exception:
+            logger.exception('Connectivity job %s failed', job.id)
+            job.result = {'errors': [str(exception)]}
+            job.status = ConnectivityJob.FAILED
+
+        job.finished_at = timezone.now()
+        job.save(
+            update_fields=['status', 'result', 'result_status', 'finished_at']
+        )
+        job_span.set_attribute('status', job.status)
+    CONNECTIVITY_JOBS.inc(status=job.status)
+    return job
+
+
+class JobWorker:
+    """
+    Claim queued jobs in batches and run them concurrently.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+    ) -> None:
+        self.workers: int = workers or settings.JOBS_WORKERS
+        self.batch_size: int = batch_size or self.workers
+        self.poll_interval: float = (
+            settings.JOBS_POLL_INTERVAL
+            if poll_interval is None
+            else poll_interval
+        )
+
+    def run_once(self) -> int:
+        """
+        Run one batch of jobs.
+
+        :return: the number of jobs run.
+        """
+        jobs = claim(self.batch_size)
+        if not jobs:
+            return 0
+        organizations = self._fetch_github_organizations(jobs)
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.workers
+        ) as executor:
+            list(executor.map(self._run, jobs, [organizations] * len(jobs)))
+        return len(jobs)
+
+    @staticmethod
+    def _fetch_github_organizations(
+        jobs: List[ConnectivityJob]
+    ) -> Optional[Dict[str, OrganizationsResult]]:
+        """
+        With the GraphQL backend, fetch the GitHub organizations of
+        every developer of the batch at once. Jobs fetch their own if
+        that fails.
+        """
+        if settings.GITHUB_ORGS_BACKEND != 'graphql':
+            return None
+        logins = [
+            login
+            for job in jobs
+            for login in (job.source_developer, job.target_developer)
+        ]
+        try:
+            return GithubGraphQLOrganizations(
+                Deadline(settings.REQUEST_DEADLINE)
+            ).fetch(logins)
+        except Exception:
+            logger.exception('Fetching the organizations of a batch failed')
+            return None
+
+    def run_forever(self) -> None:  # pragma: no cover
+        while True:
+            if not self.run_once():
+                time.sleep(self.poll_interval)
+
+    @staticmethod
+    def _run(
+        job: ConnectivityJob,
+        github_organizations: Optional[Dict[str, OrganizationsResult]],
+    ) -> ConnectivityJob:
+        try:
+            return run(job, github_organizations)
+        finally:
+            # each thread has its own database connection.
+            connection.close()
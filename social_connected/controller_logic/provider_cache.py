@@ -0,0 +1,108 @@
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+from social_connected.metrics import CACHE_REQUESTS
+
+
+class ProviderCache:
+    """
+    Cache of the successful responses of the providers: the GitHub
+    organizations of a user and whether two Twitter users follow each
+    other, which is symmetric. Entries expire after PROVIDER_CACHE_TTL
+    seconds and live in the `providers` cache of CACHES, a SQLite file
+    shared by the workers of a host that survives restarts.
+    """
+
+    alias: str = 'providers'
+
+    @staticmethod
+    def _organizations_key(login: str) -> str:
+        return f'provider:github:orgs:{login.lower()}'
+
+    @staticmethod
+    def _relationship_key(source_dev: str, target_dev: str) -> str:
+        first, second = sorted((source_dev.lower(), target_dev.lower()))
+        return f'provider:twitter:connected:{first}:{second}'
+
+    def _cache(self):
+        return caches[self.alias]
+
+    def get_organizations(self, login: str) -> Optional[List[Dict]]:
+        return self.get_many_organizations([login]).get(login)
+
+    def get_many_organizations(
+        self, logins: Iterable[str]
+    ) -> Dict[str, List[Dict]]:
+        """
+        :return: organizations of the cached logins only.
+        """
+        logins = list(logins)
+        if not settings.PROVIDER_CACHE_ENABLED:
+            return {}
+
+        keys = {self._organizations_key(login): login for login in logins}
+        organizations = {
+            keys[key]: entry
+            for key, entry in self._cache().get_many(list(keys)).items()
+        }
+        for login in logins:
+            CACHE_REQUESTS.inc(
+                cache='provider',
+                result='hit' if login in organizations else 'miss',
+            )
+        return organizations
+
+    def set_organizations(self, login: str, organizations: List[Dict]) -> None:
+        if not settings.PROVIDER_CACHE_ENABLED:
+            return
+        self._cache().set(
+            self._organizations_key(login),
+            organizations,
+            settings.PROVIDER_CACHE_TTL,
+        )
+
+    def get_relationship(
+        self, source_dev: str, target_dev: str
+    ) -> Optional[Dict[str, bool]]:
+        if not settings.PROVIDER_CACHE_ENABLED:
+            return None
+        response = self._cache().get(
+            self._relationship_key(source_dev, target_dev)
+        )
+        CACHE_REQUESTS.inc(
+            cache='provider', result='miss' if response is None else 'hit'
+        )
+        return response
+
+    def set_relationship(
+        self, source_dev: str, target_dev: str, response: Dict[str, bool]
+    ) -> None:
+        if not settings.PROVIDER_CACHE_ENABLED:
+            return
+        self._cache().set(
+            self._relationship_key(source_dev, target_dev),
+            response,
+            settings.PROVIDER_CACHE_TTL,
+        )
+
+    def invalidate(self, source_dev: str, target_dev: str) -> None:
+        """
+        Evict the organizations of both users and their relationship.
+        """
+        if not settings.PROVIDER_CACHE_ENABLED:
+            return
+        self._cache().delete_many(
+            [
+                self._organizations_key(source_dev),
+                self._organizations_key(target_dev),
+                self._relationship_key(source_dev, target_dev),
+            ]
+        )
+
+    def clear(self) -> None:
+        self._cache().clear()
+
+
+PROVIDER_CACHE = ProviderCache()
@@ -0,0 +1,71 @@
+import threading
+from typing import Dict, List, Sequence
+
+from social_connected.metrics import Counter
+
+PROVIDER_CHECKS_SKIPPED = Counter(
+    'provider_checks_skipped_total',
+    'Provider checks skipped by lazy evaluation per provider.',
+    ['provider'],
+)
+
+
+class ProviderStats:
+    """
+    Exponentially weighted averages of the latency of each provider
+    check and of how often it answers "not connected".
+
+    Two developers are connected only if every provider says so,
+    checks are then best run by ascending expected cost of reaching
+    a "not connected" answer: latency / negative rate.
+    """
+
+    def __init__(
+        self, alpha: float = 0.1, negative_rate_prior: float = 0.5
+    ) -> None:
+        self.alpha: float = alpha
+        self.negative_rate_prior: float = negative_rate_prior
+        self.latency: Dict[str, float] = {}
+        self.negative_rate: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, provider: str, negative: bool, latency: float) -> None:
+        with self._lock:
+            self.latency[provider] = self._average(
+                self.latency.get(provider), latency
+            )
+            self.negative_rate[provider] = self._average(
+                self.negative_rate.get(provider, self.negative_rate_prior),
+                float(negative),
+            )
+
+    def _average(self, current, value: float) -> float:
+        if current is None:
+            return value
+        return (1 - self.alpha) * current + self.alpha * value
+
+    def cost(self, provider: str) -> float:
+        """
+        Expected time spent on a provider per "not connected" answer.
+        Unobserved providers cost nothing, so they get observed.
+        """
+        with self._lock:
+            latency = self.latency.get(provider, 0.0)
+            negative_rate = self.negative_rate.get(
+                provider, self.negative_rate_prior
+            )
+        return latency / max(negative_rate, 0.01)
+
+    def order(self, providers: Sequence[str]) -> List[str]:
+        """
+        Providers sorted by ascending cost, ties keep the given order.
+        """
+        return sorted(providers, key=self.cost)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.latency.clear()
+            self.negative_rate.clear()
+
+
+PROVIDER_STATS = ProviderStats()
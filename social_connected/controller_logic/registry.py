@@ -1,17 +1,264 @@
-from typing import Dict, List, Any
+from datetime import date, datetime, time
+from typing import Dict, List, Any, Optional, Tuple
 
 from rest_framework.status import (
     HTTP_200_OK,
     HTTP_500_INTERNAL_SERVER_ERROR,
 )
 
-from social_connected.models import SocialRegistry, CommonOrganizations
+from django.db import connections, router, transaction
+from django.db.models import (
+    F,
+    Max,
+    Min,
+    OuterRef,
+    Q,
+    QuerySet,
+    Subquery,
+    Sum,
+    Window,
+)
+from django.db.models.functions import Coalesce, RowNumber, TruncDate
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from social_connected.models import (
+    CommonOrganizations,
+    RegistryDailyRollup,
+    SocialRegistry,
+)
+
+
+def check_times(registry: SocialRegistry) -> List[datetime]:
+    """
+    Times of the checks a registry stands for. In interval storage, the
+    checks between the first and the last one are spread evenly.
+    """
+    if registry.check_count <= 1 or registry.last_seen is None:
+        return [registry.registered_at]
+    step = (registry.last_seen - registry.registered_at) / (
+        registry.check_count - 1
+    )
+    return [
+        registry.registered_at + step * index
+        for index in range(registry.check_count - 1)
+    ] + [registry.last_seen]
+
+
+def daily_summaries(
+    registries: QuerySet
+) -> Dict[Tuple[str, str, date], Dict[str, Any]]:
+    """
+    Daily aggregates of registries per pair of developers, keyed by
+    source developer, target developer and date. Registries of interval
+    storage count on the day of their first check.
+    """
+    summaries = {}
+    for day in (
+        registries.annotate(date=TruncDate('registered_at'))
+        .values('source_developer', 'target_developer', 'date')
+        .annotate(
+            checks=Sum('check_count'),
+            connected_checks=Coalesce(
+                Sum('check_count', filter=Q(connected=True)), 0
+            ),
+            first_seen=Min('registered_at'),
+            last_seen=Max(Coalesce('last_seen', 'registered_at')),
+        )
+        .order_by()
+    ):
+        key = day['source_developer'], day['target_developer'], day['date']
+        summaries[key] = {
+            'checks': day['checks'],
+            'connected_checks': day['connected_checks'],
+            'first_seen': day['first_seen'],
+            'last_seen': day['last_seen'],
+            'organizations': [],
+        }
+
+    # the pair and day of an organization are the ones of its registry.
+    registry = SocialRegistry.objects.filter(
+        transaction_id=OuterRef('transaction_id')
+    )
+    for source, target, day, organization in (
+        CommonOrganizations.objects.filter(
+            transaction_id__in=registries.values('transaction_id')
+        )
+        .annotate(
+            source=Subquery(registry.values('source_developer')[:1]),
+            target=Subquery(registry.values('target_developer')[:1]),
+            date=Subquery(
+                registry.annotate(date=TruncDate('registered_at')).values(
+                    'date'
+                )[:1]
+            ),
+        )
+        .values_list('source', 'target', 'date', 'organization')
+        .distinct()
+        .order_by('organization')
+    ):
+        if (source, target, day) in summaries:
+            summaries[source, target, day]['organizations'].append(
+                organization
+            )
+    return summaries
+
+
+def compact_registries(batch_size: int = 1000) -> int:
+    """
+    Merge the consecutive registries of a pair with the same outcome and
+    organizations into one registry per period, as interval storage
+    writes them. Histories already compacted are left as they are, so
+    it may run again, e.g. after switching to interval storage.
+
+    :return: the number of registries merged into others.
+    """
+    pairs = (
+        SocialRegistry.objects.values_list(
+            'source_developer', 'target_developer'
+        )
+        .distinct()
+        .order_by()
+    )
+    merged_count = 0
+    for source_developer, target_developer in pairs.iterator():
+        with transaction.atomic():
+            merged_count += _compact_pair(
+                source_developer, target_developer, batch_size
+            )
+    return merged_count
+
+
+def _compact_pair(
+    source_developer: str, target_developer: str, batch_size: int
+) -> int:
+    # locked, as interval storage extends the latest registry of a pair.
+    registries = (
+        SocialRegistry.objects.select_for_update()
+        .filter(
+            source_developer=source_developer,
+            target_developer=target_developer,
+        )
+        .order_by('registered_at', 'id')
+    )
+    organizations = {}
+    for transaction_id, organization in CommonOrganizations.objects.filter(
+        transaction_id__in=registries.values('transaction_id')
+    ).values_list('transaction_id', 'organization'):
+        organizations.setdefault(transaction_id, set()).add(organization)
+
+    # registries extended by the compaction, by id, and merged ones.
+    extended, merged = {}, []
+    period, period_state = None, None
+    for registry in registries:
+        state = (
+            registry.connected,
+            organizations.get(registry.transaction_id, set()),
+        )
+        if period is not None and state == period_state:
+            period.check_count += registry.check_count
+            period.last_seen = registry.last_seen or registry.registered_at
+            extended[period.id] = period
+            merged.append(registry.id)
+            continue
+
+        period, period_state = registry, state
+
+    SocialRegistry.objects.bulk_update(
+        list(extended.values()),
+        ['check_count', 'last_seen'],
+        batch_size=batch_size,
+    )
+    # merged registries are deleted once the history is read.
+    for start in range(0, len(merged), batch_size):
+        batch = SocialRegistry.objects.filter(
+            id__in=merged[start:start + batch_size]
+        )
+        CommonOrganizations.objects.filter(
+            transaction_id__in=batch.values('transaction_id')
+        ).delete()
+        batch.delete()
+    return len(merged)
 
 
 class Registry:
-    def __init__(self, source_dev: str = '', target_dev: str = '') -> None:
+    def __init__(
+        self,
+        source_dev: str = '',
+        target_dev: str = '',
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        connected: Optional[bool] = None,
+    ) -> None:
         self.source_developer: str = source_dev
         self.target_developer: str = target_dev
+        # optional filters of the history, applied in the database.
+        self.since: Optional[datetime] = since
+        self.until: Optional[datetime] = until
+        self.connected: Optional[bool] = connected
+
+    @staticmethod
+    def filters_from_query_params(
+        query_params: Dict[str, str]
+    ) -> Dict[str, Any]:
+        """
+        Parse the `since` and `until` dates or datetimes (ISO 8601, dates
+        cover the whole day) and the `connected` (true or false) filters.
+
+        :raises ValueError: if a filter is not valid.
+        """
+        filters = {}
+        for name in ('since', 'until'):
+            value = query_params.get(name)
+            if not value:
+                continue
+            moment = parse_datetime(value)
+            if moment is None:
+                date = parse_date(value)
+                if date is None:
+                    raise ValueError(f'{name} must be an ISO 8601 date')
+                moment = datetime.combine(
+                    date, time.min if name == 'since' else time.max
+                )
+            if timezone.is_naive(moment):
+                moment = timezone.make_aware(moment)
+            filters[name] = moment
+
+        connected = query_params.get('connected')
+        if connected:
+            if connected not in ('true', 'false'):
+                raise ValueError('connected must be true or false')
+            filters['connected'] = connected == 'true'
+        return filters
+
+    def _registries(self) -> QuerySet:
+        """
+        Registries of the developers matching the filters, by ascending
+        time. Interval storage and partitions do not keep rows in the
+        order of their checks.
+        """
+        registries = self._period_registries()
+        if self.connected is not None:
+            registries = registries.filter(connected=self.connected)
+        return registries.order_by('registered_at', 'id')
+
+    def _period_registries(self) -> QuerySet:
+        """
+        Registries of the developers between `since` and `until`,
+        whatever their outcome.
+        """
+        registries = SocialRegistry.objects.filter(
+            source_developer=self.source_developer,
+            target_developer=self.target_developer,
+        )
+        if self.since:
+            # registries of interval storage last until last_seen.
+            registries = registries.alias(
+                seen_until=Coalesce('last_seen', 'registered_at')
+            ).filter(seen_until__gte=self.since)
+        if self.until:
+            registries = registries.filter(registered_at__lte=self.until)
+        return registries
 
     def retrieve_registries(self) -> List[Dict[str, Any]]:
         """
@@ -19,19 +266,16 @@ class Registry:
         Connections will be retrieved by ascending order.
         """
         try:
-            registries = SocialRegistry.objects.filter(
-                source_developer=self.source_developer,
-                target_developer=self.target_developer,
-            )
-            first_registry = registries.first()
-            # joins all organizations linked to both
-            # developers by the registry id.
+            registries = self._registries()
+            # joins all organizations of the registries of both developers
+            # by transaction id, the first registries of the developers,
+            # which organizations are linked to, may have expired.
             organizations = CommonOrganizations.objects.filter(
-                social_registry=first_registry
-            ).prefetch_related('social_registry')
+                transaction_id__in=registries.values('transaction_id')
+            )
 
             response = []
-            for index, registry in enumerate(registries):
+            for registry in registries:
                 orgs = []
                 # matches orgs and registries by transaction id.
                 # this way we can set an organizations key only for those
@@ -40,17 +284,283 @@ class Registry:
                 for organization in organizations:
                     if registry.transaction_id == organization.transaction_id:
                         orgs.append(organization.organization)
-                response.append(
-                    {
-                        'registered_at': registry.registered_at,
+                # one item per check, registries of interval
+                # storage stand for several checks.
+                for registered_at in check_times(registry):
+                    if not self._in_range(registered_at):
+                        continue
+                    item = {
+                        'registered_at': registered_at,
                         'connected': registry.connected,
                     }
+                    # avoid adding organization to the
+                    # response if connection is not true.
+                    if orgs:
+                        item['organizations'] = list(orgs)
+                    response.append(item)
+
+        except Exception as exception:
+            return {'errors': [str(exception)]}, HTTP_500_INTERNAL_SERVER_ERROR
+        return response, HTTP_200_OK
+
+    def _in_range(self, registered_at: datetime) -> bool:
+        return (not self.since or registered_at >= self.since) and (
+            not self.until or registered_at <= self.until
+        )
+
+    def retrieve_daily(self) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Daily history of developers connections, by ascending date.
+        Days of expired registries come from their rollups, the others
+        are aggregated from the registries. `since` and `until` select
+        whole days, `connected` keeps the days with a check of that
+        outcome.
+        """
+        try:
+            rollups = RegistryDailyRollup.objects.filter(
+                source_developer=self.source_developer,
+                target_developer=self.target_developer,
+            )
+            registries = SocialRegistry.objects.filter(
+                source_developer=self.source_developer,
+                target_developer=self.target_developer,
+            )
+            if self.since:
+                rollups = rollups.filter(date__gte=self.since.date())
+                registries = registries.filter(
+                    registered_at__date__gte=self.since.date()
+                )
+            if self.until:
+                rollups = rollups.filter(date__lte=self.until.date())
+                registries = registries.filter(
+                    registered_at__date__lte=self.until.date()
+                )
+
+            days: Dict[date, Dict[str, Any]] = {}
+            for rollup in rollups:
+                days[rollup.date] = {
+                    'checks': rollup.checks,
+                    'connected_checks': rollup.connected_checks,
+                    'first_seen': rollup.first_seen,
+                    'last_seen': rollup.last_seen,
+                    'organizations': rollup.organizations,
+                }
+            # a day partly expired has both a rollup and registries.
+            for (_, _, day), summary in daily_summaries(registries).items():
+                if day not in days:
+                    days[day] = summary
+                    continue
+                merged = days[day]
+                merged['checks'] += summary['checks']
+                merged['connected_checks'] += summary['connected_checks']
+                merged['first_seen'] = min(
+                    merged['first_seen'], summary['first_seen']
+                )
+                merged['last_seen'] = max(
+                    merged['last_seen'], summary['last_seen']
+                )
+                merged['organizations'] = sorted(
+                    set(merged['organizations'])
+                    | set(summary['organizations'])
+                )
+
+            response = []
+            for day, summary in sorted(days.items()):
+                if self.connected is True and not summary['connected_checks']:
+                    continue
+                if (
+                    self.connected is False
+                    and summary['checks'] == summary['connected_checks']
+                ):
+                    continue
+                item = {'date': day, **summary}
+                # same as the registries, no organizations key
+                # for days without connections.
+                if not item['organizations']:
+                    del item['organizations']
+                response.append(item)
+        except Exception as exception:
+            return {'errors': [str(exception)]}, HTTP_500_INTERNAL_SERVER_ERROR
+        return response, HTTP_200_OK
+
+    def retrieve_stats(self) -> Tuple[Dict[str, Any], int]:
+        """
+        Statistics of the history of developers connections,
+        computed by the database. Registries of interval storage
+        overlapping `since` or `until` count in full.
+        """
+        try:
+            registries = self._registries()
+            stats = registries.aggregate(
+                total_checks=Coalesce(Sum('check_count'), 0),
+                connected_checks=Coalesce(
+                    Sum('check_count', filter=Q(connected=True)), 0
+                ),
+                first_connected_at=Min(
+                    'registered_at', filter=Q(connected=True)
+                ),
+                last_connected_at=Max(
+                    Coalesce('last_seen', 'registered_at'),
+                    filter=Q(connected=True),
+                ),
+            )
+            stats['connected_ratio'] = (
+                stats['connected_checks'] / stats['total_checks']
+                if stats['total_checks']
+                else None
+            )
+            # a streak ends with a disconnected check, whatever the
+            # `connected` filter.
+            stats['longest_connected_streak'] = self._longest_streak(
+                self._period_registries()
+            )
+        except Exception as exception:
+            return {'errors': [str(exception)]}, HTTP_500_INTERNAL_SERVER_ERROR
+        return stats, HTTP_200_OK
+
+    @staticmethod
+    def _longest_streak(registries: QuerySet) -> int:
+        """
+        Most consecutive connected checks. Consecutive registries with
+        the same outcome have the same difference between their position
+        in the history and their position among the registries of that
+        outcome (gaps and islands), so streaks are the groups of that
+        difference.
+        """
+        order_by = [F('registered_at').asc(), F('id').asc()]
+        checks = registries.annotate(
+            island=Window(RowNumber(), order_by=order_by)
+            - Window(
+                RowNumber(), partition_by=[F('connected')], order_by=order_by
+            )
+        ).values('connected', 'island', 'check_count')
+        # raw SQL is not routed, the database is picked as for the ORM.
+        alias = router.db_for_read(SocialRegistry)
+        sql, params = checks.query.get_compiler(alias).as_sql()
+
+        with connections[alias].cursor() as cursor:
+            cursor.execute(
+                'SELECT MAX(streak) FROM ('
+                'SELECT SUM(checks.check_count) AS streak '
+                f'FROM ({sql}) AS checks '
+                'WHERE checks.connected '
+                'GROUP BY checks.island'
+                ') AS streaks',
+                params,
+            )
+            (streak,) = cursor.fetchone()
+        return streak or 0
+
+
+class BulkRegistry:
+    """
+    History of many pairs of developers in two queries, one for their
+    registries and one for their organizations, whatever the number
+    of pairs.
+    """
+
+    def __init__(
+        self, pairs: List[Tuple[str, str]], limit: Optional[int] = None
+    ) -> None:
+        # pairs of source and target developers, without duplicates.
+        self.pairs: List[Tuple[str, str]] = list(dict.fromkeys(pairs))
+        # latest checks returned per pair, all of them if None.
+        self.limit: Optional[int] = limit
+
+    def _pairs_filter(self) -> Q:
+        pairs = Q()
+        for source_developer, target_developer in self.pairs:
+            pairs |= Q(
+                source_developer=source_developer,
+                target_developer=target_developer,
+            )
+        return pairs
+
+    def _registries(self) -> List[SocialRegistry]:
+        registries = SocialRegistry.objects.filter(self._pairs_filter())
+        if self.limit is None:
+            return list(registries)
+
+        # number the checks of each pair from the latest one,
+        # then keep the first `limit` ones of every pair.
+        ranked = registries.annotate(
+            rank_in_pair=Window(
+                RowNumber(),
+                partition_by=[F('source_developer'), F('target_developer')],
+                order_by=[F('registered_at').desc(), F('id').desc()],
+            )
+        )
+        sql, params = ranked.query.sql_with_params()
+        return list(
+            SocialRegistry.objects.raw(
+                f'SELECT * FROM ({sql}) AS ranked '
+                'WHERE ranked.rank_in_pair <= %s',
+                (*params, self.limit),
+            )
+        )
+
+    def retrieve_registries(self) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Retrieve the history of every pair, in ascending order,
+        grouped by pair in the order of the pairs.
+        """
+        try:
+            registries = sorted(
+                self._registries(),
+                key=lambda registry: (registry.registered_at, registry.id),
+            )
+            if self.limit is None:
+                transaction_ids = SocialRegistry.objects.filter(
+                    self._pairs_filter()
+                ).values('transaction_id')
+            else:
+                transaction_ids = [
+                    registry.transaction_id for registry in registries
+                ]
+            linked = CommonOrganizations.objects.filter(
+                transaction_id__in=transaction_ids
+            )
+            organizations: Dict[str, List[str]] = {}
+            for transaction_id, organization in linked.order_by(
+                'id'
+            ).values_list('transaction_id', 'organization'):
+                organizations.setdefault(transaction_id, []).append(
+                    organization
                 )
-                # avoid adding organization to the
-                # response if connection is not true.
-                if orgs:
-                    response[index]['organizations'] = orgs
 
+            histories: Dict[Tuple[str, str], List[Dict[str, Any]]] = {
+                pair: [] for pair in self.pairs
+            }
+            for registry in registries:
+                history = histories[
+                    registry.source_developer, registry.target_developer
+                ]
+                for registered_at in check_times(registry):
+                    item = {
+                        'registered_at': registered_at,
+                        'connected': registry.connected,
+                    }
+                    # only connected registries have organizations.
+                    if registry.transaction_id in organizations:
+                        item['organizations'] = list(
+                            organizations[registry.transaction_id]
+                        )
+                    history.append(item)
+            if self.limit is not None:
+                # registries of interval storage may hold more checks.
+                for pair, history in histories.items():
+                    histories[pair] = history[-self.limit:]
         except Exception as exception:
             return {'errors': [str(exception)]}, HTTP_500_INTERNAL_SERVER_ERROR
+
+        response = [
+            {
+                'source_dev': source_developer,
+                'target_dev': target_developer,
+                'registries': history,
+            }
+            for (source_developer, target_developer), history in (
+                histories.items()
+            )
+        ]
         return response, HTTP_200_OK
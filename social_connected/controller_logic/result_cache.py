@@ -0,0 +1,71 @@
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+
+from social_connected.metrics import CACHE_REQUESTS
+
+
+class ResultCache:
+    """
+    Cache of the successful results of realtime checks. Being connected
+    is symmetric, dev1/dev2 and dev2/dev1 share the same entry.
+    Entries expire after RESULT_CACHE_TTL seconds or when invalidated,
+    and live in the `results` cache of CACHES, which must be shared by
+    the workers for an invalidation to reach all of them.
+    """
+
+    alias: str = 'results'
+    # backends whose entries are private to a process.
+    local_backends = (
+        'django.core.cache.backends.locmem.LocMemCache',
+        'django.core.cache.backends.dummy.DummyCache',
+    )
+
+    @staticmethod
+    def _key(source_dev: str, target_dev: str) -> str:
+        first, second = sorted((source_dev.lower(), target_dev.lower()))
+        return f'result:{first}:{second}'
+
+    def _cache(self):
+        return caches[self.alias]
+
+    def check_backend(self) -> None:
+        """
+        :raises ImproperlyConfigured: if the cache is enabled on a
+         backend that workers do not share.
+        """
+        backend = settings.CACHES[self.alias]['BACKEND']
+        if settings.RESULT_CACHE_ENABLED and backend in self.local_backends:
+            raise ImproperlyConfigured(
+                f'RESULT_CACHE_ENABLED requires a RESULT_CACHE_BACKEND '
+                f'shared by the workers, not {backend}'
+            )
+
+    def get(self, source_dev: str, target_dev: str) -> Optional[Dict]:
+        if not settings.RESULT_CACHE_ENABLED:
+            return None
+        response = self._cache().get(self._key(source_dev, target_dev))
+        CACHE_REQUESTS.inc(
+            cache='result', result='miss' if response is None else 'hit'
+        )
+        return response
+
+    def set(self, source_dev: str, target_dev: str, response: Dict) -> None:
+        if not settings.RESULT_CACHE_ENABLED:
+            return
+        self._cache().set(
+            self._key(source_dev, target_dev),
+            response,
+            settings.RESULT_CACHE_TTL,
+        )
+
+    def invalidate(self, source_dev: str, target_dev: str) -> None:
+        self._cache().delete(self._key(source_dev, target_dev))
+
+    def clear(self) -> None:
+        self._cache().clear()
+
+
+RESULT_CACHE = ResultCache()
@@ -0,0 +1,257 @@
+import logging
+import re
+from datetime import datetime
+from typing import List, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from social_connected.controller_logic.registry import daily_summaries
+from social_connected.models import (
+    CommonOrganizations,
+    RegistryDailyRollup,
+    SocialRegistry,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def month_start(moment: datetime) -> datetime:
+    """
+    Start of the month of `moment`, in UTC like the partition bounds.
+    """
+    moment = moment.astimezone(timezone.utc)
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    year, index = divmod(month.month - 1 + months, 12)
+    return month.replace(year=month.year + year, month=index + 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f'{table}_{month.year:04d}_{month.month:02d}'
+
+
+def is_partitioned(table: str = SocialRegistry._meta.db_table) -> bool:
+    """
+    Whether `table` is a partitioned table (Postgres only).
+    """
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT 1 FROM pg_partitioned_table '
+            'JOIN pg_class ON pg_class.oid = partrelid '
+            'WHERE relname = %s',
+            [table],
+        )
+        return cursor.fetchone() is not None
+
+
+def partitions(table: str = SocialRegistry._meta.db_table) -> List[str]:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT child.relname FROM pg_inherits '
+            'JOIN pg_class parent ON parent.oid = inhparent '
+            'JOIN pg_class child ON child.oid = inhrelid '
+            'WHERE parent.relname = %s',
+            [table],
+        )
+        return [name for (name,) in cursor.fetchall()]
+
+
+def create_partition(
+    cursor, month: datetime, table: str = SocialRegistry._meta.db_table
+) -> None:
+    """
+    Create the partition of the registries of a month if missing.
+    """
+    name = connection.ops.quote_name(partition_name(table, month))
+    cursor.execute(
+        f'CREATE TABLE IF NOT EXISTS {name} '
+        f'PARTITION OF {connection.ops.quote_name(table)} '
+        'FOR VALUES FROM (%s) TO (%s)',
+        [month, add_months(month, 1)],
+    )
+
+
+def create_partitions(months_ahead: int) -> List[str]:
+    """
+    Create the partitions of this month and of the next `months_ahead`.
+
+    :return: the names of the partitions.
+    """
+    current = month_start(timezone.now())
+    months = [add_months(current, index) for index in range(months_ahead + 1)]
+    with connection.cursor() as cursor:
+        for month in months:
+            create_partition(cursor, month)
+    table = SocialRegistry._meta.db_table
+    return [partition_name(table, month) for month in months]
+
+
+def seen_before(cutoff: datetime) -> Q:
+    """
+    Registries last seen before `cutoff`, unlike the interval registries
+    still extended by checks, which the next checks of their pair read.
+    """
+    return Q(last_seen__lt=cutoff) | Q(
+        last_seen__isnull=True, registered_at__lt=cutoff
+    )
+
+
+def ended_registries(
+    since: datetime, until: datetime, cutoff: Optional[datetime] = None
+):
+    """
+    Registries from `since` to `until` (excluded), last seen before
+    `cutoff` if any.
+    """
+    registries = SocialRegistry.objects.filter(
+        registered_at__gte=since, registered_at__lt=until
+    )
+    if cutoff is None:
+        return registries
+    return registries.filter(seen_before(cutoff))
+
+
+def rollup(
+    since: datetime, until: datetime, cutoff: Optional[datetime] = None
+) -> int:
+    """
+    Summarise the registries from `since` to `until` (excluded), last
+    seen before `cutoff` if any, into daily rollups per pair of
+    developers, added to existing rollups.
+
+    :return: the number of rollups written.
+    """
+    registries = ended_registries(since, until, cutoff)
+    written = 0
+    for (source, target, day), summary in daily_summaries(registries).items():
+        daily_rollup, created = RegistryDailyRollup.objects.get_or_create(
+            source_developer=source,
+            target_developer=target,
+            date=day,
+            defaults=summary,
+        )
+        if not created:
+            daily_rollup.checks += summary['checks']
+            daily_rollup.connected_checks += summary['connected_checks']
+            daily_rollup.first_seen = min(
+                daily_rollup.first_seen, summary['first_seen']
+            )
+            daily_rollup.last_seen = max(
+                daily_rollup.last_seen, summary['last_seen']
+            )
+            daily_rollup.organizations = sorted(
+                set(daily_rollup.organizations)
+                | set(summary['organizations'])
+            )
+            daily_rollup.save()
+        written += 1
+    return written
+
+
+def expire(
+    month: datetime, archive_mode: str, cutoff: Optional[datetime] = None
+) -> bool:
+    """
+    Roll the registries of a month up and remove them, with their
+    organizations. A partition of the month is dropped, or detached
+    and kept with its organizations as archive tables when
+    `archive_mode` is `detach`. Without one, rows are deleted.
+
+    Registries last seen from `cutoff` on (the end of the month by
+    default) are kept, the partition of the month with them.
+
+    :return: whether registries of the month were expired.
+    """
+    until = add_months(month, 1)
+    cutoff = cutoff or until
+    registry_table = SocialRegistry._meta.db_table
+    partition = partition_name(registry_table, month)
+    quote = connection.ops.quote_name
+
+    with transaction.atomic():
+        partitioned = is_partitioned() and partition in partitions()
+        if partitioned and SocialRegistry.objects.filter(
+            registered_at__gte=month,
+            registered_at__lt=until,
+            last_seen__gte=cutoff,
+        ).exists():
+            logger.info(
+                'Keeping the partition %s, its registries are still seen',
+                partition,
+            )
+            return False
+
+        rollup(month, until, cutoff)
+        registries = ended_registries(month, until, cutoff)
+        organizations = CommonOrganizations.objects.filter(
+            transaction_id__in=registries.values('transaction_id')
+        )
+        if partitioned and archive_mode == 'detach':
+            organizations_table = CommonOrganizations._meta.db_table
+            archive = partition_name(organizations_table, month) + '_archive'
+            sql, params = organizations.query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'CREATE TABLE {quote(archive)} AS {sql}', params
+                )
+        organizations.delete()
+
+        if not partitioned:
+            registries.delete()
+            return True
+        with connection.cursor() as cursor:
+            if archive_mode == 'detach':
+                cursor.execute(
+                    f'ALTER TABLE {quote(registry_table)} '
+                    f'DETACH PARTITION {quote(partition)}'
+                )
+                cursor.execute(
+                    f'ALTER TABLE {quote(partition)} '
+                    f'RENAME TO {quote(partition + "_archive")}'
+                )
+            else:
+                cursor.execute(f'DROP TABLE {quote(partition)}')
+    return True
+
+
+def expire_before(
+    cutoff: datetime, archive_mode: Optional[str] = None
+) -> List[datetime]:
+    """
+    Expire the registries of every month before the month of `cutoff`,
+    but those still seen since then, e.g. the latest interval of a pair.
+
+    :return: the expired months.
+    """
+    archive_mode = archive_mode or settings.REGISTRY_ARCHIVE_MODE
+    cutoff = month_start(cutoff)
+    months = {
+        month_start(month)
+        for month in SocialRegistry.objects.filter(
+            seen_before(cutoff)
+        ).datetimes('registered_at', 'month', tzinfo=timezone.utc)
+    }
+    if is_partitioned():
+        # partitions of months without registries expire as well.
+        table = SocialRegistry._meta.db_table
+        months.update(
+            datetime.strptime(name[len(table) + 1:], '%Y_%m').replace(
+                tzinfo=timezone.utc
+            )
+            for name in partitions()
+            if re.fullmatch(rf'{table}_\d{{4}}_\d{{2}}', name)
+        )
+
+    expired = []
+    for month in sorted(month for month in months if month < cutoff):
+        logger.info('Expiring the registries of %s', month.strftime('%Y-%m'))
+        if expire(month, archive_mode, cutoff):
+            expired.append(month)
+    return expired
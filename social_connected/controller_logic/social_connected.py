@@ -1,31 +1,79 @@
 import uuid
-from typing import Dict, Union, List, Tuple
+from time import perf_counter
+from typing import Dict, Optional, Union, List, Set, Tuple
 
 from rest_framework.status import (
     HTTP_200_OK,
     HTTP_400_BAD_REQUEST,
     HTTP_500_INTERNAL_SERVER_ERROR,
+    HTTP_503_SERVICE_UNAVAILABLE,
+    HTTP_504_GATEWAY_TIMEOUT,
 )
 
-from django.db import transaction, IntegrityError
+from django.conf import settings
+from django.db import connection, transaction, IntegrityError
+from django.db.models import F
+from django.utils import timezone
 
+from social_connected.controller_logic.changes import (
+    publish_change,
+    stream_enabled,
+)
+from social_connected.controller_logic.circuit_breaker import (
+    UpstreamUnavailable,
+)
+from social_connected.controller_logic.deadline import (
+    Deadline,
+    DeadlineExceeded,
+)
 from social_connected.controller_logic.github_connected import GithubConnected
+from social_connected.controller_logic.github_graphql import (
+    OrganizationsResult,
+)
+from social_connected.controller_logic.provider_stats import (
+    PROVIDER_CHECKS_SKIPPED,
+    PROVIDER_STATS,
+)
+from social_connected.controller_logic.result_cache import RESULT_CACHE
 from social_connected.controller_logic.twitter_connected import (
     TwitterConnected,
 )
 from social_connected.models import SocialRegistry, CommonOrganizations
+from social_connected.timing import timed
+from social_connected.tracing import Span, span
+
+PROVIDERS = ('github', 'twitter')
 
 
 class SocialConnected:
     """
     Contain logic to create two socially connected devs from GitHub and Twitter
     """
-    def __init__(self, source_dev: str = '', target_dev: str = '') -> None:
+    EVALUATIONS = ('full', 'lazy')
+
+    def __init__(
+        self,
+        source_dev: str = '',
+        target_dev: str = '',
+        deadline: Optional[Deadline] = None,
+        evaluation: Optional[str] = None,
+        github_organizations: Optional[Dict[str, OrganizationsResult]] = None,
+    ) -> None:
         self.source_developer: str = source_dev
         self.target_developer: str = target_dev
+        # time budget of the check, split across the upstream calls
+        # and the database write. No budget if None.
+        self.deadline: Optional[Deadline] = deadline
+        # `full` runs every provider check and reports all their errors,
+        # `lazy` stops at the first provider saying "not connected".
+        if evaluation not in self.EVALUATIONS:
+            evaluation = settings.SOCIAL_CONNECTED_EVALUATION
+        self.evaluation: str = evaluation
 
-        self.github = GithubConnected(source_dev, target_dev)
-        self.twitter = TwitterConnected(source_dev, target_dev)
+        self.github = GithubConnected(
+            source_dev, target_dev, deadline, github_organizations
+        )
+        self.twitter = TwitterConnected(source_dev, target_dev, deadline)
 
     def connected(
         self,
@@ -41,9 +89,42 @@ class SocialConnected:
         :return: a positive connected status
         if users are connected or a dict with a list of errors.
         """
-        github_connected, github_status = self.github.connected()
-        twitter_connected, twitter_status = self.twitter.connected()
+        with span(
+            'social_connected',
+            source_dev=self.source_developer,
+            target_dev=self.target_developer,
+            evaluation=self.evaluation,
+        ) as check_span:
+            response, status = self._connected(check_span)
+            check_span.set_attribute('status', status)
+        return response, status
+
+    def _connected(
+        self, check_span: Span
+    ) -> Union[Tuple[Dict[str, List], int], Tuple[Dict[str, bool], int]]:
+        cached = RESULT_CACHE.get(self.source_developer, self.target_developer)
+        check_span.set_attribute('cached', cached is not None)
+        if cached is not None:
+            return self._cached_response(cached)
+
+        try:
+            if self.evaluation == 'lazy':
+                results = self._evaluate_lazily()
+            else:
+                results = self._evaluate_fully()
+        except UpstreamUnavailable as exception:
+            return self._degraded_response(exception)
+        except DeadlineExceeded as exception:
+            return (
+                {
+                    'errors': [str(exception)],
+                    'deadline_exceeded': self.deadline.exceeded,
+                },
+                HTTP_504_GATEWAY_TIMEOUT,
+            )
 
+        github_connected, github_status = results['github']
+        twitter_connected, twitter_status = results['twitter']
         if 'errors' in github_connected or 'errors' in twitter_connected:
             status = HTTP_400_BAD_REQUEST
             # if Twitter or GitHub returns a status code other than 200
@@ -74,17 +155,158 @@ class SocialConnected:
                 # here connected is False
                 response['connected'] = connected
 
-            self._save_response(
-                connected,
-                github_connected.get('organizations', [])
-            )
+            try:
+                with timed('db'), span('db.save', connected=connected):
+                    self._save_response(
+                        connected,
+                        github_connected.get('organizations', [])
+                    )
+            except DeadlineExceeded:
+                # the check is answered, only its registry is skipped.
+                response['deadline_exceeded'] = self.deadline.exceeded
+            else:
+                RESULT_CACHE.set(
+                    self.source_developer, self.target_developer, response
+                )
 
         except (IntegrityError, Exception) as exception:
             response = {'errors': [str(exception)]}
             status = HTTP_500_INTERNAL_SERVER_ERROR
+            if self.deadline and self.deadline.expired():
+                self.deadline.exceed('db')
+                response['deadline_exceeded'] = self.deadline.exceeded
+                status = HTTP_504_GATEWAY_TIMEOUT
 
         return response, status
 
+    def _cached_response(self, response: Dict) -> Tuple[Dict, int]:
+        """
+        Answer a check from the result cache, recording it in the
+        registry as set by RESULT_CACHE_AUDIT.
+        """
+        try:
+            with timed('db'), span(
+                'db.audit', audit=settings.RESULT_CACHE_AUDIT
+            ):
+                # extending an interval is as light as it gets.
+                if settings.RESULT_CACHE_AUDIT == 'full' or (
+                    settings.RESULT_CACHE_AUDIT == 'light'
+                    and settings.REGISTRY_STORAGE_MODE == 'interval'
+                ):
+                    self._save_response(
+                        response['connected'],
+                        response.get('organizations', []),
+                    )
+                elif settings.RESULT_CACHE_AUDIT == 'light':
+                    self._save_cached_response(response)
+        except Exception as exception:
+            return {'errors': [str(exception)]}, HTTP_500_INTERNAL_SERVER_ERROR
+        return response, HTTP_200_OK
+
+    def _save_cached_response(self, response: Dict) -> None:
+        """
+        Save a cached result without reading the previous registries:
+        its registry, and its organizations linked to it.
+        """
+        with transaction.atomic():
+            transaction_id = uuid.uuid4()
+            registry = SocialRegistry.objects.create(
+                source_developer=self.source_developer,
+                target_developer=self.target_developer,
+                transaction_id=transaction_id,
+                connected=response['connected'],
+            )
+            if response['connected']:
+                CommonOrganizations.objects.bulk_create(
+                    [
+                        CommonOrganizations(
+                            social_registry=registry,
+                            organization=org,
+                            transaction_id=transaction_id,
+                        )
+                        for org in response.get('organizations', [])
+                    ],
+                    ignore_conflicts=True,
+                )
+
+    def _check(self, provider: str) -> Tuple[Dict, int]:
+        """
+        Run the check of a provider and record its statistics.
+        """
+        start = perf_counter()
+        with span(provider, provider=provider) as provider_span:
+            if provider == 'github':
+                with timed('github'):
+                    response, status = self.github.connected()
+            else:
+                response, status = self.twitter.connected()
+            provider_span.set_attribute('status', status)
+
+        PROVIDER_STATS.record(
+            provider,
+            'errors' not in response and not response.get('connected'),
+            perf_counter() - start,
+        )
+        return response, status
+
+    def _evaluate_fully(self) -> Dict[str, Tuple[Dict, int]]:
+        return {provider: self._check(provider) for provider in PROVIDERS}
+
+    def _evaluate_lazily(self) -> Dict[str, Tuple[Dict, int]]:
+        """
+        Check providers by ascending expected cost and skip the others
+        as soon as one says "not connected" or fails. Skipped providers
+        count as not connected.
+        """
+        results = {}
+        stopped = False
+        for provider in PROVIDER_STATS.order(PROVIDERS):
+            if stopped:
+                PROVIDER_CHECKS_SKIPPED.inc(provider=provider)
+                results[provider] = {'connected': False}, HTTP_200_OK
+                continue
+
+            response, status = results[provider] = self._check(provider)
+            stopped = 'errors' in response or not response['connected']
+        return results
+
+    def _degraded_response(
+        self, exception: UpstreamUnavailable
+    ) -> Tuple[Dict, int]:
+        """
+        Response given while a provider is unavailable. Depending on
+        CIRCUIT_BREAKER_FALLBACK, it is the last known registry of the
+        developers, marked as degraded, or an error.
+        """
+        error = {'errors': [str(exception)]}
+        if settings.CIRCUIT_BREAKER_FALLBACK != 'last_known':
+            return error, HTTP_503_SERVICE_UNAVAILABLE
+
+        try:
+            last_registry = SocialRegistry.objects.filter(
+                source_developer=self.source_developer,
+                target_developer=self.target_developer,
+            ).order_by('-registered_at', '-id').first()
+            if not last_registry:
+                return error, HTTP_503_SERVICE_UNAVAILABLE
+
+            response = {
+                'connected': last_registry.connected,
+                'degraded': True,
+                'registered_at': (
+                    last_registry.last_seen or last_registry.registered_at
+                ),
+            }
+            if last_registry.connected:
+                response['organizations'] = list(
+                    CommonOrganizations.objects.filter(
+                        transaction_id=last_registry.transaction_id
+                    ).values_list('organization', flat=True)
+                )
+        except Exception as exception:
+            return {'errors': [str(exception)]}, HTTP_500_INTERNAL_SERVER_ERROR
+        return response, HTTP_200_OK
+
     def _save_response(
         self,
         connected: bool,
@@ -96,8 +318,33 @@ class SocialConnected:
 
         Organizations are only saved if devs
         are connected in both Twitter and GitHub.
+
+        With REGISTRY_STORAGE_MODE set to interval, a check with the same
+        outcome and organizations as the previous one only extends the
+        registry of the previous one. A check with another outcome or
+        other organizations is published to the change streams, when
+        they are enabled on Postgres.
+
+        :raises DeadlineExceeded: if the deadline is already spent.
         """
+        stream = stream_enabled()
         with transaction.atomic():
+            if self.deadline:
+                self._set_statement_timeout(self.deadline.timeout('db'))
+            last_registry, last_organizations = None, set()
+            if settings.REGISTRY_STORAGE_MODE == 'interval' or stream:
+                last_registry, last_organizations = self._last_state()
+            changed = last_registry is None or (
+                last_registry.connected,
+                last_organizations,
+            ) != (connected, set(organizations) if connected else set())
+
+            if settings.REGISTRY_STORAGE_MODE == 'interval' and not changed:
+                SocialRegistry.objects.filter(id=last_registry.id).update(
+                    last_seen=timezone.now(), check_count=F('check_count') + 1
+                )
+                return
+
             first_registry = SocialRegistry.objects.filter(
                 source_developer=self.source_developer,
                 target_developer=self.target_developer,
@@ -127,3 +374,47 @@ class SocialConnected:
                     orgs,
                     ignore_conflicts=True
                 )
+
+            if stream and changed:
+                publish_change(
+                    self.source_developer,
+                    self.target_developer,
+                    connected,
+                    organizations if connected else [],
+                    last_registry.connected if last_registry else None,
+                    new_registry.registered_at,
+                )
+
+    def _last_state(self) -> Tuple[Optional[SocialRegistry], Set[str]]:
+        """
+        Latest registry of the developers, locked until the end of the
+        transaction, and its organizations.
+        """
+        last_registry = (
+            SocialRegistry.objects.select_for_update()
+            .filter(
+                source_developer=self.source_developer,
+                target_developer=self.target_developer,
+            )
+            .order_by('-registered_at', '-id')
+            .first()
+        )
+        if not last_registry or not last_registry.connected:
+            return last_registry, set()
+        return last_registry, set(
+            CommonOrganizations.objects.filter(
+                transaction_id=last_registry.transaction_id
+            ).values_list('organization', flat=True)
+        )
+
+    @staticmethod
+    def _set_statement_timeout(timeout: float) -> None:
+        """
+        Cancel the statements of the current transaction
+        running for longer than `timeout` seconds (Postgres only).
+        """
+        if connection.vendor != 'postgresql':
+            return
+        milliseconds = max(1, int(timeout * 1000))
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL statement_timeout = %s', [milliseconds])
@@ -1,15 +1,27 @@
 from urllib.parse import urljoin
-from typing import Dict, List, Union, Tuple
+from typing import Dict, List, Optional, Union, Tuple
 
 import requests
 
 from rest_framework.status import (
+    HTTP_200_OK,
     HTTP_404_NOT_FOUND,
     HTTP_429_TOO_MANY_REQUESTS,
 )
 
 from django.conf import settings
 
+from social_connected.controller_logic import upstream
+from social_connected.controller_logic.deadline import Deadline, phase_timeout
+from social_connected.controller_logic.identity_cache import IDENTITY_CACHE
+from social_connected.controller_logic.provider_cache import PROVIDER_CACHE
+from social_connected.json_codec import response_json
+from social_connected.timing import timed
+from social_connected.tracing import span
+
+# Twitter error codes of a user that does not exist or is suspended.
+USER_NOT_FOUND_CODES = {50, 63}
+
 
 class TwitterConnected:
     """
@@ -19,9 +31,18 @@ class TwitterConnected:
     they follow one another in twitter.
     """
 
-    def __init__(self, source_dev: str = '', target_dev: str = '') -> None:
+    def __init__(
+        self,
+        source_dev: str = '',
+        target_dev: str = '',
+        deadline: Optional[Deadline] = None,
+        fast: Optional[bool] = None,
+    ) -> None:
         self.source_dev: str = source_dev
         self.target_dev: str = target_dev
+        self.deadline: Optional[Deadline] = deadline
+        # fast mode skips users/lookup unless a user is missing.
+        self.fast: bool = settings.TWITTER_FAST_MODE if fast is None else fast
 
     def connected(self) -> Union[Dict[str, bool], Dict[str, List[str]]]:
         """
@@ -30,16 +51,60 @@ class TwitterConnected:
         :return: a dict stating if users are connected or a
         dict with errors.
         """
+        cached = PROVIDER_CACHE.get_relationship(
+            self.source_dev, self.target_dev
+        )
+        if cached is not None:
+            return cached, HTTP_200_OK
+
         headers = {'Authorization': settings.TWITTER_API_TOKEN}
+        if self.fast:
+            return self._fast_connected(headers)
+
         # checks if devs exist
         error_response, status = self._check_for_user_errors(headers)
         response = {'errors': error_response}
         # returns errors if one or more devs do not exist in twitter
         if not error_response:
-            response, status = self._read_relationship(headers)
+            response, status, _ = self._read_relationship(headers)
+
+        return response, status
+
+    def _fast_connected(
+        self, headers: Dict[str, str]
+    ) -> Union[Tuple[Dict[str, bool], int], Tuple[Dict[str, List], int]]:
+        """
+        Read the relationship in a single round trip. friendships/show
+        fails when a user does not exist or is suspended, without telling
+        which one, so users/lookup is only called in that case.
+        """
+        cached = self._cached_user_errors()
+        if cached is not None and cached[0]:
+            error_response, status = cached
+            return {'errors': error_response}, status
+
+        response, status, user_not_found = self._read_relationship(headers)
+        if not user_not_found:
+            return response, status
 
+        error_response, lookup_status = self._check_for_user_errors(headers)
+        if error_response:
+            return {'errors': error_response}, lookup_status
+        # both users exist according to users/lookup, e.g. a suspended
+        # user, we cannot tell which one is not valid.
         return response, status
 
+    @staticmethod
+    def _user_not_found(response) -> bool:
+        if not isinstance(response, dict):
+            return False
+        errors = response.get('errors')
+        return isinstance(errors, list) and any(
+            isinstance(error, dict)
+            and error.get('code') in USER_NOT_FOUND_CODES
+            for error in errors
+        )
+
     def _check_for_user_errors(self, headers: Dict[str, str]):
         """
         Checks if the user's (developer in this case)
@@ -49,8 +114,17 @@ class TwitterConnected:
         :return: List of errors or an empty list if
         no errors request is successful.
         """
-        response = self.__users_exist(headers)
-        json_response = response.json()
+        cached = self._cached_user_errors()
+        if cached is not None:
+            return cached
+
+        with timed('twitter_lookup'), span(
+            'twitter.lookup', provider='twitter'
+        ) as lookup_span:
+            response = self.__users_exist(headers)
+            lookup_span.set_attribute('status', response.status_code)
+        json_response = response_json(response)
+        self._remember_lookup(response.status_code, json_response)
 
         error_response = []
         if response.status_code == HTTP_404_NOT_FOUND:
@@ -76,37 +150,138 @@ class TwitterConnected:
 
         return error_response, response.status_code
 
+    def _cached_user_errors(self) -> Optional[Tuple[List[str], int]]:
+        """
+        Same result as `_check_for_user_errors` from the identity cache.
+
+        :return: None unless both users are in the cache.
+        """
+        developers = (self.source_dev, self.target_dev)
+        identities = IDENTITY_CACHE.get_many('twitter', developers)
+        if not all(developer in identities for developer in developers):
+            return None
+
+        error_response = [
+            f'{developer} is not a valid user in twitter'
+            for developer in developers
+            if not identities[developer].exists
+        ]
+        # users/lookup answers 404 only when no user exists.
+        status = HTTP_200_OK
+        if len(error_response) == len(developers):
+            status = HTTP_404_NOT_FOUND
+        return error_response, status
+
+    def _remember_lookup(self, status: int, json_response) -> None:
+        """
+        Record in the identity cache which users users/lookup found.
+        """
+        if status == HTTP_404_NOT_FOUND:
+            found = {}
+        elif status == HTTP_200_OK and isinstance(json_response, list):
+            found = {
+                user.get('screen_name', '').lower(): user.get('id')
+                for user in json_response
+            }
+        else:
+            return
+
+        for developer in (self.source_dev, self.target_dev):
+            IDENTITY_CACHE.remember(
+                'twitter',
+                developer,
+                exists=developer.lower() in found,
+                user_id=found.get(developer.lower()),
+            )
+
     def _read_relationship(
         self, headers: Dict[str, str]
-    ) -> Tuple[Dict[str, bool], int]:
+    ) -> Tuple[Dict, int, bool]:
         """
         Check if two users follow each other.
         :param headers: Authorization headers
 
-        :return: Connected status and the response status code.
+        :return: Connected status or errors, the response status code
+        and whether Twitter answered that a user does not exist.
         """
         # url to request for relationship in between two users in twitter
         friendship_url: str = urljoin(
             settings.TWITTER_API_BASE_URL, 'friendships/show.json'
         )
         request_params = self._request_params()
-        response = requests.get(
-            friendship_url, request_params, headers=headers
-        )
+        with timed('twitter_friendship'), span(
+            'twitter.friendship', provider='twitter'
+        ) as friendship_span, phase_timeout(
+            self.deadline, 'twitter_friendship'
+        ) as timeout:
+            response = upstream.get(
+                'twitter',
+                'friendships/show',
+                requests.get,
+                friendship_url,
+                request_params,
+                headers=headers,
+                timeout=timeout,
+            )
+            friendship_span.set_attribute('status', response.status_code)
 
-        json_response = response.json()
+        json_response = response_json(response)
 
         # in case twitter api reaches rate limiting
         if response.status_code == HTTP_429_TOO_MANY_REQUESTS:
-            return json_response, HTTP_429_TOO_MANY_REQUESTS
+            return json_response, HTTP_429_TOO_MANY_REQUESTS, False
+        # e.g. a missing or suspended user.
+        if 'relationship' not in json_response:
+            user_not_found = (
+                response.status_code != HTTP_200_OK
+                and self._user_not_found(json_response)
+            )
+            return (
+                {'errors': self._relationship_errors(json_response)},
+                response.status_code,
+                user_not_found,
+            )
 
         source = json_response['relationship']['source']
+        target = json_response['relationship'].get('target', {})
+        IDENTITY_CACHE.remember(
+            'twitter', self.source_dev, exists=True, user_id=source.get('id')
+        )
+        IDENTITY_CACHE.remember(
+            'twitter', self.target_dev, exists=True, user_id=target.get('id')
+        )
 
         # if both users follow each other they are twitter-connected
         local_response = {'connected': False}
         if source['following'] and source['followed_by']:
             local_response['connected'] = True
-        return local_response, response.status_code
+        if response.status_code == HTTP_200_OK:
+            PROVIDER_CACHE.set_relationship(
+                self.source_dev, self.target_dev, local_response
+            )
+        return local_response, response.status_code, False
+
+    def _relationship_errors(self, json_response) -> List[str]:
+        """
+        Error messages of a friendships/show response without a
+        relationship, Twitter's error objects turned into strings.
+        """
+        if self._user_not_found(json_response):
+            return [
+                f'{self.source_dev} or {self.target_dev} '
+                f'is not a valid user in twitter'
+            ]
+        errors = []
+        if isinstance(json_response, dict):
+            errors = json_response.get('errors')
+        if not isinstance(errors, list) or not errors:
+            return ['Twitter did not return the relationship']
+        return [
+            error.get('message', 'Twitter error')
+            if isinstance(error, dict)
+            else str(error)
+            for error in errors
+        ]
 
     def __users_exist(self, headers: Dict[str, str]) -> requests.Response:
         """
@@ -119,7 +294,16 @@ class TwitterConnected:
         screen_name = ','.join([self.source_dev, self.target_dev])
         request_params = {'screen_name': screen_name}
 
-        return requests.get(exist_url, request_params, headers=headers)
+        with phase_timeout(self.deadline, 'twitter_lookup') as timeout:
+            return upstream.get(
+                'twitter',
+                'users/lookup',
+                requests.get,
+                exist_url,
+                request_params,
+                headers=headers,
+                timeout=timeout,
+            )
 
     def _request_params(self) -> Dict[str, str]:
         """
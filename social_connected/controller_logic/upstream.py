@@ -0,0 +1,119 @@
+from time import perf_counter
+from typing import Callable
+
+import requests
+from rest_framework.status import (
+    HTTP_403_FORBIDDEN,
+    HTTP_429_TOO_MANY_REQUESTS,
+    HTTP_500_INTERNAL_SERVER_ERROR,
+)
+
+from django.conf import settings
+
+from social_connected.controller_logic.circuit_breaker import (
+    BREAKERS,
+    UpstreamUnavailable,
+)
+from social_connected.controller_logic.hedging import HEDGER
+from social_connected.metrics import (
+    UPSTREAM_LATENCY,
+    UPSTREAM_RATE_LIMIT_REMAINING,
+    UPSTREAM_RATE_LIMITED,
+    UPSTREAM_RESPONSES,
+)
+
+# Header holding the remaining calls of the rate limit window.
+RATE_LIMIT_REMAINING_HEADERS = {
+    'github': 'X-RateLimit-Remaining',
+    'twitter': 'x-rate-limit-remaining',
+}
+
+
+def get(
+    provider: str,
+    endpoint: str,
+    send: Callable[..., requests.Response],
+    *args,
+    **kwargs,
+) -> requests.Response:
+    """
+    Perform an upstream GET through `send` (e.g. `requests.get` or
+    a session's get), or a read only POST such as a GraphQL query,
+    and record its latency, status and rate limits.
+    Calls are hedged for the providers in UPSTREAM_HEDGING_PROVIDERS
+    and go through the circuit breaker of the provider.
+
+    :param provider: name of the upstream API, github or twitter.
+    :param endpoint: endpoint name used to label metrics.
+    :param send: callable performing the request.
+    :raises UpstreamUnavailable: if the circuit breaker is open
+     or the call fails.
+    :return: the upstream response.
+    """
+    breaker = BREAKERS.get(provider)
+    if settings.CIRCUIT_BREAKER_ENABLED and not breaker.allow():
+        raise UpstreamUnavailable(provider, 'circuit breaker is open')
+
+    start = perf_counter()
+    try:
+        if HEDGER.enabled(provider):
+            response = HEDGER.call(provider, endpoint, send, *args, **kwargs)
+        else:
+            response = send(*args, **kwargs)
+    except requests.RequestException as exception:
+        latency = perf_counter() - start
+        UPSTREAM_RESPONSES.inc(
+            provider=provider, endpoint=endpoint, status='error'
+        )
+        UPSTREAM_LATENCY.observe(latency, provider=provider, endpoint=endpoint)
+        if settings.CIRCUIT_BREAKER_ENABLED:
+            if _deadline_timeout(exception, kwargs.get('timeout')):
+                breaker.release()
+            else:
+                breaker.record(True, latency)
+        raise UpstreamUnavailable(provider, str(exception)) from exception
+    except Exception:
+        if settings.CIRCUIT_BREAKER_ENABLED:
+            breaker.record(True, perf_counter() - start)
+        raise
+
+    latency = perf_counter() - start
+    UPSTREAM_LATENCY.observe(latency, provider=provider, endpoint=endpoint)
+    UPSTREAM_RESPONSES.inc(
+        provider=provider, endpoint=endpoint, status=response.status_code
+    )
+    if settings.CIRCUIT_BREAKER_ENABLED:
+        breaker.record(
+            response.status_code >= HTTP_500_INTERNAL_SERVER_ERROR, latency
+        )
+    _record_rate_limit(provider, response)
+    return response
+
+
+def _deadline_timeout(exception: Exception, timeout) -> bool:
+    """
+    Whether the call timed out because the request deadline shortened
+    its timeout below UPSTREAM_TIMEOUT, not because the provider is slow.
+    """
+    return (
+        isinstance(exception, requests.Timeout)
+        and isinstance(timeout, (int, float))
+        and timeout < settings.UPSTREAM_TIMEOUT
+    )
+
+
+def _record_rate_limit(provider: str, response: requests.Response) -> None:
+    remaining = response.headers.get(RATE_LIMIT_REMAINING_HEADERS[provider])
+    try:
+        remaining = int(remaining)
+    except (TypeError, ValueError):
+        remaining = None
+
+    if remaining is not None:
+        UPSTREAM_RATE_LIMIT_REMAINING.set(remaining, provider=provider)
+
+    # GitHub answers 403 once the rate limit is exhausted.
+    if response.status_code == HTTP_429_TOO_MANY_REQUESTS or (
+        response.status_code == HTTP_403_FORBIDDEN and remaining == 0
+    ):
+        UPSTREAM_RATE_LIMITED.inc(provider=provider)
@@ -0,0 +1,72 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+
+# Cookie of the clients that wrote recently, whose reads go to the
+# primary until the replicas have caught up with their writes.
+PRIMARY_COOKIE = 'read_primary'
+
+# Database the reads of the current block are routed to. None routes
+# them to the primary, outside of `replica_reads` blocks as well.
+_read_alias: ContextVar[Optional[str]] = ContextVar('read_alias', default=None)
+
+
+@contextmanager
+def replica_reads(request: Optional[HttpRequest] = None) -> Iterator[None]:
+    """
+    Route the reads of the block to one of the DATABASE_REPLICAS, picked
+    at random, or to the primary when the client of `request` wrote
+    recently. Only read-only paths may use it, writes always go to the
+    primary.
+    """
+    alias = None
+    if settings.DATABASE_REPLICAS and not (
+        request is not None and PRIMARY_COOKIE in request.COOKIES
+    ):
+        alias = random.choice(settings.DATABASE_REPLICAS)
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def stick_to_primary(response: HttpResponse) -> HttpResponse:
+    """
+    Send the next reads of the client to the primary for
+    DATABASE_REPLICA_STICKY_SECONDS, so they see its writes.
+    """
+    if settings.DATABASE_REPLICAS:
+        response.set_cookie(
+            PRIMARY_COOKIE,
+            '1',
+            max_age=settings.DATABASE_REPLICA_STICKY_SECONDS,
+            httponly=True,
+            samesite='Lax',
+        )
+    return response
+
+
+class ReplicaRouter:
+    """
+    Send the reads of `replica_reads` blocks to a replica and everything
+    else to the primary. Replicas are copies of the primary, so relations
+    are allowed between any of them and migrations only run on the
+    primary.
+    """
+
+    def db_for_read(self, model, **hints) -> str:
+        return _read_alias.get() or 'default'
+
+    def db_for_write(self, model, **hints) -> str:
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool:
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints) -> bool:
+        return db not in settings.DATABASE_REPLICAS
@@ -0,0 +1,113 @@
+"""
+JSON codec of the upstream responses and of the API payloads.
+
+JSON_CODEC picks the codec: `orjson`, `stdlib`, or `auto` (the default)
+for orjson when it is installed and the standard library otherwise.
+The stdlib codec encodes like DRF's JSONRenderer, orjson output only
+differs in the formatting of floats.
+"""
+import json
+from typing import Any, Dict, Type, Union
+
+import requests
+from rest_framework.utils.encoders import JSONEncoder
+
+from django.conf import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class StdlibCodec:
+    name: str = 'stdlib'
+
+    @staticmethod
+    def loads(data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+    @staticmethod
+    def dumps(value: Any) -> bytes:
+        return json.dumps(
+            value,
+            cls=JSONEncoder,
+            ensure_ascii=False,
+            separators=(',', ':'),
+        ).encode()
+
+
+class OrjsonCodec:
+    """
+    orjson encodes the types DRF's encoder does, datetimes, UUIDs,
+    dataclasses... natively, and the others, e.g. Decimal or lazy
+    strings, with DRF's encoder.
+    """
+
+    name: str = 'orjson'
+    options: int = (
+        orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z if orjson else 0
+    )
+
+    def __init__(self) -> None:
+        self._default = JSONEncoder().default
+
+    @staticmethod
+    def loads(data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+    def dumps(self, value: Any) -> bytes:
+        try:
+            return orjson.dumps(
+                value, default=self._default, option=self.options
+            )
+        except orjson.JSONEncodeError:
+            # e.g. integers over 64 bits.
+            return StdlibCodec.dumps(value)
+
+
+CODECS: Dict[str, Type] = {'stdlib': StdlibCodec, 'orjson': OrjsonCodec}
+
+_codecs: Dict[str, Any] = {}
+
+
+def get_codec():
+    """
+    The codec set by JSON_CODEC.
+
+    :raises ImportError: if it is not installed.
+    """
+    name = settings.JSON_CODEC
+    if name == 'auto':
+        name = 'orjson' if orjson else 'stdlib'
+    if name not in _codecs:
+        if name == 'orjson' and orjson is None:
+            raise ImportError('JSON_CODEC is orjson but it is not installed')
+        _codecs[name] = CODECS[name]()
+    return _codecs[name]
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    return get_codec().loads(data)
+
+
+def dumps(value: Any) -> bytes:
+    return get_codec().dumps(value)
+
+
+class CodecDecoder(json.JSONDecoder):
+    """
+    Decoder handing the documents to the codec, for the APIs taking a
+    `json.loads` decoder class.
+    """
+
+    def decode(self, document: str, *args) -> Any:
+        return loads(document)
+
+
+def response_json(response: requests.Response) -> Any:
+    """
+    Decode the body of an upstream response with the codec. requests
+    still detects its encoding.
+    """
+    return response.json(cls=CodecDecoder)
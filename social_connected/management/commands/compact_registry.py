@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from social_connected.controller_logic.registry import compact_registries
+
+
+class Command(BaseCommand):
+    help = (
+        'Merge the consecutive registries of every pair with the same '
+        'outcome and organizations, as interval storage writes them. '
+        'Compacted histories are left as they are, it may run again.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if settings.REGISTRY_STORAGE_MODE != 'interval':
+            raise CommandError(
+                'REGISTRY_STORAGE_MODE must be interval, per check '
+                'histories are kept as they are'
+            )
+
+        merged = compact_registries(options['batch_size'])
+        self.stdout.write(f'Merged {merged} registries')
@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from social_connected.controller_logic import retention
+
+
+class Command(BaseCommand):
+    help = (
+        'Create the registry partitions of the next months and expire '
+        'the registries older than the retention, once rolled up into '
+        'daily aggregates. Meant to run daily.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            help='months of partitions created ahead, '
+            'REGISTRY_PARTITION_MONTHS_AHEAD by default',
+        )
+        parser.add_argument(
+            '--retention-months',
+            type=int,
+            help='months of registries kept, 0 keeps them forever, '
+            'REGISTRY_RETENTION_MONTHS by default',
+        )
+        parser.add_argument(
+            '--archive-mode',
+            choices=['drop', 'detach'],
+            help='what to do with expired partitions, '
+            'REGISTRY_ARCHIVE_MODE by default',
+        )
+
+    def handle(self, *args, **options):
+        months_ahead = options['months_ahead']
+        if months_ahead is None:
+            months_ahead = settings.REGISTRY_PARTITION_MONTHS_AHEAD
+        retention_months = options['retention_months']
+        if retention_months is None:
+            retention_months = settings.REGISTRY_RETENTION_MONTHS
+
+        if retention.is_partitioned():
+            created = retention.create_partitions(months_ahead)
+            self.stdout.write(f'Partitions up to {created[-1]}')
+
+        if not retention_months:
+            return
+        cutoff = retention.add_months(
+            retention.month_start(timezone.now()), -retention_months
+        )
+        expired = retention.expire_before(cutoff, options['archive_mode'])
+        self.stdout.write(
+            f'Expired the registries of {len(expired)} months before '
+            f'{cutoff:%Y-%m}'
+        )
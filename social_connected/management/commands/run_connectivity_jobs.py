@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from social_connected.controller_logic.jobs import JobWorker
+
+
+class Command(BaseCommand):
+    help = (
+        'Run the queued connectivity jobs. Several workers may run at '
+        'once, each job is claimed by a single one.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='checks run concurrently, JOBS_WORKERS by default',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='jobs claimed at once, the number of workers by default',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            help='seconds between polls of an empty queue, '
+            'JOBS_POLL_INTERVAL by default',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='run the queued jobs and exit',
+        )
+
+    def handle(self, *args, **options):
+        worker = JobWorker(
+            options['workers'], options['batch_size'], options['poll_interval']
+        )
+        if not options['once']:
+            worker.run_forever()
+
+        total = 0
+        while count := worker.run_once():
+            total += count
+        self.stdout.write(f'Ran {total} connectivity jobs')
@@ -0,0 +1,361 @@
+"""
+Minimal metrics in the Prometheus text exposition format.
+
+Each process keeps its samples in memory. When METRICS_MULTIPROC_DIR
+is set, e.g. when running several gunicorn workers, every process
+also writes its samples to its own file in that directory, and
+collecting merges the files of all processes: counters and
+histograms are summed, gauges are aggregated over live processes
+according to their multiprocess mode.
+"""
+import json
+import os
+import threading
+import time
+from glob import glob
+from os.path import join
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+
+Labels = Tuple[Tuple[str, str], ...]
+SampleKey = Tuple[str, Labels]
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class MetricsRegistry:
+    """
+    Hold the samples of the metrics registered to it.
+    """
+
+    def __init__(self) -> None:
+        self.metrics: Dict[str, 'Metric'] = {}
+        self._sample_metrics: Dict[str, 'Metric'] = {}
+        self._values: Dict[SampleKey, float] = {}
+        self._lock = threading.Lock()
+        self._dirty: bool = False
+        self._flusher_pid: Optional[int] = None
+
+    def register(self, metric: 'Metric') -> None:
+        if metric.name in self.metrics:
+            raise ValueError(f'Metric {metric.name} is already registered.')
+        self.metrics[metric.name] = metric
+        for sample_name in metric.sample_names():
+            self._sample_metrics[sample_name] = metric
+
+    def add(self, samples: Iterable[Tuple[str, Labels, float]]) -> None:
+        """
+        Add amounts to samples, creating them when needed.
+        """
+        with self._lock:
+            for sample_name, labels, amount in samples:
+                key = (sample_name, labels)
+                self._values[key] = self._values.get(key, 0.0) + amount
+            self._dirty = True
+        self._ensure_flusher()
+
+    def set(self, sample_name: str, labels: Labels, value: float) -> None:
+        with self._lock:
+            self._values[(sample_name, labels)] = value
+            self._dirty = True
+        self._ensure_flusher()
+
+    def snapshot(self) -> Dict[SampleKey, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    # multiprocess aggregation
+
+    @staticmethod
+    def multiproc_dir() -> Optional[str]:
+        return getattr(settings, 'METRICS_MULTIPROC_DIR', None)
+
+    def _ensure_flusher(self) -> None:
+        """
+        Start a flushing thread in multiprocess mode. Checking
+        the pid starts a new thread in forked worker processes.
+        """
+        if not self.multiproc_dir() or self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        threading.Thread(target=self._flush_periodically, daemon=True).start()
+
+    def _flush_periodically(self) -> None:
+        while True:
+            time.sleep(settings.METRICS_FLUSH_INTERVAL)
+            if self._dirty:
+                self.flush()
+
+    def flush(self) -> None:
+        """
+        Atomically write the samples of this process to its file.
+        """
+        directory = self.multiproc_dir()
+        if not directory:
+            return
+        with self._lock:
+            samples = [
+                [name, list(labels), value]
+                for (name, labels), value in self._values.items()
+            ]
+            self._dirty = False
+        path = join(directory, f'metrics_{os.getpid()}.json')
+        temporary_path = f'{path}.tmp'
+        with open(temporary_path, 'w') as samples_file:
+            json.dump({'samples': samples}, samples_file)
+        os.replace(temporary_path, path)
+
+    def collect(self) -> Dict[SampleKey, float]:
+        """
+        Samples of this process, or of all processes in
+        multiprocess mode.
+        """
+        directory = self.multiproc_dir()
+        if not directory:
+            return self.snapshot()
+
+        self.flush()
+        merged: Dict[SampleKey, float] = {}
+        for path in glob(join(directory, 'metrics_*.json')):
+            pid = int(path.rsplit('_', 1)[1].split('.')[0])
+            try:
+                with open(path) as samples_file:
+                    samples = json.load(samples_file)['samples']
+            except (OSError, ValueError):
+                continue
+            alive = _process_alive(pid)
+            for sample_name, labels, value in samples:
+                metric = self._sample_metrics.get(sample_name)
+                if metric is None:
+                    continue
+                key = (sample_name, tuple(tuple(pair) for pair in labels))
+                metric.merge(merged, key, value, alive)
+        return merged
+
+    def exposition(self) -> str:
+        """
+        Render all samples in the Prometheus text format.
+        """
+        samples = self.collect()
+        by_metric: Dict[str, List[Tuple[SampleKey, float]]] = {}
+        for key, value in samples.items():
+            metric = self._sample_metrics.get(key[0])
+            if metric is not None:
+                by_metric.setdefault(metric.name, []).append((key, value))
+
+        lines = []
+        for name, metric in sorted(self.metrics.items()):
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.type}')
+            for (sample_name, labels), value in sorted(
+                by_metric.get(name, []), key=_sample_order
+            ):
+                lines.append(
+                    f'{sample_name}{_format_labels(labels)} {float(value)!r}'
+                )
+        return '\n'.join(lines) + '\n'
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _sample_order(item: Tuple[SampleKey, float]):
+    (sample_name, labels), _ = item
+    # keep histogram buckets in ascending order.
+    return (
+        sample_name,
+        tuple(
+            (name, float(value) if name == 'le' else value)
+            for name, value in labels
+        ),
+    )
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(
+            name,
+            value.replace('\\', r'\\')
+            .replace('\n', r'\n')
+            .replace('"', r'\"'),
+        )
+        for name, value in labels
+    )
+    return f'{{{pairs}}}'
+
+
+REGISTRY = MetricsRegistry()
+
+
+class Metric:
+    type: str = ''
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: MetricsRegistry = REGISTRY,
+    ) -> None:
+        self.name: str = name
+        self.documentation: str = documentation
+        self.labelnames: Tuple[str, ...] = tuple(labelnames)
+        self.registry: MetricsRegistry = registry
+        registry.register(self)
+
+    def sample_names(self) -> Tuple[str, ...]:
+        return (self.name,)
+
+    def _labels(self, labels: Dict[str, object]) -> Labels:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f'{self.name} expects labels {self.labelnames}, '
+                f'got {tuple(labels)}.'
+            )
+        return tuple((name, str(labels[name])) for name in self.labelnames)
+
+    def merge(
+        self,
+        merged: Dict[SampleKey, float],
+        key: SampleKey,
+        value: float,
+        alive: bool,
+    ) -> None:
+        """
+        Merge the sample of one process into the aggregated samples.
+        """
+        merged[key] = merged.get(key, 0.0) + value
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        self.registry.add([(self.name, self._labels(labels), amount)])
+
+
+class Gauge(Metric):
+    """
+    A value that goes up and down. In multiprocess mode values
+    of dead processes are dropped, the others are aggregated
+    with `multiprocess_mode`: `livesum`, `min` or `max`.
+    """
+
+    type = 'gauge'
+
+    def __init__(
+        self, *args, multiprocess_mode: str = 'livesum', **kwargs
+    ) -> None:
+        if multiprocess_mode not in ('livesum', 'min', 'max'):
+            raise ValueError(f'Unknown multiprocess mode {multiprocess_mode}')
+        self.multiprocess_mode: str = multiprocess_mode
+        super().__init__(*args, **kwargs)
+
+    def set(self, value: float, **labels: object) -> None:
+        self.registry.set(self.name, self._labels(labels), value)
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        self.registry.add([(self.name, self._labels(labels), amount)])
+
+    def dec(self, amount: float = 1.0, **labels: object) -> None:
+        self.inc(-amount, **labels)
+
+    def merge(self, merged, key, value, alive) -> None:
+        if not alive:
+            return
+        if key not in merged or self.multiprocess_mode == 'livesum':
+            super().merge(merged, key, value, alive)
+        elif self.multiprocess_mode == 'min':
+            merged[key] = min(merged[key], value)
+        else:
+            merged[key] = max(merged[key], value)
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(
+        self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs
+    ) -> None:
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+        super().__init__(*args, **kwargs)
+
+    def sample_names(self) -> Tuple[str, ...]:
+        return tuple(
+            f'{self.name}{suffix}' for suffix in ('_bucket', '_sum', '_count')
+        )
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = self._labels(labels)
+        bucket = f'{self.name}_bucket'
+        # buckets are cumulative, so processes can be merged by summing.
+        samples = [
+            (
+                bucket,
+                key + (('le', repr(float(bound))),),
+                float(value <= bound),
+            )
+            for bound in self.buckets
+        ]
+        samples.append((bucket, key + (('le', '+Inf'),), 1.0))
+        samples.append((f'{self.name}_sum', key, value))
+        samples.append((f'{self.name}_count', key, 1.0))
+        self.registry.add(samples)
+
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'Latency of the requests per view.',
+    ['view', 'method', 'status'],
+)
+DB_QUERIES = Histogram(
+    'http_request_db_queries',
+    'Database queries run per request per view.',
+    ['view'],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100),
+)
+UPSTREAM_LATENCY = Histogram(
+    'upstream_request_duration_seconds',
+    'Latency of the upstream API calls per provider and endpoint.',
+    ['provider', 'endpoint'],
+)
+UPSTREAM_RESPONSES = Counter(
+    'upstream_responses_total',
+    'Upstream API responses per provider, endpoint and status code.',
+    ['provider', 'endpoint', 'status'],
+)
+UPSTREAM_RATE_LIMITED = Counter(
+    'upstream_rate_limited_total',
+    'Upstream API calls rejected by rate limiting per provider.',
+    ['provider'],
+)
+UPSTREAM_RATE_LIMIT_REMAINING = Gauge(
+    'upstream_rate_limit_remaining',
+    'Remaining upstream API calls in the rate limit window per provider.',
+    ['provider'],
+    multiprocess_mode='min',
+)
+CACHE_REQUESTS = Counter(
+    'cache_requests_total',
+    'Cache lookups per cache and result (hit or miss).',
+    ['cache', 'result'],
+)
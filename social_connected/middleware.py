@@ -0,0 +1,122 @@
+import json
+import logging
+import random
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+
+from social_connected.metrics import DB_QUERIES, REQUEST_LATENCY
+from social_connected.timing import current_timer, request_timer
+from social_connected.tracing import trace
+
+logger = logging.getLogger(__name__)
+
+
+class ServerTimingMiddleware:
+    """
+    Time the phases of a sampled share of the requests.
+    Timings are returned in a Server-Timing header and logged
+    as one JSON line per request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.SERVER_TIMING_SAMPLE_RATE:
+            return self.get_response(request)
+
+        with request_timer() as timer:
+            response = self.get_response(request)
+
+        response['Server-Timing'] = timer.server_timing()
+
+        match = request.resolver_match
+        logger.info(
+            json.dumps(
+                {
+                    'event': 'request_timing',
+                    'method': request.method,
+                    'path': request.path,
+                    'view': match.url_name if match else None,
+                    'status': response.status_code,
+                    'total_ms': round(timer.total() * 1000, 3),
+                    'phases_ms': timer.phases_ms(),
+                }
+            )
+        )
+        return response
+
+    def process_template_response(self, request, response):
+        """
+        DRF responses are rendered once the view returns.
+        Time the rendering with a post render callback.
+        """
+        timer = current_timer()
+        if timer is not None:
+            start = perf_counter()
+            response.add_post_render_callback(
+                lambda _: timer.add('render', perf_counter() - start)
+            )
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Record the latency and the number of database queries
+    of every request, labelled by view.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = 0
+
+        def count_queries(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        start = perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(count_queries))
+            response = self.get_response(request)
+        duration = perf_counter() - start
+
+        match = request.resolver_match
+        view = match.url_name if match else 'unmatched'
+        REQUEST_LATENCY.observe(
+            duration,
+            view=view,
+            method=request.method,
+            status=response.status_code,
+        )
+        DB_QUERIES.observe(queries, view=view)
+        return response
+
+
+class TracingMiddleware:
+    """
+    Trace a sampled share of the requests, TRACING_SAMPLE_RATE, from
+    their root span. Sampled responses name their trace in a X-Trace-Id
+    header.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with trace(
+            'request', method=request.method, path=request.path
+        ) as root:
+            response = self.get_response(request)
+            match = request.resolver_match
+            root.set_attribute('view', match.url_name if match else None)
+            root.set_attribute('status', response.status_code)
+        if root.trace_id is not None:
+            response['X-Trace-Id'] = root.trace_id
+        return response
@@ -0,0 +1,85 @@
+# Generated by Django 3.2 on 2026-10-19 14:56
+
+import django.core.serializers.json
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social_connected', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConnectivityJob',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'source_developer',
+                    models.CharField(
+                        help_text='Username of source developer', max_length=80
+                    ),
+                ),
+                (
+                    'target_developer',
+                    models.CharField(
+                        help_text='Username of target developer', max_length=80
+                    ),
+                ),
+                (
+                    'status',
+                    models.CharField(
+                        choices=[
+                            ('pending', 'Pending'),
+                            ('running', 'Running'),
+                            ('done', 'Done'),
+                            ('failed', 'Failed'),
+                        ],
+                        default='pending',
+                        max_length=10,
+                    ),
+                ),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                (
+                    'result',
+                    models.JSONField(
+                        blank=True,
+                        help_text='Response of the check.',
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                        null=True,
+                    ),
+                ),
+                (
+                    'result_status',
+                    models.PositiveSmallIntegerField(
+                        blank=True,
+                        help_text='Status code of the check.',
+                        null=True,
+                    ),
+                ),
+                (
+                    'created_at',
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='connectivityjob',
+            index=models.Index(
+                fields=['status', 'created_at'],
+                name='connectivity_job_queue_idx',
+            ),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 3.2 on 2026-10-19 15:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social_connected', '0002_connectivityjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='socialregistry',
+            name='check_count',
+            field=models.PositiveIntegerField(
+                default=1, help_text='Number of checks with this outcome.'
+            ),
+        ),
+        migrations.AddField(
+            model_name='socialregistry',
+            name='last_seen',
+            field=models.DateTimeField(
+                blank=True,
+                help_text='Time of the last check, if there are several.',
+                null=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name='commonorganizations',
+            name='transaction_id',
+            field=models.CharField(
+                db_index=True,
+                help_text='Matching transaction number.',
+                max_length=40,
+            ),
+        ),
+    ]
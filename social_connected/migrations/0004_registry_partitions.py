@@ -0,0 +1,166 @@
+# Generated by Django 3.2 on 2026-10-19 15:04
+
+from datetime import datetime
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils import timezone
+
+# months of partitions created ahead, `manage.py maintain_registry`
+# creates the next ones.
+MONTHS_AHEAD = 3
+
+
+# copies of the helpers of social_connected.controller_logic.retention
+# when this migration was written, so that it does not change with them.
+def month_start(moment: datetime) -> datetime:
+    moment = moment.astimezone(timezone.utc)
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    year, index = divmod(month.month - 1 + months, 12)
+    return month.replace(year=month.year + year, month=index + 1)
+
+
+def create_partition(cursor, quote, month: datetime, table: str) -> None:
+    name = quote(f'{table}_{month.year:04d}_{month.month:02d}')
+    cursor.execute(
+        f'CREATE TABLE IF NOT EXISTS {name} '
+        f'PARTITION OF {quote(table)} '
+        'FOR VALUES FROM (%s) TO (%s)',
+        [month, add_months(month, 1)],
+    )
+
+
+def partition_registry(apps, schema_editor):
+    """
+    Turn the registry table into a table partitioned by month of
+    registered_at, with the existing registries moved into their
+    partitions. Postgres only, other databases keep a plain table.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+
+    table = 'social_connected_socialregistry'
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'ALTER TABLE {quote(table)} RENAME TO {quote(table + "_old")}'
+        )
+        cursor.execute(
+            f'CREATE TABLE {quote(table)} '
+            f'(LIKE {quote(table + "_old")} INCLUDING DEFAULTS) '
+            'PARTITION BY RANGE (registered_at)'
+        )
+        # primary keys of partitioned tables include the partition key.
+        cursor.execute(
+            f'ALTER TABLE {quote(table)} '
+            f'ADD PRIMARY KEY (id, registered_at)'
+        )
+        cursor.execute(
+            f'CREATE INDEX {quote(table + "_pair_idx")} ON {quote(table)} '
+            '(source_developer, target_developer, registered_at)'
+        )
+        cursor.execute(
+            f'CREATE INDEX {quote(table + "_transaction_idx")} '
+            f'ON {quote(table)} (transaction_id)'
+        )
+        cursor.execute(
+            f'SELECT MIN(registered_at) FROM {quote(table + "_old")}'
+        )
+        (oldest,) = cursor.fetchone()
+        month = month_start(oldest or timezone.now())
+        last = add_months(month_start(timezone.now()), MONTHS_AHEAD)
+        while month <= last:
+            create_partition(cursor, quote, month, table)
+            month = add_months(month, 1)
+        # registries out of the monthly partitions, like clock skewed ones.
+        cursor.execute(
+            f'CREATE TABLE {quote(table + "_default")} '
+            f'PARTITION OF {quote(table)} DEFAULT'
+        )
+        cursor.execute(
+            f'INSERT INTO {quote(table)} '
+            f'SELECT * FROM {quote(table + "_old")}'
+        )
+        cursor.execute(
+            f'ALTER SEQUENCE {quote(table + "_id_seq")} '
+            f'OWNED BY {quote(table)}.id'
+        )
+        cursor.execute(f'DROP TABLE {quote(table + "_old")} CASCADE')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social_connected', '0003_registry_intervals'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistryDailyRollup',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'source_developer',
+                    models.CharField(
+                        help_text='Username of source developer', max_length=80
+                    ),
+                ),
+                (
+                    'target_developer',
+                    models.CharField(
+                        help_text='Username of target developer', max_length=80
+                    ),
+                ),
+                ('date', models.DateField()),
+                ('checks', models.PositiveIntegerField(default=0)),
+                ('connected_checks', models.PositiveIntegerField(default=0)),
+                ('first_seen', models.DateTimeField()),
+                ('last_seen', models.DateTimeField()),
+                (
+                    'organizations',
+                    models.JSONField(
+                        default=list,
+                        help_text='Organizations common to both developers during the day.',
+                    ),
+                ),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='commonorganizations',
+            name='social_registry',
+            field=models.ForeignKey(
+                db_constraint=False,
+                on_delete=django.db.models.deletion.DO_NOTHING,
+                to='social_connected.socialregistry',
+            ),
+        ),
+        migrations.AlterField(
+            model_name='socialregistry',
+            name='transaction_id',
+            field=models.CharField(
+                db_index=True,
+                help_text='Matching transaction number.',
+                max_length=40,
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name='registrydailyrollup',
+            constraint=models.UniqueConstraint(
+                fields=('source_developer', 'target_developer', 'date'),
+                name='registry_daily_rollup_pair_date',
+            ),
+        ),
+        migrations.RunPython(partition_registry, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,4 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.utils import timezone
 
@@ -25,16 +26,28 @@ class SocialRegistry(models.Model):
         db_index=True,
         help_text='Username of target developer',
     )
+    # not unique (though unique by construction): a unique index of a
+    # partitioned table must include its partition key, registered_at.
     transaction_id = models.CharField(
         max_length=40,
         blank=False,
         null=False,
-        unique=True,
+        db_index=True,
         help_text='Matching transaction number.',
     )
     connected = models.BooleanField(default=False)
 
     registered_at = models.DateTimeField(default=timezone.now)
+    # in interval storage a registry stands for all the checks with the
+    # same outcome, from registered_at (the first one) to last_seen.
+    last_seen = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text='Time of the last check, if there are several.',
+    )
+    check_count = models.PositiveIntegerField(
+        default=1, help_text='Number of checks with this outcome.',
+    )
 
     def __str__(self):  # pragma: no cover
         return f'Record of {self.source_developer} ' \
@@ -50,14 +63,22 @@ class CommonOrganizations(models.Model):
     and at a later stage they reconnect.
     """
 
+    # without a database constraint, a foreign key cannot reference
+    # a partitioned table without its partition key. Organizations are
+    # linked to the first registry of two developers, they are removed
+    # with their own registry (same transaction id), not that one.
     social_registry = models.ForeignKey(
-        SocialRegistry, on_delete=models.CASCADE, null=False, blank=False,
+        SocialRegistry,
+        on_delete=models.DO_NOTHING,
+        null=False,
+        blank=False,
+        db_constraint=False,
     )
     transaction_id = models.CharField(
         max_length=40,
         blank=False,
         null=False,
-        unique=True,
+        db_index=True,
         help_text='Matching transaction number.',
     )
     organization = models.CharField(
@@ -69,3 +90,105 @@ class CommonOrganizations(models.Model):
 
     def __str__(self):  # pragma: no cover
         return f'{self.organization}'
+
+
+class ConnectivityJob(models.Model):
+    """
+    Represents a connectivity check submitted to be run asynchronously
+    by the `run_connectivity_jobs` worker. Its result is saved to the
+    registry as for realtime checks and kept here for polling.
+    """
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    source_developer = models.CharField(
+        max_length=80,
+        blank=False,
+        null=False,
+        help_text='Username of source developer',
+    )
+    target_developer = models.CharField(
+        max_length=80,
+        blank=False,
+        null=False,
+        help_text='Username of target developer',
+    )
+    status = models.CharField(
+        max_length=10, choices=STATUSES, default=PENDING,
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    result = models.JSONField(
+        null=True,
+        blank=True,
+        encoder=DjangoJSONEncoder,
+        help_text='Response of the check.',
+    )
+    result_status = models.PositiveSmallIntegerField(
+        null=True, blank=True, help_text='Status code of the check.',
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['status', 'created_at'],
+                name='connectivity_job_queue_idx',
+            ),
+        ]
+
+    def __str__(self):  # pragma: no cover
+        return f'Job {self.id} of {self.source_developer} ' \
+               f'and {self.target_developer}'
+
+
+class RegistryDailyRollup(models.Model):
+    """
+    Represents the checks of two developers during a day. Registries
+    are summarised into rollups before they expire, so that their
+    daily history outlives them.
+    """
+
+    source_developer = models.CharField(
+        max_length=80,
+        blank=False,
+        null=False,
+        help_text='Username of source developer',
+    )
+    target_developer = models.CharField(
+        max_length=80,
+        blank=False,
+        null=False,
+        help_text='Username of target developer',
+    )
+    date = models.DateField()
+    checks = models.PositiveIntegerField(default=0)
+    connected_checks = models.PositiveIntegerField(default=0)
+    first_seen = models.DateTimeField()
+    last_seen = models.DateTimeField()
+    organizations = models.JSONField(
+        default=list,
+        help_text='Organizations common to both developers during the day.',
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['source_developer', 'target_developer', 'date'],
+                name='registry_daily_rollup_pair_date',
+            ),
+        ]
+
+    def __str__(self):  # pragma: no cover
+        return f'Rollup of {self.source_developer} ' \
+               f'and {self.target_developer} on {self.date}'
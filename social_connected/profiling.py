@@ -0,0 +1,264 @@
+import cProfile
+import hmac
+import logging
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter as StackCounter
+from contextlib import contextmanager
+from os.path import join
+from time import perf_counter
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+
+from social_connected.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+# Request headers of authorised callers: the PROFILING_TOKEN, and the
+# profiler, `stack` (sampled stacks, the default) or `cprofile`.
+PROFILE_TOKEN_HEADER = 'HTTP_X_PROFILE_TOKEN'
+PROFILE_MODE_HEADER = 'HTTP_X_PROFILE_MODE'
+# Response header naming the files of the profile.
+PROFILE_ID_HEADER = 'X-Profile-Id'
+
+MODES = ('stack', 'cprofile')
+
+REQUEST_PROFILES = Counter(
+    'request_profiles_total',
+    'Requests profiled, per view, profiler and trigger.',
+    ['view', 'mode', 'trigger'],
+)
+REQUEST_PROFILES_SKIPPED = Counter(
+    'request_profiles_skipped_total',
+    'Profiles not taken because of the rate caps, per trigger.',
+    ['trigger'],
+)
+
+
+def frame_name(frame) -> str:
+    code = frame.f_code
+    return f'{frame.f_globals.get("__name__", "?")}:{code.co_name}'
+
+
+def collapse(frame) -> str:
+    """
+    Stack of `frame` in the collapsed format, root first,
+    e.g. `module:caller;module:callee`.
+    """
+    names = []
+    while frame is not None:
+        names.append(frame_name(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class ProfileLimiter:
+    """
+    Cap the profiles of a process: PROFILING_MAX_PER_MINUTE over the
+    last minute, one at a time.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._started: List[float] = []
+        self._running: bool = False
+
+    def acquire(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            self._started = [
+                started for started in self._started if now - started < 60
+            ]
+            if (
+                self._running
+                or len(self._started) >= settings.PROFILING_MAX_PER_MINUTE
+            ):
+                return False
+            self._started.append(now)
+            self._running = True
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self._running = False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._started.clear()
+            self._running = False
+
+
+PROFILE_LIMITER = ProfileLimiter()
+
+
+class StackSampler:
+    """
+    Sample the stack of a thread every PROFILING_INTERVAL seconds from
+    a background thread, for PROFILING_MAX_DURATION seconds at most.
+    Sampling holds the GIL, so the interval doubles whenever the time
+    spent sampling exceeds PROFILING_MAX_OVERHEAD of the time elapsed.
+    """
+
+    def __init__(self, thread_id: int) -> None:
+        self.thread_id: int = thread_id
+        self.stacks: StackCounter = StackCounter()
+        self.interval: float = settings.PROFILING_INTERVAL
+        self.overhead: float = 0.0
+        self._started_at: float = 0.0
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name='stack-sampler', daemon=True
+        )
+
+    def start(self) -> 'StackSampler':
+        self._started_at = perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            start = perf_counter()
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return
+            self.stacks[collapse(frame)] += 1
+            del frame
+            now = perf_counter()
+            self.overhead += now - start
+
+            elapsed = now - self._started_at
+            if elapsed >= settings.PROFILING_MAX_DURATION:
+                return
+            if self.overhead > settings.PROFILING_MAX_OVERHEAD * elapsed:
+                self.interval *= 2
+
+
+def collapse_stats(stats: pstats.Stats) -> Dict[str, int]:
+    """
+    Own time of the functions of a cProfile report in microseconds,
+    per caller and function, in the collapsed format. cProfile does
+    not keep whole stacks, stacks are two frames deep.
+    """
+
+    def name(function: Tuple[str, int, str]) -> str:
+        filename, line, function_name = function
+        return f'{filename}:{line}:{function_name}'.replace(' ', '_')
+
+    stacks: Dict[str, int] = {}
+    for function, (_, _, own, _, callers) in stats.stats.items():
+        if not callers:
+            stacks[name(function)] = round(own * 1e6)
+            continue
+        for caller, caller_stats in callers.items():
+            # own time of the function when called by `caller`.
+            stacks[f'{name(caller)};{name(function)}'] = round(
+                caller_stats[2] * 1e6
+            )
+    return {stack: value for stack, value in stacks.items() if value}
+
+
+def write_collapsed(profile_id: str, stacks: Dict[str, int]) -> None:
+    path = join(settings.PROFILING_DIR, f'{profile_id}.collapsed')
+    with open(path, 'w') as output:
+        output.writelines(
+            f'{stack} {value}\n' for stack, value in sorted(stacks.items())
+        )
+
+
+def profile_trigger(request) -> Optional[Tuple[str, str]]:
+    """
+    Whether to profile a request, and how.
+
+    :return: the profiler and the trigger, `token` for authorised
+     callers or `sampled`, or None.
+    """
+    token = request.META.get(PROFILE_TOKEN_HEADER, '').encode()
+    if token and settings.PROFILING_TOKEN:
+        if hmac.compare_digest(token, settings.PROFILING_TOKEN.encode()):
+            mode = request.META.get(PROFILE_MODE_HEADER, 'stack')
+            return (mode if mode in MODES else 'stack'), 'token'
+    if random.random() < settings.PROFILING_SAMPLE_RATE:
+        # cProfile slows every call down, sampled requests use stacks.
+        return 'stack', 'sampled'
+    return None
+
+
+@contextmanager
+def profiled(view: str, mode: str) -> Iterator[str]:
+    """
+    Profile the block in the current thread with `mode` and write its
+    collapsed stacks, and the pstats report of cProfile, to
+    PROFILING_DIR.
+
+    :return: the id of the profile, the name of its files.
+    """
+    profile_id = (
+        f'{time.strftime("%Y%m%dT%H%M%S")}-{view}-{os.getpid()}-'
+        f'{uuid.uuid4().hex[:8]}'
+    )
+    if mode == 'cprofile':
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield profile_id
+        finally:
+            profiler.disable()
+    else:
+        sampler = StackSampler(threading.get_ident()).start()
+        try:
+            yield profile_id
+        finally:
+            sampler.stop()
+
+    # a profile must not fail the request it profiled.
+    try:
+        os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+        if mode == 'cprofile':
+            profiler.dump_stats(
+                join(settings.PROFILING_DIR, f'{profile_id}.prof')
+            )
+            write_collapsed(profile_id, collapse_stats(pstats.Stats(profiler)))
+        else:
+            write_collapsed(profile_id, sampler.stacks)
+    except OSError:
+        logger.exception('Writing the profile %s failed', profile_id)
+
+
+class ProfilingMixin:
+    """
+    Profile the requests of a view sent by authorised callers, with the
+    PROFILING_TOKEN in a X-Profile-Token header, and a sampled share of
+    them, PROFILING_SAMPLE_RATE. Profiles are rate capped per process,
+    the response of a profiled request names them in a X-Profile-Id
+    header.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        trigger = profile_trigger(request)
+        if trigger is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        mode, trigger = trigger
+        if not PROFILE_LIMITER.acquire():
+            REQUEST_PROFILES_SKIPPED.inc(trigger=trigger)
+            return super().dispatch(request, *args, **kwargs)
+
+        view = type(self).__name__
+        try:
+            with profiled(view, mode) as profile_id:
+                response = super().dispatch(request, *args, **kwargs)
+        finally:
+            PROFILE_LIMITER.release()
+        REQUEST_PROFILES.inc(view=view, mode=mode, trigger=trigger)
+        response[PROFILE_ID_HEADER] = profile_id
+        return response
@@ -0,0 +1,57 @@
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from django.conf import settings
+
+from social_connected import json_codec
+
+
+class CodecJSONRenderer(JSONRenderer):
+    """
+    Render compact JSON with the JSON codec. Indented JSON, e.g. for
+    the browsable API, and non default JSON settings of DRF are
+    rendered by DRF.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        codec = json_codec.get_codec()
+        if (
+            data is None
+            or codec.name == 'stdlib'
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+            is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        rendered = codec.dumps(data)
+        # JSON must be a strict JavaScript subset, as DRF renders it.
+        if b'\xe2\x80\xa8' in rendered or b'\xe2\x80\xa9' in rendered:
+            rendered = rendered.replace(b'\xe2\x80\xa8', b'\\u2028').replace(
+                b'\xe2\x80\xa9', b'\\u2029'
+            )
+        return rendered
+
+
+class CodecJSONParser(JSONParser):
+    """
+    Parse UTF-8 JSON with the JSON codec, other encodings with DRF.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        codec = json_codec.get_codec()
+        if (
+            codec.name == 'stdlib'
+            or not self.strict
+            or encoding.lower().replace('_', '-') not in ('utf-8', 'utf8')
+        ):
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return codec.loads(stream.read())
+        except ValueError as exception:
+            raise ParseError(f'JSON parse error - {exception}')
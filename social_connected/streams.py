@@ -0,0 +1,140 @@
+import asyncio
+import json
+from typing import Any, Callable, Dict, List, Tuple
+from urllib.parse import parse_qs
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from social_connected.controller_logic.changes import (
+    CHANGE_BROKER,
+    Pair,
+    TooManySubscriptions,
+    stream_enabled,
+)
+
+# Path of the change stream, served by the ASGI app only.
+STREAM_PATH = '/connected/stream'
+
+
+def pairs_from_query_string(
+    query_string: bytes
+) -> Tuple[List[Pair], List[str]]:
+    """
+    Parse the pairs of developers of `pair=source_dev,target_dev`
+    query parameters.
+
+    :return: the pairs and the errors found.
+    """
+    values = parse_qs(query_string.decode()).get('pair', [])
+    pairs, errors = [], []
+    for index, value in enumerate(values):
+        developers = value.split(',')
+        if len(developers) != 2 or not all(developers):
+            errors.append(
+                f'Pair {index} must be given as source_dev,target_dev'
+            )
+        else:
+            pairs.append((developers[0], developers[1]))
+    if not values:
+        errors.append('No pair subscribed')
+    elif len(values) > settings.STREAM_MAX_PAIRS:
+        errors.append(
+            f'At most {settings.STREAM_MAX_PAIRS} pairs '
+            f'can be subscribed at once'
+        )
+    return pairs, errors
+
+
+def format_event(event: Dict[str, Any]) -> bytes:
+    data = json.dumps(event, cls=DjangoJSONEncoder)
+    return f'event: change\ndata: {data}\n\n'.encode()
+
+
+async def send_errors(
+    send: Callable, status: int, errors: List[str], headers: List = ()
+) -> None:
+    await send(
+        {
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(b'content-type', b'application/json'), *headers],
+        }
+    )
+    await send(
+        {
+            'type': 'http.response.body',
+            'body': json.dumps({'errors': errors}).encode(),
+        }
+    )
+
+
+async def change_stream(scope: Dict, receive: Callable, send: Callable):
+    """
+    Stream the status changes of the subscribed pairs of developers
+    as Server-Sent Events, with a keepalive comment every
+    STREAM_HEARTBEAT seconds. The stream is closed when the client
+    does not keep up with its changes, for it to reconnect.
+    """
+    if scope['method'] != 'GET':
+        await send_errors(send, 405, [f'Method {scope["method"]} not allowed'])
+        return
+    if not stream_enabled():
+        await send_errors(send, 404, ['The change stream is disabled'])
+        return
+    pairs, errors = pairs_from_query_string(scope['query_string'])
+    if errors:
+        await send_errors(send, 400, errors)
+        return
+    try:
+        subscription = CHANGE_BROKER.subscribe(
+            pairs, asyncio.get_running_loop()
+        )
+    except TooManySubscriptions as exception:
+        await send_errors(
+            send, 503, [str(exception)], [(b'retry-after', b'1')]
+        )
+        return
+
+    disconnected = asyncio.ensure_future(_disconnected(receive))
+    try:
+        await send(
+            {
+                'type': 'http.response.start',
+                'status': 200,
+                'headers': [
+                    (b'content-type', b'text/event-stream'),
+                    (b'cache-control', b'no-cache'),
+                    # proxies must not buffer the events.
+                    (b'x-accel-buffering', b'no'),
+                ],
+            }
+        )
+        await _send_body(send, b': subscribed\n\n')
+        while not subscription.lagging:
+            change = asyncio.ensure_future(subscription.queue.get())
+            done, _ = await asyncio.wait(
+                {change, disconnected},
+                timeout=settings.STREAM_HEARTBEAT,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if change in done:
+                await _send_body(send, format_event(change.result()))
+                continue
+            change.cancel()
+            if disconnected in done:
+                return
+            await _send_body(send, b': keepalive\n\n')
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        disconnected.cancel()
+        CHANGE_BROKER.unsubscribe(subscription)
+
+
+async def _send_body(send: Callable, body: bytes) -> None:
+    await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+
+
+async def _disconnected(receive: Callable) -> None:
+    while (await receive())['type'] != 'http.disconnect':
+        pass
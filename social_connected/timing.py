@@ -0,0 +1,80 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Dict, Iterator, Optional
+
+
+class RequestTimer:
+    """
+    Accumulate the time spent in each phase of a request.
+    Phases with the same name are summed up.
+    """
+
+    def __init__(self) -> None:
+        self.started_at: float = perf_counter()
+        self.phases: Dict[str, float] = {}
+
+    def add(self, phase: str, duration: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + duration
+
+    def total(self) -> float:
+        return perf_counter() - self.started_at
+
+    def phases_ms(self) -> Dict[str, float]:
+        return {
+            phase: round(duration * 1000, 3)
+            for phase, duration in self.phases.items()
+        }
+
+    def server_timing(self) -> str:
+        """
+        Format phases as a Server-Timing header value, e.g.
+        `github;dur=120.5, db;dur=3.2, total;dur=130.1`.
+        """
+        metrics = [
+            f'{phase};dur={duration:.1f}'
+            for phase, duration in self.phases_ms().items()
+        ]
+        metrics.append(f'total;dur={self.total() * 1000:.1f}')
+        return ', '.join(metrics)
+
+
+# Timer of the request being processed. None when the request
+# is not sampled, which makes `timed` a no-op.
+_current_timer: ContextVar[Optional[RequestTimer]] = ContextVar(
+    'request_timer', default=None
+)
+
+
+def current_timer() -> Optional[RequestTimer]:
+    return _current_timer.get()
+
+
+@contextmanager
+def request_timer() -> Iterator[RequestTimer]:
+    """
+    Make a new timer the current one for the duration of a request.
+    """
+    timer = RequestTimer()
+    token = _current_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _current_timer.reset(token)
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """
+    Time a phase of the current request, if it is sampled.
+    """
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(phase, perf_counter() - start)
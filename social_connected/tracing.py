@@ -0,0 +1,190 @@
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterator, Optional, TextIO
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+logger = logging.getLogger(__name__)
+
+
+class Span:
+    """
+    A timed operation of a trace, with its attributes, e.g. the
+    developer, the provider or the status of the operation.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str] = None,
+        **attributes: Any,
+    ) -> None:
+        self.name: str = name
+        self.trace_id: Optional[str] = trace_id
+        self.span_id: str = os.urandom(8).hex()
+        self.parent_id: Optional[str] = parent_id
+        self.attributes: Dict[str, Any] = attributes
+        self.error: Optional[str] = None
+        self.started_at: float = time.time()
+        self._start: float = perf_counter()
+        self.duration: Optional[float] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def end(self) -> None:
+        self.duration = perf_counter() - self._start
+
+    def record(self) -> Dict[str, Any]:
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'started_at': self.started_at,
+            'duration_ms': round(self.duration * 1000, 3),
+            'thread': threading.current_thread().name,
+            'attributes': self.attributes,
+            'error': self.error,
+        }
+
+
+class _NoopSpan(Span):
+    """
+    Span of the operations of unsampled traces, which records nothing.
+    """
+
+    def __init__(self) -> None:
+        self.trace_id = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+# Span of the operation being run. None outside of sampled traces,
+# which makes `span` a no-op.
+_current_span: ContextVar[Optional[Span]] = ContextVar(
+    'current_span', default=None
+)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+class JsonLinesExporter:
+    """
+    Write finished spans as JSON lines to TRACING_OUTPUT, a file
+    the processes append to, or stdout when `-`.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._path: Optional[str] = None
+        self._file: Optional[TextIO] = None
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.record(), cls=DjangoJSONEncoder) + '\n'
+        with self._lock:
+            self._output().write(line)
+
+    def _output(self) -> TextIO:
+        path = settings.TRACING_OUTPUT
+        if path == '-':
+            return sys.stdout
+        if path != self._path:
+            self.close()
+            self._file = open(path, 'a', buffering=1)
+            self._path = path
+        return self._file
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        self._file, self._path = None, None
+
+
+EXPORTER = JsonLinesExporter()
+
+
+@contextmanager
+def _run_span(span: Span) -> Iterator[Span]:
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as exception:
+        span.error = type(exception).__name__
+        raise
+    finally:
+        span.end()
+        _current_span.reset(token)
+        # a trace must not fail the operation it traced, nor hide its error.
+        try:
+            EXPORTER.export(span)
+        except (OSError, TypeError, ValueError):
+            logger.exception('Exporting the span %s failed', span.name)
+
+
+@contextmanager
+def trace(name: str, **attributes: Any) -> Iterator[Span]:
+    """
+    Start a trace, e.g. for a request or a job, sampled at the
+    TRACING_SAMPLE_RATE. Within a trace, it is a span of it.
+
+    :return: the root span, or a span recording nothing if unsampled.
+    """
+    if _current_span.get() is not None:
+        with span(name, **attributes) as child:
+            yield child
+        return
+    if random.random() >= settings.TRACING_SAMPLE_RATE:
+        yield NOOP_SPAN
+        return
+
+    with _run_span(Span(name, os.urandom(16).hex(), **attributes)) as root:
+        yield root
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    """
+    Time an operation as a child of the current span, if the current
+    trace is sampled.
+
+    :return: the span, or a span recording nothing if unsampled.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        yield NOOP_SPAN
+        return
+
+    with _run_span(
+        Span(name, parent.trace_id, parent.span_id, **attributes)
+    ) as child:
+        yield child
+
+
+def propagate(function: Callable) -> Callable:
+    """
+    Wrap `function` to run in the context of the caller, current span
+    included, e.g. when submitted to a ThreadPoolExecutor. Each call
+    runs in its own copy of the context, calls may run concurrently.
+    """
+    context = copy_context()
+
+    def run(*args, **kwargs):
+        return context.copy().run(function, *args, **kwargs)
+
+    return run
@@ -1,35 +1,208 @@
+from django.conf import settings
+from django.http import HttpResponse
 from rest_framework import generics
 from rest_framework.response import Response
+from rest_framework.status import (
+    HTTP_200_OK,
+    HTTP_202_ACCEPTED,
+    HTTP_204_NO_CONTENT,
+    HTTP_400_BAD_REQUEST,
+    HTTP_404_NOT_FOUND,
+    HTTP_503_SERVICE_UNAVAILABLE,
+)
 
-from social_connected.controller_logic.registry import Registry
+from social_connected.controller_logic import jobs
+from social_connected.controller_logic.admission import (
+    REALTIME_ADMISSION,
+    Overloaded,
+)
+from social_connected.controller_logic.deadline import Deadline
+from social_connected.controller_logic.provider_cache import PROVIDER_CACHE
+from social_connected.controller_logic.registry import BulkRegistry, Registry
+from social_connected.controller_logic.result_cache import RESULT_CACHE
 from social_connected.controller_logic.social_connected import SocialConnected
+from social_connected.db_router import replica_reads, stick_to_primary
+from social_connected.metrics import REGISTRY
+from social_connected.models import ConnectivityJob
+from social_connected.profiling import ProfilingMixin
+from social_connected.timing import timed
 
 
-class SocialConnectedView(generics.RetrieveAPIView):
+class SocialConnectedView(ProfilingMixin, generics.RetrieveAPIView):
     lookup_fields = ['source_dev', 'target_dev']
 
     def get(self, request, *args, **kwargs):
         """
-        Check if two developers are connected in GitHub and Twitter.
+        Check if two developers are connected in GitHub and Twitter,
+        within the deadline set by the X-Request-Deadline-Ms header
+        or the default one. The `evaluation` query parameter picks
+        full or lazy evaluation of the providers. Requests over the
+        admission limits get a 503 with a Retry-After header.
+        Admitted ones send the next reads of the client to the primary
+        database.
         """
         url_params = {
             field: self.kwargs[field] for field in self.lookup_fields
         }
-        social_connected = SocialConnected(**url_params)
-        response, status = social_connected.connected()
-        return Response(response, status=status)
+        # time spent waiting for admission counts in the deadline.
+        social_connected = SocialConnected(
+            **url_params,
+            deadline=Deadline.from_request(request),
+            evaluation=request.query_params.get('evaluation'),
+        )
+        try:
+            with REALTIME_ADMISSION.admit():
+                response, status = social_connected.connected()
+        except Overloaded as exception:
+            return Response(
+                {'errors': [str(exception)]},
+                status=HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': str(exception.retry_after)},
+            )
+        # the check is saved to the registry, which the client
+        # may read right after.
+        return stick_to_primary(Response(response, status=status))
+
+    def delete(self, request, *args, **kwargs):
+        """
+        Invalidate the cached result of the two developers, in both
+        orders, and their cached provider responses, so that the next
+        check of any worker sharing the caches calls GitHub and Twitter.
+        """
+        source_dev = self.kwargs['source_dev']
+        target_dev = self.kwargs['target_dev']
+        RESULT_CACHE.invalidate(source_dev, target_dev)
+        PROVIDER_CACHE.invalidate(source_dev, target_dev)
+        return Response(status=HTTP_204_NO_CONTENT)
 
 
-class RegistryView(generics.RetrieveAPIView):
+class RegistryView(ProfilingMixin, generics.RetrieveAPIView):
     lookup_fields = ['source_dev', 'target_dev']
 
     def get(self, request, *args, **kwargs):
         """
-        Retrieve registry of both source and target developers.
+        Retrieve registry of both source and target developers, filtered
+        by the `since`, `until` and `connected` query parameters, its
+        statistics with `stats=true` or its daily history with
+        `granularity=daily`. Read from a replica database if any.
         """
         url_params = {
             field: self.kwargs[field] for field in self.lookup_fields
         }
-        social_connected = Registry(**url_params)
-        response, status = social_connected.retrieve_registries()
+        try:
+            filters = Registry.filters_from_query_params(request.query_params)
+        except ValueError as exception:
+            return Response(
+                {'errors': [str(exception)]}, status=HTTP_400_BAD_REQUEST
+            )
+
+        social_connected = Registry(**url_params, **filters)
+        with timed('db'), replica_reads(request):
+            if request.query_params.get('stats') == 'true':
+                response, status = social_connected.retrieve_stats()
+            elif request.query_params.get('granularity') == 'daily':
+                response, status = social_connected.retrieve_daily()
+            else:
+                response, status = social_connected.retrieve_registries()
+        return Response(response, status=status)
+
+
+class BulkRegistryView(generics.CreateAPIView):
+    def post(self, request, *args, **kwargs):
+        """
+        Retrieve the registries of many pairs of developers, given as
+        {"pairs": [{"source_dev": ..., "target_dev": ...}], "limit": N},
+        where the optional limit keeps the latest N checks of each pair.
+        Read from a replica database if any.
+        """
+        data = request.data if isinstance(request.data, dict) else {}
+        pairs, limit = data.get('pairs'), data.get('limit')
+        errors = []
+        if not isinstance(pairs, list) or not pairs:
+            errors.append('pairs must be a non empty list')
+        elif len(pairs) > settings.REGISTRY_BULK_MAX_PAIRS:
+            errors.append(
+                f'At most {settings.REGISTRY_BULK_MAX_PAIRS} pairs '
+                f'can be retrieved at once'
+            )
+        else:
+            errors.extend(
+                f'Pair {index} needs a source_dev and a target_dev'
+                for index, pair in enumerate(pairs)
+                if not isinstance(pair, dict)
+                or not pair.get('source_dev')
+                or not pair.get('target_dev')
+            )
+        if limit is not None and (
+            not isinstance(limit, int) or isinstance(limit, bool) or limit < 1
+        ):
+            errors.append('limit must be a positive integer')
+        if errors:
+            return Response({'errors': errors}, status=HTTP_400_BAD_REQUEST)
+
+        registry = BulkRegistry(
+            [(pair['source_dev'], pair['target_dev']) for pair in pairs],
+            limit,
+        )
+        with timed('db'), replica_reads(request):
+            response, status = registry.retrieve_registries()
         return Response(response, status=status)
+
+
+class ConnectivityJobsView(generics.CreateAPIView):
+    def post(self, request, *args, **kwargs):
+        """
+        Queue connectivity checks, given as one or a list of
+        {"source_dev": ..., "target_dev": ...} objects, to be run
+        by the job workers. Poll their status with ConnectivityJobView.
+        """
+        checks = request.data
+        if not isinstance(checks, list):
+            checks = [checks]
+
+        if not checks:
+            errors = ['No check submitted']
+        elif len(checks) > settings.JOBS_MAX_SUBMIT:
+            errors = [
+                f'At most {settings.JOBS_MAX_SUBMIT} checks '
+                f'can be submitted at once'
+            ]
+        else:
+            errors = [
+                f'Check {index} needs a source_dev and a target_dev'
+                for index, check in enumerate(checks)
+                if not isinstance(check, dict)
+                or not check.get('source_dev')
+                or not check.get('target_dev')
+            ]
+        if errors:
+            return Response({'errors': errors}, status=HTTP_400_BAD_REQUEST)
+
+        response = [jobs.job_response(job) for job in jobs.submit(checks)]
+        if not isinstance(request.data, list):
+            response = response[0]
+        return Response(response, status=HTTP_202_ACCEPTED)
+
+
+class ConnectivityJobView(generics.RetrieveAPIView):
+    def get(self, request, *args, **kwargs):
+        """
+        Retrieve the status of a job, and its result once done.
+        """
+        job = ConnectivityJob.objects.filter(id=self.kwargs['job_id']).first()
+        if not job:
+            return Response(
+                {'errors': [f'Job {self.kwargs["job_id"]} does not exist']},
+                status=HTTP_404_NOT_FOUND,
+            )
+        return Response(jobs.job_response(job), status=HTTP_200_OK)
+
+
+def metrics_view(request):
+    """
+    Expose the metrics of every worker in the Prometheus text format.
+    """
+    return HttpResponse(
+        REGISTRY.exposition(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
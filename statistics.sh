@@ -1,4 +1,4 @@
 #!/usr/bin/env bash
-coverage run --source='.' manage.py test
+coverage run --source='.' manage.py test --settings=challange_jobandtalent.settings_test
 echo "Coverage Report"
-coverage html --omit='challange_jobandtalent/asgi.py,manage.py,wsgi.py'
+coverage html --omit='challange_jobandtalent/asgi.py,manage.py,wsgi.py,benchmarks/*'
@@ -0,0 +1,29 @@
+from django.test import SimpleTestCase
+
+from benchmarks.json_codec import (
+    benchmark_payload,
+    github_graphql,
+    github_organizations,
+    registry_history,
+)
+
+
+class TestJsonCodecBenchmark(SimpleTestCase):
+    def test_payloads(self):
+        self.assertEqual(10, len(github_organizations(10)))
+        self.assertEqual(
+            2, len(github_graphql(2)['data']['u0']['organizations']['nodes'])
+        )
+        history = registry_history(4)
+        self.assertEqual(4, len(history))
+        self.assertNotIn('organizations', history[0])
+        self.assertIn('organizations', history[1])
+
+    def test_benchmark_payload(self):
+        result = benchmark_payload(registry_history(10), repeat=2)
+
+        self.assertGreater(result['bytes'], 0)
+        self.assertIn('stdlib', result)
+        for name in ('drf', 'stdlib'):
+            self.assertGreater(result[name]['encode_ms'], 0)
+            self.assertGreater(result[name]['decode_ms'], 0)
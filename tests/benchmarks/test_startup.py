@@ -0,0 +1,26 @@
+import sys
+from unittest import skipUnless
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from benchmarks.startup import measure_import, run_child
+
+
+class TestStartup(SimpleTestCase):
+    def test_measure_import(self):
+        result = measure_import()
+
+        self.assertIn('wsgi', sys.modules)
+        self.assertGreater(result['modules'], 0)
+        self.assertGreater(result['rss_kb'], 0)
+
+    @skipUnless(sys.platform.startswith('linux'), 'smaps_rollup is Linux only')
+    def test_preloaded_workers_share_memory(self):
+        # forks and freezes the garbage collector of a child interpreter,
+        # not of the test runner.
+        measures = run_child(settings.SETTINGS_MODULE, 'workers', '2', 'True')
+
+        self.assertEqual(2, len(measures))
+        for measure in measures:
+            self.assertGreater(measure['shared_kb'], measure['private_kb'])
@@ -0,0 +1,109 @@
+from unittest.mock import patch
+
+import requests
+
+from django.test import TestCase, override_settings
+
+from benchmarks.stub_servers import (
+    GithubStubServer,
+    StubConfig,
+    TwitterStubServer,
+)
+from social_connected.controller_logic.github_connected import GithubConnected
+from social_connected.controller_logic.github_graphql import (
+    GithubGraphQLOrganizations,
+)
+from social_connected.controller_logic.identity_cache import IDENTITY_CACHE
+from social_connected.controller_logic.twitter_connected import (
+    TwitterConnected,
+)
+
+
+class TestStubServers(TestCase):
+    def setUp(self) -> None:
+        IDENTITY_CACHE.clear()
+        self.github = GithubStubServer().start()
+        self.twitter = TwitterStubServer().start()
+        self.addCleanup(self.github.stop)
+        self.addCleanup(self.twitter.stop)
+
+    def test_github_connected_against_stub_success(self):
+        with override_settings(GITHUB_API_BASE_URL=self.github.base_url):
+            response = GithubConnected('dev1', 'dev2').connected()
+
+        self.assertEqual(
+            ({'connected': True, 'organizations': ['stub-org-0']}, 200),
+            response,
+        )
+        self.assertEqual(2, self.github.calls['users/orgs'])
+
+    def test_github_missing_user_fail(self):
+        with override_settings(GITHUB_API_BASE_URL=self.github.base_url):
+            response, status = GithubConnected(
+                'dev1', 'missing1'
+            ).connected()
+
+        self.assertEqual(404, status)
+        self.assertEqual(
+            {'errors': ['missing1 is not a valid user in github']}, response
+        )
+
+    def test_github_graphql_against_stub_success(self):
+        self.github.reset(StubConfig(organizations_per_user=3))
+        with override_settings(GITHUB_API_BASE_URL=self.github.base_url):
+            with patch(
+                'social_connected.controller_logic.github_graphql.PAGE_SIZE',
+                2,
+            ):
+                results = GithubGraphQLOrganizations().fetch(
+                    ['dev1', 'missing1']
+                )
+
+        self.assertEqual(
+            {
+                'dev1': (
+                    [
+                        {'login': 'stub-org-0'},
+                        {'login': 'stub-org-dev1-1'},
+                        {'login': 'stub-org-dev1-2'},
+                    ],
+                    200,
+                ),
+                'missing1': (
+                    {'error': 'missing1 is not a valid user in github'},
+                    404,
+                ),
+            },
+            results,
+        )
+        # the second page of dev1 is queried alone.
+        self.assertEqual(2, self.github.calls['graphql'])
+
+    def test_twitter_connected_against_stub_success(self):
+        with override_settings(TWITTER_API_BASE_URL=self.twitter.base_url):
+            response = TwitterConnected('dev1', 'dev2').connected()
+
+        self.assertEqual(({'connected': True}, 200), response)
+        self.assertEqual(1, self.twitter.calls['users/lookup'])
+        self.assertEqual(1, self.twitter.calls['friendships/show'])
+
+    def test_rate_limit_headers_and_exhaustion(self):
+        self.github.reset(StubConfig(rate_limit=1))
+        url = self.github.base_url + 'users/dev1/orgs'
+
+        first = requests.get(url)
+        second = requests.get(url)
+
+        self.assertEqual(200, first.status_code)
+        self.assertEqual('0', first.headers['X-RateLimit-Remaining'])
+        self.assertEqual(403, second.status_code)
+
+    def test_error_rate(self):
+        self.twitter.reset(StubConfig(error_rate=1.0))
+        response = requests.get(
+            self.twitter.base_url + 'users/lookup.json',
+            {'screen_name': 'dev1'},
+        )
+
+        self.assertEqual(500, response.status_code)
+        self.assertEqual(1, self.twitter.calls['users/lookup'])
@@ -0,0 +1,95 @@
+import threading
+
+from django.test import TestCase, override_settings
+
+from social_connected.controller_logic.admission import (
+    ADMISSION_SHED,
+    AdmissionController,
+    Overloaded,
+)
+
+
+@override_settings(
+    ADMISSION_CONTROL_ENABLED=True,
+    ADMISSION_MAX_IN_FLIGHT=1,
+    ADMISSION_MAX_QUEUE=1,
+    ADMISSION_MAX_WAIT=5,
+)
+class TestAdmissionController(TestCase):
+    def setUp(self) -> None:
+        self.admission = AdmissionController('test')
+        self.release = threading.Event()
+        self.admitted = threading.Event()
+
+    def hold_slot(self) -> threading.Thread:
+        def hold():
+            with self.admission.admit():
+                self.admitted.set()
+                self.release.wait(5)
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        self.admitted.wait(5)
+        self.addCleanup(thread.join)
+        self.addCleanup(self.release.set)
+        return thread
+
+    def shed(self, reason: str) -> float:
+        key = (
+            'admission_shed_total',
+            (('endpoint', 'test'), ('reason', reason)),
+        )
+        return ADMISSION_SHED.registry.snapshot().get(key, 0.0)
+
+    def test_queued_request_admitted_once_slot_released(self):
+        self.hold_slot()
+        admitted = []
+
+        def wait():
+            with self.admission.admit():
+                admitted.append(self.admission.in_flight)
+
+        waiter = threading.Thread(target=wait)
+        waiter.start()
+        while not self.admission.queued:
+            waiter.join(0.01)
+        self.assertEqual([], admitted)
+
+        self.release.set()
+        waiter.join(5)
+
+        self.assertEqual([1], admitted)
+        self.assertEqual(0, self.admission.in_flight)
+
+    @override_settings(ADMISSION_MAX_WAIT=0.05)
+    def test_wait_timeout_shed(self):
+        self.hold_slot()
+        shed = self.shed('timeout')
+
+        with self.assertRaises(Overloaded):
+            with self.admission.admit():
+                pass  # pragma: no cover
+
+        self.assertEqual(shed + 1, self.shed('timeout'))
+        self.assertEqual(0, self.admission.queued)
+
+    @override_settings(ADMISSION_MAX_QUEUE=0, ADMISSION_RETRY_AFTER=1.5)
+    def test_queue_full_shed(self):
+        self.hold_slot()
+
+        with self.assertRaises(Overloaded) as context:
+            with self.admission.admit():
+                pass  # pragma: no cover
+
+        self.assertEqual('queue_full', context.exception.reason)
+        self.assertEqual(2, context.exception.retry_after)
+
+    @override_settings(ADMISSION_CONTROL_ENABLED=False)
+    def test_disabled(self):
+        self.hold_slot()
+
+        admitted = False
+        with self.admission.admit():
+            admitted = True
+
+        self.assertTrue(admitted)
@@ -0,0 +1,112 @@
+import asyncio
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from social_connected.controller_logic.changes import (
+    CHANGE_BROKER,
+    TooManySubscriptions,
+    publish_change,
+    stream_enabled,
+)
+
+
+class TestChangeBroker(SimpleTestCase):
+    def setUp(self) -> None:
+        CHANGE_BROKER.clear()
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+    def event(self, source: str, target: str) -> dict:
+        return {'source_dev': source, 'target_dev': target, 'connected': True}
+
+    def test_publish_to_subscribers_of_pair(self):
+        subscription = CHANGE_BROKER.subscribe([('dev1', 'dev2')], self.loop)
+        other = CHANGE_BROKER.subscribe([('dev2', 'dev1')], self.loop)
+
+        CHANGE_BROKER.publish(self.event('dev1', 'dev2'))
+        self.loop.run_until_complete(asyncio.sleep(0))
+
+        self.assertEqual(
+            self.event('dev1', 'dev2'), subscription.queue.get_nowait()
+        )
+        self.assertTrue(other.queue.empty())
+
+    @override_settings(STREAM_QUEUE_SIZE=1)
+    def test_lagging_subscription(self):
+        subscription = CHANGE_BROKER.subscribe([('dev1', 'dev2')], self.loop)
+
+        CHANGE_BROKER.publish(self.event('dev1', 'dev2'))
+        CHANGE_BROKER.publish(self.event('dev1', 'dev2'))
+        self.loop.run_until_complete(asyncio.sleep(0))
+
+        self.assertTrue(subscription.lagging)
+
+    def test_unsubscribe(self):
+        subscription = CHANGE_BROKER.subscribe([('dev1', 'dev2')], self.loop)
+
+        CHANGE_BROKER.unsubscribe(subscription)
+        CHANGE_BROKER.publish(self.event('dev1', 'dev2'))
+        self.loop.run_until_complete(asyncio.sleep(0))
+
+        self.assertTrue(subscription.queue.empty())
+
+    @override_settings(STREAM_MAX_SUBSCRIPTIONS=1)
+    def test_too_many_subscriptions(self):
+        CHANGE_BROKER.subscribe([('dev1', 'dev2')], self.loop)
+
+        with self.assertRaises(TooManySubscriptions):
+            CHANGE_BROKER.subscribe([('dev1', 'dev2')], self.loop)
+
+
+class TestPublishChange(TestCase):
+    def setUp(self) -> None:
+        CHANGE_BROKER.clear()
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+    def test_published_on_commit(self):
+        subscription = CHANGE_BROKER.subscribe([('dev1', 'dev2')], self.loop)
+        registered_at = timezone.now()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            publish_change(
+                'dev1', 'dev2', True, ['org2', 'org1'], False, registered_at
+            )
+            self.loop.run_until_complete(asyncio.sleep(0))
+            self.assertTrue(subscription.queue.empty())
+        self.loop.run_until_complete(asyncio.sleep(0))
+
+        self.assertEqual(
+            {
+                'source_dev': 'dev1',
+                'target_dev': 'dev2',
+                'connected': True,
+                'previous_connected': False,
+                'organizations': ['org1', 'org2'],
+                'registered_at': registered_at,
+            },
+            subscription.queue.get_nowait(),
+        )
+
+
+class TestStreamEnabled(SimpleTestCase):
+    @override_settings(CHANGE_STREAM_ENABLED=True)
+    def test_enabled_on_postgres_only(self):
+        with patch(
+            'social_connected.controller_logic.changes.connections'
+        ) as mock_connections:
+            mock_connections['default'].vendor = 'sqlite'
+            self.assertFalse(stream_enabled())
+
+            mock_connections['default'].vendor = 'postgresql'
+            self.assertTrue(stream_enabled())
+
+    @override_settings(CHANGE_STREAM_ENABLED=False)
+    def test_disabled(self):
+        with patch(
+            'social_connected.controller_logic.changes.connections'
+        ) as mock_connections:
+            mock_connections['default'].vendor = 'postgresql'
+            self.assertFalse(stream_enabled())
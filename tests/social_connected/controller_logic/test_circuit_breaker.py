@@ -0,0 +1,134 @@
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from django.test import TestCase, override_settings
+
+from social_connected.controller_logic import upstream
+from social_connected.controller_logic.circuit_breaker import (
+    BREAKERS,
+    CircuitBreaker,
+    UpstreamUnavailable,
+)
+
+
+@override_settings(
+    CIRCUIT_BREAKER_WINDOW=4,
+    CIRCUIT_BREAKER_MIN_CALLS=4,
+    CIRCUIT_BREAKER_FAILURE_RATE=0.5,
+    CIRCUIT_BREAKER_SLOW_CALL_SECONDS=1.0,
+    CIRCUIT_BREAKER_SLOW_CALL_RATE=0.5,
+    CIRCUIT_BREAKER_OPEN_SECONDS=30,
+    CIRCUIT_BREAKER_HALF_OPEN_PROBES=1,
+)
+class TestCircuitBreaker(TestCase):
+    def setUp(self) -> None:
+        self.breaker = CircuitBreaker('github')
+
+    def trip(self, failed: bool = True, latency: float = 0.1):
+        for _ in range(4):
+            self.assertTrue(self.breaker.allow())
+            self.breaker.record(failed, latency)
+
+    def test_opens_on_error_rate(self):
+        self.trip()
+
+        self.assertEqual(CircuitBreaker.OPEN, self.breaker.state)
+        self.assertFalse(self.breaker.allow())
+
+    def test_opens_on_slow_calls(self):
+        self.trip(failed=False, latency=2.0)
+
+        self.assertEqual(CircuitBreaker.OPEN, self.breaker.state)
+
+    def test_stays_closed_under_threshold(self):
+        for failed in (True, False, False, False):
+            self.breaker.record(failed, 0.1)
+
+        self.assertEqual(CircuitBreaker.CLOSED, self.breaker.state)
+        self.assertTrue(self.breaker.allow())
+
+    def test_half_open_probe_closes(self):
+        self.trip()
+        self.breaker.opened_at -= 30
+
+        self.assertTrue(self.breaker.allow())
+        # only one probe at a time.
+        self.assertFalse(self.breaker.allow())
+        self.breaker.record(False, 0.1)
+
+        self.assertEqual(CircuitBreaker.CLOSED, self.breaker.state)
+        self.assertTrue(self.breaker.allow())
+
+    def test_half_open_probe_failure_opens(self):
+        self.trip()
+        self.breaker.opened_at -= 30
+
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record(True, 0.1)
+
+        self.assertEqual(CircuitBreaker.OPEN, self.breaker.state)
+        self.assertFalse(self.breaker.allow())
+
+
+class TestUpstreamCircuitBreaker(TestCase):
+    def setUp(self) -> None:
+        BREAKERS.reset()
+        self.addCleanup(BREAKERS.reset)
+
+    def test_failed_call_raises_upstream_unavailable(self):
+        send = MagicMock(side_effect=requests.ConnectionError('refused'))
+
+        with self.assertRaises(UpstreamUnavailable) as context:
+            upstream.get('github', 'users/orgs', send, 'url')
+
+        self.assertEqual('github', context.exception.provider)
+
+    @override_settings(CIRCUIT_BREAKER_MIN_CALLS=1)
+    def test_open_breaker_fails_fast(self):
+        send = MagicMock()
+        send.return_value.status_code = 502
+
+        upstream.get('twitter', 'users/lookup', send, 'url')
+        with self.assertRaises(UpstreamUnavailable):
+            upstream.get('twitter', 'users/lookup', send, 'url')
+
+        send.assert_called_once_with('url')
+
+    @override_settings(CIRCUIT_BREAKER_MIN_CALLS=1, UPSTREAM_TIMEOUT=10)
+    def test_deadline_timeouts_not_counted(self):
+        send = MagicMock(side_effect=requests.Timeout('read timed out'))
+
+        for _ in range(3):
+            with self.assertRaises(UpstreamUnavailable):
+                upstream.get('github', 'users/orgs', send, 'url', timeout=1)
+
+        self.assertEqual(CircuitBreaker.CLOSED, BREAKERS.get('github').state)
+        self.assertEqual(3, send.call_count)
+
+        with self.assertRaises(UpstreamUnavailable):
+            upstream.get('github', 'users/orgs', send, 'url', timeout=10)
+        self.assertEqual(CircuitBreaker.OPEN, BREAKERS.get('github').state)
+
+    @override_settings(CIRCUIT_BREAKER_OPEN_SECONDS=0)
+    def test_release_gives_probe_back(self):
+        breaker = BREAKERS.get('github')
+        breaker._open()
+
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.release()
+
+        self.assertEqual(CircuitBreaker.HALF_OPEN, breaker.state)
+        self.assertTrue(breaker.allow())
+
+    @override_settings(CIRCUIT_BREAKER_ENABLED=False)
+    def test_disabled_breaker(self):
+        with patch.object(BREAKERS, 'get') as mock_get:
+            mock_get.return_value.allow.return_value = False
+            send = MagicMock()
+            send.return_value.status_code = 200
+
+            response = upstream.get('github', 'users/orgs', send, 'url')
+
+        self.assertIs(send.return_value, response)
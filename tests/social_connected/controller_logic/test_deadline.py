@@ -0,0 +1,174 @@
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from django.test import RequestFactory, TestCase, override_settings
+
+from social_connected.controller_logic.circuit_breaker import (
+    BREAKERS,
+    CircuitBreaker,
+    UpstreamUnavailable,
+)
+from social_connected.controller_logic.deadline import (
+    Deadline,
+    DeadlineExceeded,
+    phase_timeout,
+)
+from social_connected.controller_logic.result_cache import RESULT_CACHE
+from social_connected.controller_logic.social_connected import SocialConnected
+from social_connected.models import SocialRegistry
+
+
+class TestDeadline(TestCase):
+    def test_budget_split_across_phases(self):
+        deadline = Deadline(10)
+
+        self.assertAlmostEqual(4.0, deadline.timeout('github'), places=2)
+        self.assertAlmostEqual(
+            10 * 0.25 / 0.4, deadline.timeout('twitter_friendship'), places=2
+        )
+        # the last phase gets all the time left.
+        self.assertAlmostEqual(10.0, deadline.timeout('db'), places=2)
+
+    def test_spent_deadline_fail(self):
+        deadline = Deadline(0)
+
+        with self.assertRaises(DeadlineExceeded):
+            deadline.timeout('github')
+        self.assertEqual(['github'], deadline.exceeded)
+
+    @override_settings(
+        REQUEST_DEADLINE=10, REQUEST_DEADLINE_MIN=1, REQUEST_DEADLINE_MAX=30
+    )
+    def test_from_request(self):
+        factory = RequestFactory()
+
+        default = Deadline.from_request(factory.get('/'))
+        header = Deadline.from_request(
+            factory.get('/', HTTP_X_REQUEST_DEADLINE_MS='1500')
+        )
+        raised = Deadline.from_request(
+            factory.get('/', HTTP_X_REQUEST_DEADLINE_MS='1')
+        )
+        capped = Deadline.from_request(
+            factory.get('/', HTTP_X_REQUEST_DEADLINE_MS='60000')
+        )
+
+        self.assertEqual(10, default.seconds)
+        self.assertEqual(1.5, header.seconds)
+        self.assertEqual(1, raised.seconds)
+        self.assertEqual(30, capped.seconds)
+
+    @override_settings(UPSTREAM_TIMEOUT=7)
+    def test_phase_timeout_without_deadline(self):
+        with phase_timeout(None, 'github') as timeout:
+            self.assertEqual(7, timeout)
+
+    def test_phase_timeout_turns_timeouts_into_deadline_exceeded(self):
+        deadline = Deadline(10)
+
+        with self.assertRaises(DeadlineExceeded):
+            with phase_timeout(deadline, 'twitter_lookup'):
+                try:
+                    raise requests.Timeout('read timed out')
+                except requests.Timeout as exception:
+                    raise UpstreamUnavailable(
+                        'twitter', str(exception)
+                    ) from exception
+
+        self.assertEqual(['twitter_lookup'], deadline.exceeded)
+
+
+class TestSocialConnectedDeadline(TestCase):
+    def setUp(self) -> None:
+        RESULT_CACHE.clear()
+
+    def test_upstream_deadline_exceeded_fail(self):
+        deadline = Deadline(10)
+        social_connected = SocialConnected('dev1', 'dev2', deadline)
+
+        def exceeded():
+            deadline.exceed('github')
+            raise DeadlineExceeded('github')
+
+        with patch.object(social_connected, 'github') as mocker_github:
+            mocker_github.connected.side_effect = exceeded
+
+            response, status = social_connected.connected()
+
+        self.assertEqual(504, status)
+        self.assertEqual(
+            {
+                'errors': ['Deadline exceeded during github'],
+                'deadline_exceeded': ['github'],
+            },
+            response,
+        )
+
+    def test_db_write_skipped_once_deadline_spent(self):
+        social_connected = SocialConnected('dev1', 'dev2', Deadline(10))
+
+        with patch.object(social_connected, 'github') as mocker_github:
+            with patch.object(
+                social_connected, 'twitter'
+            ) as mocker_twitter:
+                mocker_github.connected.return_value = (
+                    {'connected': True, 'organizations': ['org1']},
+                    200,
+                )
+                mocker_twitter.connected.return_value = (
+                    {'connected': True},
+                    200,
+                )
+                # both upstream checks used up the whole budget.
+                social_connected.deadline.expires_at = 0
+
+                response, status = social_connected.connected()
+
+        self.assertEqual(200, status)
+        self.assertEqual(
+            {
+                'connected': True,
+                'organizations': ['org1'],
+                'deadline_exceeded': ['db'],
+            },
+            response,
+        )
+        self.assertFalse(SocialRegistry.objects.exists())
+
+    def test_timeouts_passed_to_upstream(self):
+        social_connected = SocialConnected('dev1', 'dev2', Deadline(10))
+
+        with patch(
+            'social_connected.controller_logic.github_connected.requests'
+        ) as mock_session:
+            mock_request = MagicMock()
+            mock_request.status_code = 200
+            mock_request.json.return_value = []
+            mock_session.Session().get.return_value = mock_request
+
+            social_connected.github.connected()
+
+            timeout = mock_session.Session().get.call_args[1]['timeout']
+            self.assertTrue(0 < timeout <= 4)
+
+    @override_settings(CIRCUIT_BREAKER_MIN_CALLS=1)
+    def test_short_deadlines_leave_breaker_closed(self):
+        BREAKERS.reset()
+        self.addCleanup(BREAKERS.reset)
+        request = RequestFactory().get('/', HTTP_X_REQUEST_DEADLINE_MS='1')
+
+        with patch(
+            'social_connected.controller_logic.github_connected.requests'
+        ) as mock_session:
+            mock_session.Session().get.side_effect = requests.Timeout(
+                'read timed out'
+            )
+            for _ in range(10):
+                social_connected = SocialConnected(
+                    'dev1', 'dev2', Deadline.from_request(request)
+                )
+                with self.assertRaises(DeadlineExceeded):
+                    social_connected.github.connected()
+
+        self.assertEqual(CircuitBreaker.CLOSED, BREAKERS.get('github').state)
@@ -1,11 +1,15 @@
 from unittest.mock import patch, MagicMock
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from social_connected.controller_logic.github_connected import GithubConnected
+from social_connected.controller_logic.identity_cache import IDENTITY_CACHE
 
 
 class TestGithubConnected(TestCase):
+    def setUp(self) -> None:
+        IDENTITY_CACHE.clear()
+
     def test_connect_success(self):
         dev1, dev2 = 'dev1', 'dev2'
         self.github_connected = GithubConnected(dev1, dev2)
@@ -84,6 +88,47 @@ class TestGithubConnected(TestCase):
                 response,
             )
 
+    def test_connect_prefetched_organizations_success(self):
+        organizations = {
+            'dev1': ([{'login': 'organization'}], 200),
+            'dev2': ([{'login': 'organization'}, {'login': 'other'}], 200),
+        }
+        self.github_connected = GithubConnected(
+            'dev1', 'dev2', organizations=organizations
+        )
+
+        with patch(
+            'social_connected.controller_logic.github_connected.requests'
+        ) as mock_session:
+            response = self.github_connected.connected()
+
+        self.assertEqual(
+            ({'connected': True, 'organizations': ['organization']}, 200),
+            response,
+        )
+        mock_session.Session().get.assert_not_called()
+
+    @override_settings(GITHUB_ORGS_BACKEND='graphql')
+    def test_connect_graphql_backend_success(self):
+        self.github_connected = GithubConnected('dev1', 'dev2')
+
+        with patch(
+            'social_connected.controller_logic.github_connected.'
+            'GithubGraphQLOrganizations.fetch'
+        ) as mock_fetch:
+            mock_fetch.return_value = {
+                'dev1': ([{'login': 'organization'}], 200),
+                'dev2': ({'error': 'dev2 is not a valid user in github'}, 404),
+            }
+
+            response = self.github_connected.connected()
+
+        mock_fetch.assert_called_once_with(['dev2', 'dev1'])
+        self.assertEqual(
+            ({'errors': ['dev2 is not a valid user in github']}, 404),
+            response,
+        )
+
     def test_github_org_endpoint_success(self):
         developer_login = 'test_user'
         url = f'https://api.github.com/users/{developer_login}/orgs'
@@ -0,0 +1,164 @@
+from unittest.mock import patch, MagicMock
+
+from django.test import TestCase, override_settings
+
+from social_connected.controller_logic.github_graphql import (
+    GithubGraphQLOrganizations,
+    organizations_query,
+)
+from social_connected.controller_logic.identity_cache import IDENTITY_CACHE
+
+
+def graphql_response(status_code, body):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = {}
+    response.json.return_value = body
+    return response
+
+
+def organizations_page(logins, end_cursor=None):
+    return {
+        'organizations': {
+            'pageInfo': {
+                'hasNextPage': end_cursor is not None,
+                'endCursor': end_cursor,
+            },
+            'nodes': [{'login': login} for login in logins],
+        }
+    }
+
+
+@override_settings(
+    GITHUB_API_BASE_URL='https://api.github.com/',
+    GITHUB_API_TOKEN='token',
+)
+class TestGithubGraphQLOrganizations(TestCase):
+    def setUp(self) -> None:
+        IDENTITY_CACHE.clear()
+
+    def test_organizations_query(self):
+        self.assertEqual(
+            'query($first: Int!, $login0: String!, $after0: String, '
+            '$login1: String!, $after1: String) { '
+            'u0: user(login: $login0) { '
+            'organizations(first: $first, after: $after0) { '
+            'pageInfo { hasNextPage endCursor } nodes { login } } } '
+            'u1: user(login: $login1) { '
+            'organizations(first: $first, after: $after1) { '
+            'pageInfo { hasNextPage endCursor } nodes { login } } } }',
+            organizations_query(2),
+        )
+
+    def test_fetch_paginated_success(self):
+        with patch(
+            'social_connected.controller_logic.github_graphql.requests'
+        ) as mock_requests:
+            mock_requests.post.side_effect = [
+                graphql_response(
+                    200,
+                    {
+                        'data': {
+                            'u0': organizations_page(['org1'], 'cursor'),
+                            'u1': organizations_page(['org2']),
+                        }
+                    },
+                ),
+                graphql_response(
+                    200, {'data': {'u0': organizations_page(['org3'])}}
+                ),
+            ]
+
+            results = GithubGraphQLOrganizations().fetch(
+                ['dev1', 'dev2', 'dev1']
+            )
+
+        self.assertEqual(
+            {
+                'dev1': ([{'login': 'org1'}, {'login': 'org3'}], 200),
+                'dev2': ([{'login': 'org2'}], 200),
+            },
+            results,
+        )
+        first_call, second_call = mock_requests.post.call_args_list
+        self.assertEqual('https://api.github.com/graphql', first_call.args[0])
+        self.assertEqual(
+            {'Authorization': 'bearer token'}, first_call.kwargs['headers']
+        )
+        self.assertEqual(
+            {
+                'first': 100,
+                'login0': 'dev1',
+                'after0': None,
+                'login1': 'dev2',
+                'after1': None,
+            },
+            first_call.kwargs['json']['variables'],
+        )
+        # only the unfinished user is queried again, from its cursor.
+        self.assertEqual(
+            {'first': 100, 'login0': 'dev1', 'after0': 'cursor'},
+            second_call.kwargs['json']['variables'],
+        )
+
+    def test_fetch_not_found_is_remembered(self):
+        with patch(
+            'social_connected.controller_logic.github_graphql.requests'
+        ) as mock_requests:
+            mock_requests.post.return_value = graphql_response(
+                200,
+                {
+                    'data': {'u0': None},
+                    'errors': [{'type': 'NOT_FOUND', 'path': ['u0']}],
+                },
+            )
+
+            first = GithubGraphQLOrganizations().fetch(['dev1'])
+            second = GithubGraphQLOrganizations().fetch(['dev1'])
+
+        expected = {
+            'dev1': ({'error': 'dev1 is not a valid user in github'}, 404)
+        }
+        self.assertEqual(expected, first)
+        self.assertEqual(expected, second)
+        self.assertEqual(1, mock_requests.post.call_count)
+
+    def test_fetch_rate_limited_fail(self):
+        with patch(
+            'social_connected.controller_logic.github_graphql.requests'
+        ) as mock_requests:
+            mock_requests.post.return_value = graphql_response(
+                403, {'message': 'API rate limit exceeded'}
+            )
+
+            results = GithubGraphQLOrganizations().fetch(['dev1', 'dev2'])
+
+        error = {'error': {'message': 'API rate limit exceeded'}}, 403
+        self.assertEqual({'dev1': error, 'dev2': error}, results)
+
+    @override_settings(GITHUB_GRAPHQL_BATCH_SIZE=2)
+    def test_fetch_in_batches(self):
+        with patch(
+            'social_connected.controller_logic.github_graphql.requests'
+        ) as mock_requests:
+            mock_requests.post.side_effect = [
+                graphql_response(
+                    200,
+                    {
+                        'data': {
+                            'u0': organizations_page([]),
+                            'u1': organizations_page([]),
+                        }
+                    },
+                ),
+                graphql_response(
+                    200, {'data': {'u0': organizations_page(['org'])}}
+                ),
+            ]
+
+            results = GithubGraphQLOrganizations().fetch(
+                ['dev1', 'dev2', 'dev3']
+            )
+
+        self.assertEqual(2, mock_requests.post.call_count)
+        self.assertEqual(([{'login': 'org'}], 200), results['dev3'])
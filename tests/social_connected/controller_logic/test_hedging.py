@@ -0,0 +1,101 @@
+import time
+from unittest.mock import MagicMock
+
+from django.test import TestCase, override_settings
+
+from social_connected.controller_logic.hedging import (
+    UPSTREAM_HEDGES,
+    HedgeBudget,
+    Hedger,
+    LatencyTracker,
+)
+
+
+@override_settings(
+    UPSTREAM_HEDGING_PROVIDERS=['github'],
+    UPSTREAM_HEDGING_DEFAULT_DELAY=0.01,
+    UPSTREAM_HEDGING_MAX_RATE=1.0,
+)
+class TestHedger(TestCase):
+    def setUp(self) -> None:
+        self.hedger = Hedger()
+
+    def slow_then_fast(self):
+        slow, fast = MagicMock(name='slow'), MagicMock(name='fast')
+        responses = iter([(0.5, slow), (0.0, fast)])
+
+        def send(url):
+            delay, response = next(responses)
+            time.sleep(delay)
+            return response
+
+        return send, slow, fast
+
+    def hedges(self, outcome: str) -> float:
+        labels = (
+            ('provider', 'github'), ('endpoint', 'orgs'), ('outcome', outcome)
+        )
+        key = ('upstream_hedges_total', labels)
+        return UPSTREAM_HEDGES.registry.snapshot().get(key, 0.0)
+
+    def test_hedge_wins_over_slow_call_success(self):
+        send, _, fast = self.slow_then_fast()
+        won = self.hedges('won')
+
+        response = self.hedger.call('github', 'orgs', send, 'url')
+
+        self.assertIs(fast, response)
+        self.assertEqual(won + 1, self.hedges('won'))
+
+    def test_fast_call_is_not_hedged(self):
+        send = MagicMock()
+
+        response = self.hedger.call('github', 'orgs', send, 'url')
+
+        self.assertIs(send.return_value, response)
+        send.assert_called_once_with('url')
+
+    @override_settings(UPSTREAM_HEDGING_MAX_RATE=0.0)
+    def test_hedge_rate_cap(self):
+        send, slow, _ = self.slow_then_fast()
+
+        response = self.hedger.call('github', 'orgs', send, 'url')
+
+        self.assertIs(slow, response)
+
+    def test_failed_hedge_falls_back_to_primary(self):
+        primary = MagicMock()
+        calls = iter([(0.1, primary), (0.0, None)])
+
+        def send():
+            delay, response = next(calls)
+            time.sleep(delay)
+            if response is None:
+                raise ConnectionError('hedge failed')
+            return response
+
+        self.assertIs(primary, self.hedger.call('github', 'orgs', send))
+
+    def test_enabled(self):
+        self.assertTrue(self.hedger.enabled('github'))
+        self.assertFalse(self.hedger.enabled('twitter'))
+
+
+class TestHedgingHelpers(TestCase):
+    def test_latency_percentile(self):
+        tracker = LatencyTracker(window=100)
+        self.assertIsNone(tracker.percentile(95, min_samples=1))
+
+        for latency in range(100):
+            tracker.record(latency / 100)
+
+        self.assertEqual(0.95, tracker.percentile(95, min_samples=1))
+
+    def test_hedge_budget(self):
+        budget = HedgeBudget(max_rate=0.5)
+        budget.earn()
+        self.assertFalse(budget.spend())
+
+        budget.earn()
+        self.assertTrue(budget.spend())
+        self.assertFalse(budget.spend())
@@ -0,0 +1,130 @@
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase, override_settings
+
+from social_connected.controller_logic.github_connected import GithubConnected
+from social_connected.controller_logic.identity_cache import (
+    IDENTITY_CACHE,
+    IdentityCache,
+)
+from social_connected.controller_logic.twitter_connected import (
+    TwitterConnected,
+)
+
+
+def mock_response(status_code, json):
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = json
+    return response
+
+
+class TestIdentityCache(TestCase):
+    def setUp(self) -> None:
+        self.cache = IdentityCache()
+        self.cache.clear()
+
+    def test_remember_success(self):
+        self.cache.remember('twitter', 'Dev1', exists=True, user_id=12)
+        self.cache.remember('twitter', 'dev2', exists=False)
+
+        identities = self.cache.get_many('twitter', ['dev1', 'dev2', 'dev3'])
+
+        self.assertEqual({'dev1', 'dev2'}, set(identities))
+        self.assertTrue(identities['dev1'].exists)
+        self.assertEqual(12, identities['dev1'].user_id)
+        self.assertFalse(identities['dev2'].exists)
+        # entries are per provider.
+        self.assertIsNone(self.cache.get('github', 'dev1'))
+
+    @override_settings(
+        IDENTITY_CACHE_POSITIVE_TTL=600, IDENTITY_CACHE_NEGATIVE_TTL=60
+    )
+    def test_separate_ttls(self):
+        with patch.object(self.cache, '_cache') as mocker_cache:
+            self.cache.remember('github', 'dev1', exists=True)
+            self.cache.remember('github', 'dev2', exists=False)
+
+        ttls = [call.args[2] for call in mocker_cache().set.call_args_list]
+        self.assertEqual([600, 60], ttls)
+
+    @override_settings(IDENTITY_CACHE_ENABLED=False)
+    def test_disabled(self):
+        self.cache.remember('github', 'dev1', exists=False)
+
+        self.assertIsNone(self.cache.get('github', 'dev1'))
+
+
+class TestProvidersIdentityCache(TestCase):
+    def setUp(self) -> None:
+        IDENTITY_CACHE.clear()
+
+    def test_github_known_invalid_developer_without_upstream_call(self):
+        with patch(
+            'social_connected.controller_logic.github_connected.requests'
+        ) as mock_session:
+            mock_session.Session().get.side_effect = [
+                mock_response(404, {}),
+                mock_response(200, []),
+            ]
+            first = GithubConnected('dev1', 'dev2').connected()
+            calls = mock_session.Session().get.call_count
+
+            mock_session.Session().get.side_effect = [mock_response(200, [])]
+            second = GithubConnected('dev1', 'dev2').connected()
+
+        self.assertEqual(first, second)
+        # only the valid developer is fetched again.
+        self.assertEqual(calls + 1, mock_session.Session().get.call_count)
+
+    def test_twitter_known_invalid_developers_without_upstream_call(self):
+        with patch(
+            'social_connected.controller_logic.twitter_connected.requests'
+        ) as mock_requests:
+            mock_requests.get.return_value = mock_response(
+                404, {'errors': [{'code': 17}]}
+            )
+            first = TwitterConnected('dev1', 'dev2').connected()
+            second = TwitterConnected('dev1', 'dev2').connected()
+            fast = TwitterConnected('dev1', 'dev2', fast=True).connected()
+
+        self.assertEqual(1, mock_requests.get.call_count)
+        self.assertEqual(first, second)
+        self.assertEqual(first, fast)
+
+    def test_twitter_known_users_skip_lookup(self):
+        with patch(
+            'social_connected.controller_logic.twitter_connected.requests'
+        ) as mock_requests:
+            mock_requests.get.return_value = mock_response(
+                200,
+                [
+                    {'screen_name': 'dev1', 'id': 1},
+                    {'screen_name': 'dev2', 'id': 2},
+                ],
+            )
+            TwitterConnected('dev1', 'dev2')._check_for_user_errors({})
+            mock_requests.get.reset_mock()
+            mock_requests.get.return_value = mock_response(
+                200,
+                {
+                    'relationship': {
+                        'source': {
+                            'id': 1,
+                            'following': True,
+                            'followed_by': True,
+                        },
+                        'target': {
+                            'id': 2,
+                            'following': True,
+                            'followed_by': True,
+                        },
+                    }
+                },
+            )
+
+            response = TwitterConnected('dev1', 'dev2').connected()
+
+        self.assertEqual(({'connected': True}, 200), response)
+        self.assertEqual(1, mock_requests.get.call_count)
+        self.assertEqual(1, IDENTITY_CACHE.get('twitter', 'dev1').user_id)
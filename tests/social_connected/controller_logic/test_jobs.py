@@ -0,0 +1,199 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from social_connected.controller_logic import jobs
+from social_connected.models import ConnectivityJob
+
+
+class TestJobs(TestCase):
+    def test_submit_success(self):
+        submitted = jobs.submit(
+            [
+                {'source_dev': 'dev1', 'target_dev': 'dev2'},
+                {'source_dev': 'dev3', 'target_dev': 'dev4'},
+            ]
+        )
+
+        self.assertEqual(2, len(submitted))
+        self.assertEqual(
+            [ConnectivityJob.PENDING] * 2,
+            list(ConnectivityJob.objects.values_list('status', flat=True)),
+        )
+
+    @override_settings(JOBS_RUNNING_TIMEOUT=60)
+    def test_claim_oldest_pending_and_stale_jobs(self):
+        now = timezone.now()
+        old = ConnectivityJob.objects.create(
+            source_developer='dev1',
+            target_developer='dev2',
+            created_at=now - timedelta(minutes=2),
+        )
+        new = ConnectivityJob.objects.create(
+            source_developer='dev1',
+            target_developer='dev2',
+            created_at=now,
+        )
+        stale = ConnectivityJob.objects.create(
+            source_developer='dev1',
+            target_developer='dev2',
+            status=ConnectivityJob.RUNNING,
+            started_at=now - timedelta(minutes=5),
+            created_at=now - timedelta(minutes=10),
+            attempts=1,
+        )
+        ConnectivityJob.objects.create(
+            source_developer='dev1',
+            target_developer='dev2',
+            status=ConnectivityJob.RUNNING,
+            started_at=now,
+            created_at=now - timedelta(minutes=10),
+        )
+        ConnectivityJob.objects.create(
+            source_developer='dev1',
+            target_developer='dev2',
+            status=ConnectivityJob.DONE,
+            created_at=now - timedelta(minutes=10),
+        )
+
+        claimed = jobs.claim(2)
+
+        self.assertEqual(
+            sorted([old.id, stale.id]), [job.id for job in claimed]
+        )
+        self.assertTrue(
+            all(job.status == ConnectivityJob.RUNNING for job in claimed)
+        )
+        self.assertEqual(
+            {old.id: 1, stale.id: 2}, {job.id: job.attempts for job in claimed}
+        )
+        self.assertEqual([new.id], [job.id for job in jobs.claim(2)])
+
+    @override_settings(JOBS_MAX_ATTEMPTS=2)
+    def test_claim_fails_jobs_out_of_attempts(self):
+        abandoned = ConnectivityJob.objects.create(
+            source_developer='dev1',
+            target_developer='dev2',
+            status=ConnectivityJob.RUNNING,
+            started_at=timezone.now() - timedelta(minutes=10),
+            attempts=2,
+        )
+
+        with self.assertLogs(jobs.logger, 'WARNING'):
+            self.assertEqual([], jobs.claim(2))
+
+        abandoned.refresh_from_db()
+        self.assertEqual(ConnectivityJob.FAILED, abandoned.status)
+        self.assertEqual(
+            {'errors': ['Abandoned after 2 attempts']}, abandoned.result
+        )
+        self.assertIsNotNone(abandoned.finished_at)
+
+    def test_run_success(self):
+        job = ConnectivityJob.objects.create(
+            source_developer='dev1', target_developer='dev2'
+        )
+        with patch(
+            'social_connected.controller_logic.jobs.SocialConnected.connected'
+        ) as mock_connected:
+            mock_connected.return_value = {'connected': False}, 200
+
+            jobs.run(job)
+
+        job.refresh_from_db()
+        self.assertEqual(ConnectivityJob.DONE, job.status)
+        self.assertEqual(
+            {
+                'id': job.id,
+                'source_dev': 'dev1',
+                'target_dev': 'dev2',
+                'status': 'done',
+                'created_at': job.created_at,
+                'started_at': None,
+                'finished_at': job.finished_at,
+                'result': {'connected': False},
+                'result_status': 200,
+            },
+            jobs.job_response(job),
+        )
+
+    def test_run_exception_fail(self):
+        job = ConnectivityJob.objects.create(
+            source_developer='dev1', target_developer='dev2'
+        )
+        with patch(
+            'social_connected.controller_logic.jobs.SocialConnected.connected'
+        ) as mock_connected:
+            mock_connected.side_effect = ValueError('unexpected')
+
+            jobs.run(job)
+
+        job.refresh_from_db()
+        self.assertEqual(ConnectivityJob.FAILED, job.status)
+        self.assertEqual({'errors': ['unexpected']}, job.result)
+
+
+class TestJobWorker(TransactionTestCase):
+    def test_run_connectivity_jobs_command(self):
+        jobs.submit(
+            [
+                {'source_dev': f'dev{index}', 'target_dev': 'dev'}
+                for index in range(5)
+            ]
+        )
+        stdout = StringIO()
+        with patch(
+            'social_connected.controller_logic.jobs.SocialConnected.connected'
+        ) as mock_connected:
+            mock_connected.return_value = {'connected': True}, 200
+
+            call_command(
+                'run_connectivity_jobs', '--once', '--workers=2', stdout=stdout
+            )
+
+        self.assertEqual(5, mock_connected.call_count)
+        self.assertIn('Ran 5 connectivity jobs', stdout.getvalue())
+        self.assertEqual(
+            {ConnectivityJob.DONE},
+            set(ConnectivityJob.objects.values_list('status', flat=True)),
+        )
+
+    @override_settings(GITHUB_ORGS_BACKEND='graphql')
+    def test_run_once_prefetches_github_organizations(self):
+        jobs.submit(
+            [
+                {'source_dev': 'dev1', 'target_dev': 'dev2'},
+                {'source_dev': 'dev1', 'target_dev': 'dev3'},
+            ]
+        )
+        organizations = {
+            login: ([{'login': 'organization'}], 200)
+            for login in ('dev1', 'dev2', 'dev3')
+        }
+        with patch(
+            'social_connected.controller_logic.jobs.'
+            'GithubGraphQLOrganizations.fetch'
+        ) as mock_fetch, patch(
+            'social_connected.controller_logic.jobs.SocialConnected'
+        ) as mock_social_connected:
+            mock_fetch.return_value = organizations
+            mock_social_connected().connected.return_value = (
+                {'connected': True},
+                200,
+            )
+
+            ran = jobs.JobWorker(batch_size=2, workers=2).run_once()
+
+        self.assertEqual(2, ran)
+        mock_fetch.assert_called_once_with(['dev1', 'dev2', 'dev1', 'dev3'])
+        self.assertEqual(
+            [organizations] * 2,
+            [
+                call.kwargs['github_organizations']
+                for call in mock_social_connected.call_args_list[1:]
+            ],
+        )
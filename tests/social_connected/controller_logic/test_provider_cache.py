@@ -0,0 +1,140 @@
+import sqlite3
+from copy import deepcopy
+from os.path import join
+from tempfile import TemporaryDirectory
+from unittest.mock import patch, MagicMock
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+
+from social_connected.controller_logic.github_connected import GithubConnected
+from social_connected.controller_logic.github_graphql import (
+    GithubGraphQLOrganizations,
+)
+from social_connected.controller_logic.identity_cache import IDENTITY_CACHE
+from social_connected.controller_logic.provider_cache import PROVIDER_CACHE
+from social_connected.controller_logic.twitter_connected import (
+    TwitterConnected,
+)
+
+
+class TestProviderCache(TestCase):
+    def setUp(self) -> None:
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        caches = deepcopy(settings.CACHES)
+        caches['providers']['LOCATION'] = join(directory.name, 'providers.db')
+        overridden = override_settings(
+            CACHES=caches, PROVIDER_CACHE_ENABLED=True
+        )
+        overridden.enable()
+        self.addCleanup(overridden.disable)
+        IDENTITY_CACHE.clear()
+
+    def test_github_organizations_cached(self):
+        with patch(
+            'social_connected.controller_logic.github_connected.requests'
+        ) as mock_session:
+            mock_request = MagicMock()
+            mock_request.status_code = 200
+            mock_request.json.return_value = [{'login': 'organization'}]
+            mock_session.Session().get.return_value = mock_request
+
+            first = GithubConnected('dev1', 'dev2').connected()
+            second = GithubConnected('dev2', 'dev1').connected()
+
+        expected = {'connected': True, 'organizations': ['organization']}, 200
+        self.assertEqual(expected, first)
+        self.assertEqual(expected, second)
+        self.assertEqual(2, mock_session.Session().get.call_count)
+        self.assertEqual(
+            [{'login': 'organization'}],
+            PROVIDER_CACHE.get_organizations('DEV1'),
+        )
+
+    def test_invalidate(self):
+        PROVIDER_CACHE.set_organizations('dev1', [{'login': 'org1'}])
+        PROVIDER_CACHE.set_organizations('dev2', [{'login': 'org2'}])
+        PROVIDER_CACHE.set_organizations('dev3', [{'login': 'org3'}])
+        PROVIDER_CACHE.set_relationship('dev1', 'dev2', {'connected': True})
+
+        PROVIDER_CACHE.invalidate('DEV2', 'dev1')
+
+        self.assertIsNone(PROVIDER_CACHE.get_organizations('dev1'))
+        self.assertIsNone(PROVIDER_CACHE.get_organizations('dev2'))
+        self.assertIsNone(PROVIDER_CACHE.get_relationship('dev1', 'dev2'))
+        self.assertEqual(
+            [{'login': 'org3'}], PROVIDER_CACHE.get_organizations('dev3')
+        )
+
+    def test_github_check_when_cache_locked(self):
+        with patch(
+            'social_connected.cache_backends.sqlite3.connect',
+            side_effect=sqlite3.OperationalError('database is locked'),
+        ), patch(
+            'social_connected.controller_logic.github_connected.requests'
+        ) as mock_session, self.assertLogs(
+            'social_connected.cache_backends', 'WARNING'
+        ):
+            mock_request = MagicMock()
+            mock_request.status_code = 200
+            mock_request.json.return_value = [{'login': 'organization'}]
+            mock_session.Session().get.return_value = mock_request
+
+            response = GithubConnected('dev1', 'dev2').connected()
+
+        self.assertEqual(
+            ({'connected': True, 'organizations': ['organization']}, 200),
+            response,
+        )
+
+    def test_github_errors_not_cached(self):
+        with patch(
+            'social_connected.controller_logic.github_connected.requests'
+        ) as mock_session:
+            mock_request = MagicMock()
+            mock_request.status_code = 403
+            mock_request.json.return_value = {'message': 'rate limited'}
+            mock_session.Session().get.return_value = mock_request
+
+            GithubConnected('dev1', 'dev2').connected()
+
+        self.assertEqual(
+            {}, PROVIDER_CACHE.get_many_organizations(['dev1', 'dev2'])
+        )
+
+    def test_github_graphql_reads_cached_organizations(self):
+        PROVIDER_CACHE.set_organizations('dev1', [{'login': 'organization'}])
+
+        with patch(
+            'social_connected.controller_logic.github_graphql.requests'
+        ) as mock_requests:
+            results = GithubGraphQLOrganizations().fetch(['dev1'])
+
+        self.assertEqual({'dev1': ([{'login': 'organization'}], 200)}, results)
+        mock_requests.post.assert_not_called()
+
+    def test_twitter_relationship_cached(self):
+        with patch(
+            'social_connected.controller_logic.twitter_connected.requests'
+        ) as mock_requests:
+            mock_request = MagicMock()
+            mock_request.status_code = 200
+            mock_request.json.return_value = {
+                'relationship': {
+                    'source': {
+                        'id': 1,
+                        'following': True,
+                        'followed_by': True,
+                    },
+                    'target': {'id': 2},
+                }
+            }
+            mock_requests.get.return_value = mock_request
+
+            first = TwitterConnected('dev1', 'dev2', fast=True).connected()
+            second = TwitterConnected('dev2', 'dev1', fast=True).connected()
+
+        self.assertEqual(({'connected': True}, 200), first)
+        self.assertEqual(({'connected': True}, 200), second)
+        self.assertEqual(1, mock_requests.get.call_count)
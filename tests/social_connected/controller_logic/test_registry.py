@@ -1,12 +1,26 @@
+from datetime import datetime, timedelta
+from io import StringIO
 from itertools import cycle
 from unittest.mock import patch
 
 from model_bakery import baker
+from parameterized import parameterized
 
-from django.test import TestCase
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
 
-from social_connected.controller_logic.registry import Registry
-from social_connected.models import CommonOrganizations, SocialRegistry
+from social_connected.controller_logic.registry import (
+    BulkRegistry,
+    Registry,
+    check_times,
+    compact_registries,
+)
+from social_connected.models import (
+    CommonOrganizations,
+    RegistryDailyRollup,
+    SocialRegistry,
+)
 
 
 class TestRegistry(TestCase):
@@ -63,3 +77,430 @@ class TestRegistry(TestCase):
 
             self.assertEqual(500, status)
             self.assertEqual({'errors': ['Cannot find database']}, response)
+
+    def test_retrieve_registries_ascending(self):
+        earlier = baker.make(
+            SocialRegistry,
+            source_developer='dev1',
+            target_developer='dev2',
+            registered_at=timezone.now() - timedelta(days=1),
+        )
+
+        response, _ = self.registry.retrieve_registries()
+
+        self.assertEqual(earlier.registered_at, response[0]['registered_at'])
+        self.assertEqual(
+            sorted(item['registered_at'] for item in response),
+            [item['registered_at'] for item in response],
+        )
+
+
+class TestRegistryFilters(TestCase):
+    def setUp(self) -> None:
+        start = timezone.make_aware(datetime(2021, 4, 1))
+        # connected on days 1-2, 4-6 and 8.
+        outcomes = [True, True, False, True, True, True, False, True]
+        self.registries = [
+            baker.make(
+                SocialRegistry,
+                source_developer='dev1',
+                target_developer='dev2',
+                connected=connected,
+                registered_at=start + timedelta(days=day),
+            )
+            for day, connected in enumerate(outcomes)
+        ]
+        baker.make(
+            SocialRegistry,
+            source_developer='dev2',
+            target_developer='dev1',
+            connected=True,
+            _quantity=5,
+        )
+
+    def test_filters_success(self):
+        registry = Registry(
+            'dev1',
+            'dev2',
+            **Registry.filters_from_query_params(
+                {
+                    'since': '2021-04-02',
+                    'until': '2021-04-05T00:00:00Z',
+                    'connected': 'true',
+                }
+            ),
+        )
+
+        response, status = registry.retrieve_registries()
+
+        self.assertEqual(200, status)
+        self.assertEqual(
+            [
+                self.registries[1].registered_at,
+                self.registries[3].registered_at,
+                self.registries[4].registered_at,
+            ],
+            sorted(item['registered_at'] for item in response),
+        )
+
+    @parameterized.expand(
+        [
+            ({'since': 'yesterday'}, 'since must be an ISO 8601 date'),
+            ({'connected': 'yes'}, 'connected must be true or false'),
+        ]
+    )
+    def test_invalid_filters_fail(self, query_params, error):
+        with self.assertRaisesMessage(ValueError, error):
+            Registry.filters_from_query_params(query_params)
+
+    def test_retrieve_stats_success(self):
+        response, status = Registry('dev1', 'dev2').retrieve_stats()
+
+        self.assertEqual(200, status)
+        self.assertEqual(
+            {
+                'total_checks': 8,
+                'connected_checks': 6,
+                'connected_ratio': 0.75,
+                'first_connected_at': self.registries[0].registered_at,
+                'last_connected_at': self.registries[7].registered_at,
+                'longest_connected_streak': 3,
+            },
+            response,
+        )
+
+    def test_retrieve_stats_filtered(self):
+        registry = Registry(
+            'dev1',
+            'dev2',
+            since=self.registries[4].registered_at,
+        )
+
+        response, status = registry.retrieve_stats()
+
+        self.assertEqual(200, status)
+        self.assertEqual(4, response['total_checks'])
+        self.assertEqual(2, response['longest_connected_streak'])
+
+    def test_retrieve_stats_connected_filter(self):
+        registry = Registry('dev1', 'dev2', connected=True)
+
+        response, status = registry.retrieve_stats()
+
+        self.assertEqual(200, status)
+        self.assertEqual(6, response['total_checks'])
+        # disconnected checks still end streaks.
+        self.assertEqual(3, response['longest_connected_streak'])
+
+    def test_retrieve_stats_empty(self):
+        response, status = Registry('dev3', 'dev4').retrieve_stats()
+
+        self.assertEqual(200, status)
+        self.assertEqual(0, response['total_checks'])
+        self.assertIsNone(response['connected_ratio'])
+        self.assertEqual(0, response['longest_connected_streak'])
+
+
+class TestBulkRegistry(TestCase):
+    def setUp(self) -> None:
+        start = timezone.make_aware(datetime(2021, 4, 1))
+        self.registries = {}
+        for pair in [('dev1', 'dev2'), ('dev3', 'dev4'), ('dev2', 'dev1')]:
+            self.registries[pair] = [
+                baker.make(
+                    SocialRegistry,
+                    source_developer=pair[0],
+                    target_developer=pair[1],
+                    connected=bool(day % 2),
+                    registered_at=start + timedelta(days=day),
+                )
+                for day in range(4)
+            ]
+        first = self.registries['dev1', 'dev2'][0]
+        baker.make(
+            CommonOrganizations,
+            social_registry=first,
+            organization='org1',
+            transaction_id=self.registries['dev1', 'dev2'][3].transaction_id,
+        )
+
+    def test_retrieve_registries_success(self):
+        registry = BulkRegistry(
+            [('dev1', 'dev2'), ('dev3', 'dev4'), ('dev5', 'dev6')]
+        )
+
+        with self.assertNumQueries(2):
+            response, status = registry.retrieve_registries()
+
+        self.assertEqual(200, status)
+        self.assertEqual(
+            [('dev1', 'dev2'), ('dev3', 'dev4'), ('dev5', 'dev6')],
+            [(item['source_dev'], item['target_dev']) for item in response],
+        )
+        self.assertEqual(
+            [False, True, False, True],
+            [item['connected'] for item in response[0]['registries']],
+        )
+        self.assertEqual(
+            ['org1'], response[0]['registries'][3]['organizations']
+        )
+        self.assertEqual([], response[2]['registries'])
+
+    def test_retrieve_registries_limit_success(self):
+        registry = BulkRegistry([('dev1', 'dev2'), ('dev3', 'dev4')], limit=2)
+
+        with self.assertNumQueries(2):
+            response, status = registry.retrieve_registries()
+
+        self.assertEqual(200, status)
+        for item in response:
+            pair = item['source_dev'], item['target_dev']
+            self.assertEqual(
+                [
+                    registry.registered_at
+                    for registry in self.registries[pair][2:]
+                ],
+                [registry['registered_at'] for registry in item['registries']],
+            )
+        self.assertEqual(
+            ['org1'], response[0]['registries'][1]['organizations']
+        )
+
+
+class TestIntervalRegistry(TestCase):
+    def setUp(self) -> None:
+        self.start = timezone.make_aware(datetime(2021, 4, 1))
+        self.interval = baker.make(
+            SocialRegistry,
+            source_developer='dev1',
+            target_developer='dev2',
+            connected=True,
+            registered_at=self.start,
+            last_seen=self.start + timedelta(minutes=3),
+            check_count=4,
+        )
+        baker.make(
+            CommonOrganizations,
+            social_registry=self.interval,
+            organization='org1',
+            transaction_id=self.interval.transaction_id,
+        )
+        baker.make(
+            SocialRegistry,
+            source_developer='dev1',
+            target_developer='dev2',
+            connected=False,
+            registered_at=self.start + timedelta(minutes=4),
+        )
+
+    def test_check_times(self):
+        self.assertEqual(
+            [self.start + timedelta(minutes=minute) for minute in range(4)],
+            check_times(self.interval),
+        )
+
+    def test_retrieve_registries_expanded(self):
+        response, status = Registry(
+            'dev1', 'dev2', since=self.start + timedelta(minutes=2)
+        ).retrieve_registries()
+
+        self.assertEqual(200, status)
+        self.assertEqual(
+            [
+                {
+                    'registered_at': self.start + timedelta(minutes=2),
+                    'connected': True,
+                    'organizations': ['org1'],
+                },
+                {
+                    'registered_at': self.start + timedelta(minutes=3),
+                    'connected': True,
+                    'organizations': ['org1'],
+                },
+                {
+                    'registered_at': self.start + timedelta(minutes=4),
+                    'connected': False,
+                },
+            ],
+            response,
+        )
+
+    def test_retrieve_stats(self):
+        response, _ = Registry('dev1', 'dev2').retrieve_stats()
+
+        self.assertEqual(5, response['total_checks'])
+        self.assertEqual(0.8, response['connected_ratio'])
+        self.assertEqual(4, response['longest_connected_streak'])
+        self.assertEqual(
+            self.start + timedelta(minutes=3), response['last_connected_at']
+        )
+
+    def test_bulk_registry_limit(self):
+        response, _ = BulkRegistry(
+            [('dev1', 'dev2')], limit=2
+        ).retrieve_registries()
+
+        self.assertEqual(
+            [
+                self.start + timedelta(minutes=3),
+                self.start + timedelta(minutes=4),
+            ],
+            [item['registered_at'] for item in response[0]['registries']],
+        )
+
+
+class TestDailyRegistry(TestCase):
+    def setUp(self) -> None:
+        self.start = timezone.make_aware(datetime(2021, 4, 2))
+        RegistryDailyRollup.objects.create(
+            source_developer='dev1',
+            target_developer='dev2',
+            date=self.start.date() - timedelta(days=1),
+            checks=3,
+            connected_checks=0,
+            first_seen=self.start - timedelta(hours=20),
+            last_seen=self.start - timedelta(hours=2),
+        )
+        RegistryDailyRollup.objects.create(
+            source_developer='dev1',
+            target_developer='dev2',
+            date=self.start.date(),
+            checks=2,
+            connected_checks=2,
+            first_seen=self.start + timedelta(hours=1),
+            last_seen=self.start + timedelta(hours=2),
+            organizations=['org1'],
+        )
+        for hours, connected in [(3, True), (4, False)]:
+            registry = baker.make(
+                SocialRegistry,
+                source_developer='dev1',
+                target_developer='dev2',
+                connected=connected,
+                registered_at=self.start + timedelta(hours=hours),
+            )
+            if connected:
+                baker.make(
+                    CommonOrganizations,
+                    social_registry=registry,
+                    organization='org2',
+                    transaction_id=registry.transaction_id,
+                )
+
+    def test_retrieve_daily_merges_rollups_and_registries(self):
+        response, status = Registry('dev1', 'dev2').retrieve_daily()
+
+        self.assertEqual(200, status)
+        self.assertEqual(
+            [
+                {
+                    'date': self.start.date() - timedelta(days=1),
+                    'checks': 3,
+                    'connected_checks': 0,
+                    'first_seen': self.start - timedelta(hours=20),
+                    'last_seen': self.start - timedelta(hours=2),
+                },
+                {
+                    'date': self.start.date(),
+                    'checks': 4,
+                    'connected_checks': 3,
+                    'first_seen': self.start + timedelta(hours=1),
+                    'last_seen': self.start + timedelta(hours=4),
+                    'organizations': ['org1', 'org2'],
+                },
+            ],
+            response,
+        )
+
+    def test_retrieve_daily_filters(self):
+        response, _ = Registry(
+            'dev1',
+            'dev2',
+            **Registry.filters_from_query_params(
+                {'until': '2021-04-02', 'connected': 'true'}
+            ),
+        ).retrieve_daily()
+
+        self.assertEqual(
+            [self.start.date()], [day['date'] for day in response]
+        )
+
+
+class TestCompactRegistries(TestCase):
+    def setUp(self) -> None:
+        start = timezone.make_aware(datetime(2021, 4, 1))
+        outcomes = (
+            [(True, 'org1')] * 3 + [(True, 'org2')] + [(False, None)] * 3
+        )
+        first_registry = None
+        for minute, (connected, organization) in enumerate(outcomes):
+            registry = baker.make(
+                SocialRegistry,
+                source_developer='dev1',
+                target_developer='dev2',
+                connected=connected,
+                registered_at=start + timedelta(minutes=minute),
+            )
+            first_registry = first_registry or registry
+            # organizations are linked to the first registry of a pair.
+            if organization:
+                baker.make(
+                    CommonOrganizations,
+                    social_registry=first_registry,
+                    organization=organization,
+                    transaction_id=registry.transaction_id,
+                )
+
+    def test_compact_registries(self):
+        before, _ = Registry('dev1', 'dev2').retrieve_registries()
+
+        self.assertEqual(4, compact_registries())
+
+        self.assertEqual(
+            [(True, 3), (True, 1), (False, 3)],
+            list(
+                SocialRegistry.objects.order_by('registered_at').values_list(
+                    'connected', 'check_count'
+                )
+            ),
+        )
+        self.assertEqual(2, CommonOrganizations.objects.count())
+        after, _ = Registry('dev1', 'dev2').retrieve_registries()
+        self.assertEqual(before, after)
+
+    def test_compact_registries_again(self):
+        compact_registries()
+        baker.make(
+            SocialRegistry,
+            source_developer='dev1',
+            target_developer='dev2',
+            connected=False,
+            registered_at=timezone.make_aware(datetime(2021, 4, 2)),
+        )
+
+        self.assertEqual(1, compact_registries())
+        self.assertEqual(0, compact_registries())
+
+        self.assertEqual(
+            [(True, 3), (True, 1), (False, 4)],
+            list(
+                SocialRegistry.objects.order_by('registered_at').values_list(
+                    'connected', 'check_count'
+                )
+            ),
+        )
+
+    @override_settings(REGISTRY_STORAGE_MODE='interval')
+    def test_compact_registry_command(self):
+        stdout = StringIO()
+
+        call_command('compact_registry', stdout=stdout)
+
+        self.assertEqual(3, SocialRegistry.objects.count())
+        self.assertIn('Merged 4 registries', stdout.getvalue())
+
+    def test_compact_registry_command_per_check_storage(self):
+        with self.assertRaises(CommandError):
+            call_command('compact_registry', stdout=StringIO())
+
+        self.assertEqual(7, SocialRegistry.objects.count())
@@ -0,0 +1,41 @@
+from copy import deepcopy
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+
+from social_connected.controller_logic.result_cache import RESULT_CACHE
+
+
+def results_backend(backend: str):
+    caches = deepcopy(settings.CACHES)
+    caches['results']['BACKEND'] = backend
+    return caches
+
+
+class TestResultCacheBackend(SimpleTestCase):
+    @override_settings(
+        RESULT_CACHE_ENABLED=True,
+        CACHES=results_backend(
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+    )
+    def test_local_backend_refused(self):
+        with self.assertRaises(ImproperlyConfigured):
+            RESULT_CACHE.check_backend()
+
+    @override_settings(
+        RESULT_CACHE_ENABLED=True,
+        CACHES=results_backend('social_connected.cache_backends.SQLiteCache'),
+    )
+    def test_shared_backend(self):
+        RESULT_CACHE.check_backend()
+
+    @override_settings(
+        RESULT_CACHE_ENABLED=False,
+        CACHES=results_backend(
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+    )
+    def test_local_backend_when_disabled(self):
+        RESULT_CACHE.check_backend()
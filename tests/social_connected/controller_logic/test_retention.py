@@ -0,0 +1,179 @@
+from datetime import datetime, timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from model_bakery import baker
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from social_connected.controller_logic import retention
+from social_connected.controller_logic.registry import Registry
+from social_connected.models import (
+    CommonOrganizations,
+    RegistryDailyRollup,
+    SocialRegistry,
+)
+
+
+class TestRetention(TestCase):
+    def setUp(self) -> None:
+        self.start = timezone.make_aware(datetime(2021, 3, 31, 12))
+        self.registries = []
+        for hours, connected in [(0, True), (1, False), (24, True)]:
+            registry = baker.make(
+                SocialRegistry,
+                source_developer='dev1',
+                target_developer='dev2',
+                connected=connected,
+                registered_at=self.start + timedelta(hours=hours),
+            )
+            self.registries.append(registry)
+            if connected:
+                # organizations are linked to the first registry.
+                baker.make(
+                    CommonOrganizations,
+                    social_registry=self.registries[0],
+                    organization='org1',
+                    transaction_id=registry.transaction_id,
+                )
+
+    def test_month_helpers(self):
+        month = retention.month_start(self.start)
+
+        self.assertEqual(timezone.make_aware(datetime(2021, 3, 1)), month)
+        self.assertEqual(
+            timezone.make_aware(datetime(2020, 12, 1)),
+            retention.add_months(month, -3),
+        )
+        self.assertEqual(
+            'registry_2022_01',
+            retention.partition_name(
+                'registry', retention.add_months(month, 10)
+            ),
+        )
+
+    def test_rollup_added_to_existing(self):
+        march = retention.month_start(self.start)
+        april = retention.add_months(march, 1)
+        retention.rollup(march, april)
+
+        written = retention.rollup(march, april)
+
+        self.assertEqual(1, written)
+        rollup = RegistryDailyRollup.objects.get()
+        self.assertEqual(self.start.date(), rollup.date)
+        self.assertEqual(4, rollup.checks)
+        self.assertEqual(2, rollup.connected_checks)
+        self.assertEqual(['org1'], rollup.organizations)
+
+    def test_expire_before_deletes_rolled_up_registries(self):
+        april = timezone.make_aware(datetime(2021, 4, 15))
+        history, _ = Registry('dev1', 'dev2').retrieve_daily()
+
+        with self.assertLogs(retention.logger) as logs:
+            expired = retention.expire_before(april, 'drop')
+
+        self.assertEqual(1, len(logs.output))
+
+        self.assertEqual([retention.month_start(self.start)], expired)
+        self.assertEqual(
+            [self.registries[2].id],
+            list(SocialRegistry.objects.values_list('id', flat=True)),
+        )
+        self.assertEqual(
+            [self.registries[2].transaction_id],
+            list(
+                CommonOrganizations.objects.values_list(
+                    'transaction_id', flat=True
+                )
+            ),
+        )
+        self.assertEqual(history, Registry('dev1', 'dev2').retrieve_daily()[0])
+
+    def interval_spanning_cutoff(self) -> SocialRegistry:
+        registry = baker.make(
+            SocialRegistry,
+            source_developer='dev3',
+            target_developer='dev4',
+            connected=True,
+            registered_at=self.start,
+            last_seen=timezone.now(),
+            check_count=50,
+        )
+        baker.make(
+            CommonOrganizations,
+            social_registry=registry,
+            organization='org1',
+            transaction_id=registry.transaction_id,
+        )
+        return registry
+
+    def test_expire_before_keeps_intervals_still_seen(self):
+        registry = self.interval_spanning_cutoff()
+        april = timezone.make_aware(datetime(2021, 4, 15))
+
+        with self.assertLogs(retention.logger):
+            expired = retention.expire_before(april, 'drop')
+        expired_again = retention.expire_before(april, 'drop')
+
+        self.assertEqual([retention.month_start(self.start)], expired)
+        self.assertEqual([], expired_again)
+        self.assertEqual(
+            [registry.id, self.registries[2].id],
+            list(
+                SocialRegistry.objects.order_by('registered_at')
+                .values_list('id', flat=True)
+            ),
+        )
+        self.assertTrue(
+            CommonOrganizations.objects.filter(
+                transaction_id=registry.transaction_id
+            ).exists()
+        )
+        self.assertFalse(
+            RegistryDailyRollup.objects.filter(
+                source_developer='dev3'
+            ).exists()
+        )
+        self.assertEqual(
+            2, RegistryDailyRollup.objects.get(source_developer='dev1').checks
+        )
+
+    def test_expire_keeps_partition_of_intervals_still_seen(self):
+        self.interval_spanning_cutoff()
+        march = retention.month_start(self.start)
+        partition = retention.partition_name(
+            SocialRegistry._meta.db_table, march
+        )
+
+        with patch.object(
+            retention, 'is_partitioned', return_value=True
+        ), patch.object(retention, 'partitions', return_value=[partition]):
+            with self.assertLogs(retention.logger):
+                expired = retention.expire(
+                    march, 'drop', retention.add_months(march, 1)
+                )
+
+        self.assertFalse(expired)
+        self.assertEqual(4, SocialRegistry.objects.count())
+        self.assertFalse(RegistryDailyRollup.objects.exists())
+
+    @override_settings(REGISTRY_RETENTION_MONTHS=0)
+    def test_maintain_registry_keeps_forever(self):
+        call_command('maintain_registry', stdout=StringIO())
+
+        self.assertEqual(3, SocialRegistry.objects.count())
+
+    def test_maintain_registry_expires(self):
+        stdout = StringIO()
+
+        with self.assertLogs(retention.logger):
+            call_command(
+                'maintain_registry', '--retention-months=1', stdout=stdout
+            )
+
+        self.assertFalse(SocialRegistry.objects.exists())
+        self.assertEqual(2, RegistryDailyRollup.objects.count())
+        self.assertIn('Expired the registries of', stdout.getvalue())
@@ -1,15 +1,26 @@
 from unittest.mock import patch
 
 from django.db import IntegrityError
+from model_bakery import baker
 from parameterized import parameterized
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
+from social_connected.controller_logic.circuit_breaker import (
+    UpstreamUnavailable,
+)
+from social_connected.controller_logic.provider_stats import (
+    PROVIDER_STATS,
+    ProviderStats,
+)
+from social_connected.controller_logic.result_cache import RESULT_CACHE
 from social_connected.controller_logic.social_connected import SocialConnected
+from social_connected.models import CommonOrganizations, SocialRegistry
 
 
 class TestSocialConnected(TestCase):
     def setUp(self) -> None:
+        RESULT_CACHE.clear()
         self.social_connected = SocialConnected('dev1', 'dev2')
 
     def github_error_fixture(self, dev_name: str):
@@ -125,3 +136,280 @@ class TestSocialConnected(TestCase):
                     response, status = self.social_connected.connected()
                     self.assertEqual(500, status)
                     self.assertEqual({'errors': ['Error on save']}, response)
+
+    def test_social_connected_unavailable_last_known_success(self):
+        registry = baker.make(
+            SocialRegistry,
+            source_developer='dev1',
+            target_developer='dev2',
+            connected=True,
+        )
+        baker.make(
+            CommonOrganizations,
+            social_registry=registry,
+            transaction_id=registry.transaction_id,
+            organization='org1',
+        )
+        with patch.object(self.social_connected, 'github') as mocker_github:
+            mocker_github.connected.side_effect = UpstreamUnavailable(
+                'github', 'circuit breaker is open'
+            )
+
+            response, status = self.social_connected.connected()
+
+        self.assertEqual(200, status)
+        self.assertEqual(
+            {
+                'connected': True,
+                'degraded': True,
+                'registered_at': registry.registered_at,
+                'organizations': ['org1'],
+            },
+            response,
+        )
+        self.assertEqual(1, SocialRegistry.objects.count())
+
+    def test_social_connected_unavailable_without_history_fail(self):
+        with patch.object(self.social_connected, 'github') as mocker_github:
+            mocker_github.connected.side_effect = UpstreamUnavailable(
+                'github', 'circuit breaker is open'
+            )
+
+            response, status = self.social_connected.connected()
+
+        self.assertEqual(503, status)
+        self.assertEqual(
+            {'errors': ['github is unavailable: circuit breaker is open']},
+            response,
+        )
+
+    @override_settings(CIRCUIT_BREAKER_FALLBACK='fail_fast')
+    def test_social_connected_unavailable_fail_fast(self):
+        baker.make(
+            SocialRegistry, source_developer='dev1', target_developer='dev2'
+        )
+        with patch.object(self.social_connected, 'github') as mocker_github:
+            with patch.object(
+                self.social_connected, 'twitter'
+            ) as mocker_twitter:
+                mocker_github.connected.return_value = {'connected': True}, 200
+                mocker_twitter.connected.side_effect = UpstreamUnavailable(
+                    'twitter', 'timed out'
+                )
+
+                response, status = self.social_connected.connected()
+
+        self.assertEqual(503, status)
+        self.assertEqual(
+            {'errors': ['twitter is unavailable: timed out']}, response
+        )
+
+    def test_social_connected_lazy_skips_second_provider(self):
+        PROVIDER_STATS.reset()
+        self.addCleanup(PROVIDER_STATS.reset)
+        # twitter is fast and often negative, it is checked first.
+        PROVIDER_STATS.record('github', False, 1.0)
+        PROVIDER_STATS.record('twitter', True, 0.1)
+        social_connected = SocialConnected('dev1', 'dev2', evaluation='lazy')
+
+        with patch.object(social_connected, 'github') as mocker_github:
+            with patch.object(
+                social_connected, 'twitter'
+            ) as mocker_twitter:
+                mocker_twitter.connected.return_value = (
+                    {'connected': False},
+                    200,
+                )
+
+                response, status = social_connected.connected()
+
+        self.assertEqual(({'connected': False}, 200), (response, status))
+        mocker_github.connected.assert_not_called()
+        self.assertFalse(SocialRegistry.objects.get().connected)
+
+    def test_social_connected_lazy_runs_both_when_connected(self):
+        PROVIDER_STATS.reset()
+        self.addCleanup(PROVIDER_STATS.reset)
+        social_connected = SocialConnected('dev1', 'dev2', evaluation='lazy')
+
+        with patch.object(social_connected, 'github') as mocker_github:
+            with patch.object(
+                social_connected, 'twitter'
+            ) as mocker_twitter:
+                connected = {'connected': True, 'organizations': ['org1']}
+                mocker_github.connected.return_value = connected, 200
+                mocker_twitter.connected.return_value = (
+                    {'connected': True},
+                    200,
+                )
+
+                response, status = social_connected.connected()
+
+        self.assertEqual(200, status)
+        self.assertEqual(connected, response)
+        mocker_twitter.connected.assert_called_once()
+
+    def test_provider_order_by_cost(self):
+        stats = ProviderStats(alpha=1.0)
+        self.assertEqual(
+            ['github', 'twitter'], stats.order(['github', 'twitter'])
+        )
+
+        stats.record('github', False, 0.5)
+        stats.record('twitter', True, 0.3)
+
+        self.assertEqual(
+            ['twitter', 'github'], stats.order(['github', 'twitter'])
+        )
+
+    @override_settings(RESULT_CACHE_ENABLED=True)
+    def test_social_connected_mirrored_pair_cached_success(self):
+        with patch.object(self.social_connected, 'github') as mocker_github:
+            with patch.object(
+                self.social_connected, 'twitter'
+            ) as mocker_twitter:
+                connected = {'connected': True, 'organizations': ['org1']}
+                mocker_github.connected.return_value = connected, 200
+                mocker_twitter.connected.return_value = (
+                    {'connected': True},
+                    200,
+                )
+                self.social_connected.connected()
+
+        mirrored = SocialConnected('DEV2', 'dev1')
+        with patch.object(mirrored, 'github') as mocker_github:
+            response, status = mirrored.connected()
+
+        self.assertEqual((connected, 200), (response, status))
+        mocker_github.connected.assert_not_called()
+        # the hit is recorded with its organizations.
+        registries = SocialRegistry.objects.filter(
+            source_developer__in=['dev1', 'DEV2']
+        ).order_by('id')
+        self.assertEqual(2, registries.count())
+        self.assertEqual(
+            ['org1'],
+            list(
+                CommonOrganizations.objects.filter(
+                    transaction_id=registries.last().transaction_id
+                ).values_list('organization', flat=True)
+            ),
+        )
+
+    @parameterized.expand([('full', 2, 2), ('light', 2, 2), ('off', 1, 1)])
+    @override_settings(RESULT_CACHE_ENABLED=True)
+    def test_result_cache_audit(self, audit, registries, organizations):
+        with patch.object(self.social_connected, 'github') as mocker_github:
+            with patch.object(
+                self.social_connected, 'twitter'
+            ) as mocker_twitter:
+                connected = {'connected': True, 'organizations': ['org1']}
+                mocker_github.connected.return_value = connected, 200
+                mocker_twitter.connected.return_value = (
+                    {'connected': True},
+                    200,
+                )
+                self.social_connected.connected()
+
+                with override_settings(RESULT_CACHE_AUDIT=audit):
+                    response, status = self.social_connected.connected()
+
+        mocker_github.connected.assert_called_once()
+        self.assertEqual((connected, 200), (response, status))
+        self.assertEqual(registries, SocialRegistry.objects.count())
+        self.assertEqual(organizations, CommonOrganizations.objects.count())
+
+    @override_settings(RESULT_CACHE_ENABLED=True)
+    def test_errors_not_cached(self):
+        with patch.object(self.social_connected, 'github') as mocker_github:
+            with patch.object(
+                self.social_connected, 'twitter'
+            ) as mocker_twitter:
+                mocker_github.connected.return_value = (
+                    self.github_error_fixture('dev1'),
+                    404,
+                )
+                mocker_twitter.connected.return_value = (
+                    {'connected': True},
+                    200,
+                )
+                self.social_connected.connected()
+                self.social_connected.connected()
+
+        self.assertEqual(2, mocker_github.connected.call_count)
+        self.assertIsNone(RESULT_CACHE.get('dev1', 'dev2'))
+
+    @override_settings(RESULT_CACHE_ENABLED=True)
+    def test_result_cache_invalidate(self):
+        RESULT_CACHE.set('dev1', 'dev2', {'connected': False})
+
+        RESULT_CACHE.invalidate('dev2', 'dev1')
+
+        self.assertIsNone(RESULT_CACHE.get('dev1', 'dev2'))
+
+    @override_settings(REGISTRY_STORAGE_MODE='interval')
+    def test_save_response_interval_storage(self):
+        self.social_connected._save_response(True, ['org1', 'org2'])
+        self.social_connected._save_response(True, ['org2', 'org1'])
+        self.social_connected._save_response(True, ['org1'])
+        self.social_connected._save_response(False, [])
+        self.social_connected._save_response(False, [])
+
+        registries = list(SocialRegistry.objects.order_by('id'))
+        self.assertEqual(
+            [(True, 2), (True, 1), (False, 2)],
+            [
+                (registry.connected, registry.check_count)
+                for registry in registries
+            ],
+        )
+        self.assertIsNotNone(registries[0].last_seen)
+        self.assertIsNone(registries[1].last_seen)
+        self.assertEqual(
+            ['org1'],
+            list(
+                CommonOrganizations.objects.filter(
+                    transaction_id=registries[1].transaction_id
+                ).values_list('organization', flat=True)
+            ),
+        )
+
+    def test_save_response_publishes_changes(self):
+        with patch(
+            'social_connected.controller_logic.social_connected.'
+            'publish_change'
+        ) as mock_publish, patch(
+            'social_connected.controller_logic.social_connected.'
+            'stream_enabled',
+            return_value=True,
+        ):
+            self.social_connected._save_response(True, ['org1'])
+            self.social_connected._save_response(True, ['org1'])
+            self.social_connected._save_response(True, ['org1', 'org2'])
+            self.social_connected._save_response(False, [])
+            self.social_connected._save_response(False, [])
+
+        self.assertEqual(
+            [
+                (True, ['org1'], None),
+                (True, ['org1', 'org2'], True),
+                (False, [], True),
+            ],
+            [
+                (call.args[2], call.args[3], call.args[4])
+                for call in mock_publish.call_args_list
+            ],
+        )
+
+    def test_save_response_change_stream_disabled(self):
+        with patch(
+            'social_connected.controller_logic.social_connected.'
+            'publish_change'
+        ) as mock_publish, patch.object(
+            self.social_connected, '_last_state'
+        ) as mock_last_state:
+            self.social_connected._save_response(True, ['org1'])
+
+        mock_publish.assert_not_called()
+        # per check storage does not lock the latest registry of the pair.
+        mock_last_state.assert_not_called()
@@ -4,6 +4,7 @@ from parameterized import parameterized
 
 from django.test import TestCase
 
+from social_connected.controller_logic.identity_cache import IDENTITY_CACHE
 from social_connected.controller_logic.twitter_connected import (
     TwitterConnected,
 )
@@ -11,6 +12,7 @@ from social_connected.controller_logic.twitter_connected import (
 
 class TestTwitterConnected(TestCase):
     def setUp(self) -> None:
+        IDENTITY_CACHE.clear()
         self.twitter_connected = TwitterConnected('dev1', 'dev2')
 
     def relationship_fixture(
@@ -112,6 +114,38 @@ class TestTwitterConnected(TestCase):
                 response = self.twitter_connected.connected()
             self.assertEqual(({'errors': error}, status), response)
 
+    @parameterized.expand(
+        [
+            (
+                403,
+                {'errors': [{'code': 63, 'message': 'User suspended.'}]},
+                ['dev1 or dev2 is not a valid user in twitter'],
+            ),
+            (
+                401,
+                {'errors': [{'code': 89, 'message': 'Invalid token.'}]},
+                ['Invalid token.'],
+            ),
+            (500, {}, ['Twitter did not return the relationship']),
+        ]
+    )
+    def test_read_relationship_errors_as_strings(
+        self, status, body, errors
+    ):
+        with patch(
+            'social_connected.controller_logic.twitter_connected.requests'
+        ) as mocker:
+            mocker.get.return_value = self.mock_response(status, body)
+
+            with patch.object(
+                self.twitter_connected, '_check_for_user_errors'
+            ) as mock_errors:
+                mock_errors.return_value = [], 200
+
+                response = self.twitter_connected.connected()
+
+        self.assertEqual(({'errors': errors}, status), response)
+
     def test_user_exist_success(self):
         with patch(
             'social_connected.controller_logic.twitter_connected.requests'
@@ -200,3 +234,85 @@ class TestTwitterConnected(TestCase):
             {'source_screen_name': 'dev1', 'target_screen_name': 'dev2',},
             params,
         )
+
+    def mock_response(self, status, json_response):
+        mock_request = MagicMock()
+        mock_request.status_code = status
+        mock_request.json.return_value = json_response
+        return mock_request
+
+    def test_fast_mode_single_round_trip_success(self):
+        twitter_connected = TwitterConnected('dev1', 'dev2', fast=True)
+        with patch(
+            'social_connected.controller_logic.twitter_connected.requests'
+        ) as mocker:
+            mocker.get.return_value = self.mock_response(
+                200, self.relationship_fixture()
+            )
+
+            response = twitter_connected.connected()
+
+        self.assertEqual(({'connected': True}, 200), response)
+        mocker.get.assert_called_once()
+        self.assertTrue(
+            mocker.get.call_args[0][0].endswith('friendships/show.json')
+        )
+
+    def test_fast_mode_missing_user_falls_back_to_lookup(self):
+        twitter_connected = TwitterConnected('dev1', 'dev2', fast=True)
+        with patch(
+            'social_connected.controller_logic.twitter_connected.requests'
+        ) as mocker:
+            mocker.get.side_effect = [
+                self.mock_response(
+                    404,
+                    {'errors': [{'code': 50, 'message': 'User not found.'}]},
+                ),
+                self.mock_response(200, [{'screen_name': 'dev1'}]),
+            ]
+
+            response = twitter_connected.connected()
+
+        self.assertEqual(
+            ({'errors': ['dev2 is not a valid user in twitter']}, 200),
+            response,
+        )
+        self.assertEqual(2, mocker.get.call_count)
+
+    def test_fast_mode_suspended_user_fail(self):
+        twitter_connected = TwitterConnected('dev1', 'dev2', fast=True)
+        with patch(
+            'social_connected.controller_logic.twitter_connected.requests'
+        ) as mocker:
+            mocker.get.side_effect = [
+                self.mock_response(
+                    403,
+                    {'errors': [{'code': 63, 'message': 'User suspended.'}]},
+                ),
+                self.mock_response(
+                    200, [{'screen_name': 'dev1'}, {'screen_name': 'dev2'}]
+                ),
+            ]
+
+            response = twitter_connected.connected()
+
+        self.assertEqual(
+            (
+                {'errors': ['dev1 or dev2 is not a valid user in twitter']},
+                403,
+            ),
+            response,
+        )
+
+    def test_fast_mode_rate_limited_does_not_lookup(self):
+        twitter_connected = TwitterConnected('dev1', 'dev2', fast=True)
+        error = {'errors': [{'code': 88, 'message': 'Rate limit exceeded'}]}
+        with patch(
+            'social_connected.controller_logic.twitter_connected.requests'
+        ) as mocker:
+            mocker.get.return_value = self.mock_response(429, error)
+
+            response = twitter_connected.connected()
+
+        self.assertEqual((error, 429), response)
+        mocker.get.assert_called_once()
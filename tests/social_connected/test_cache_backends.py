@@ -0,0 +1,149 @@
+import os
+import sqlite3
+import threading
+from os.path import join
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from social_connected.cache_backends import SQLiteCache
+
+
+class TestSQLiteCache(SimpleTestCase):
+    def setUp(self) -> None:
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = join(directory.name, 'cache', 'providers.db')
+        self.cache = SQLiteCache(self.path, {})
+
+    def test_set_get_delete(self):
+        self.cache.set('key', {'organizations': ['org']})
+
+        self.assertEqual({'organizations': ['org']}, self.cache.get('key'))
+        self.assertTrue(self.cache.has_key('key'))
+        self.assertEqual(
+            {'key': {'organizations': ['org']}},
+            self.cache.get_many(['key', 'missing']),
+        )
+        self.assertTrue(self.cache.delete('key'))
+        self.assertIsNone(self.cache.get('key'))
+        self.assertFalse(self.cache.delete('key'))
+
+    def test_expired_entries_fail(self):
+        self.cache.set('expired', 'value', 0)
+        self.cache.set('forever', 'value', None)
+
+        self.assertEqual('default', self.cache.get('expired', 'default'))
+        self.assertFalse(self.cache.has_key('expired'))
+        self.assertFalse(self.cache.touch('expired'))
+        self.assertEqual(
+            {'forever': 'value'}, self.cache.get_many(['expired', 'forever'])
+        )
+
+    def test_add_only_missing_or_expired(self):
+        self.cache.set('expired', 'old', 0)
+
+        self.assertTrue(self.cache.add('missing', 'new'))
+        self.assertTrue(self.cache.add('expired', 'new'))
+        self.assertFalse(self.cache.add('missing', 'newer'))
+        self.assertEqual(
+            {'missing': 'new', 'expired': 'new'},
+            self.cache.get_many(['missing', 'expired']),
+        )
+
+    def test_entries_survive_restarts_and_are_shared_by_threads(self):
+        self.cache.set('key', 'value')
+        restarted = SQLiteCache(self.path, {})
+        values = []
+
+        thread = threading.Thread(
+            target=lambda: values.append(restarted.get('key'))
+        )
+        thread.start()
+        thread.join()
+
+        self.assertEqual(['value'], values)
+        self.assertEqual('value', restarted.get('key'))
+
+    def test_connections_pooled_across_threads(self):
+        with patch(
+            'social_connected.cache_backends.sqlite3.connect',
+            wraps=sqlite3.connect,
+        ) as mock_connect:
+            for _ in range(5):
+                # like the executors of the checks, a thread per lookup.
+                thread = threading.Thread(target=self.cache.get, args=['key'])
+                thread.start()
+                thread.join()
+
+        mock_connect.assert_called_once()
+
+    def test_locked_database_misses(self):
+        self.cache.set('key', 'value')
+        cache = SQLiteCache(self.path, {'OPTIONS': {'BUSY_TIMEOUT': 0.01}})
+        writer = sqlite3.connect(self.path, isolation_level=None)
+        self.addCleanup(writer.close)
+        writer.execute('BEGIN EXCLUSIVE')
+
+        with self.assertLogs('social_connected.cache_backends', 'WARNING'):
+            cache.set('key', 'new value')
+            self.assertFalse(cache.add('other', 'value'))
+            self.assertFalse(cache.delete('key'))
+        writer.execute('ROLLBACK')
+
+        self.assertEqual('value', cache.get('key'))
+
+    def test_unavailable_database_misses(self):
+        cache = SQLiteCache(join(self.path, 'not a directory'), {})
+        self.cache.set('key', 'value')
+
+        with self.assertLogs('social_connected.cache_backends', 'WARNING'):
+            self.assertEqual('default', cache.get('key', 'default'))
+            self.assertEqual({}, cache.get_many(['key']))
+            self.assertFalse(cache.has_key('key'))
+
+    def test_values_stored_as_json(self):
+        self.cache.set('key', {'organizations': [{'login': 'org'}]})
+
+        with sqlite3.connect(self.path) as connection:
+            (value,) = connection.execute(
+                'SELECT value FROM cache_entries'
+            ).fetchone()
+        self.assertEqual('{"organizations":[{"login":"org"}]}', value)
+
+    def test_pickled_entries_miss(self):
+        self.cache.set('key', 'value')
+        with sqlite3.connect(self.path) as connection:
+            connection.execute(
+                'UPDATE cache_entries SET value = ?', [b'\x80\x04K\x01.']
+            )
+
+        with self.assertLogs('social_connected.cache_backends', 'WARNING'):
+            self.assertIsNone(self.cache.get('key'))
+            self.assertEqual({}, self.cache.get_many(['key']))
+
+    def test_shared_directory_refused(self):
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory)
+        os.chmod(directory, 0o777)
+
+        with self.assertLogs('social_connected.cache_backends', 'WARNING'):
+            self.cache.set('key', 'value')
+            self.assertIsNone(self.cache.get('key'))
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_cull_expired_and_oldest_entries(self):
+        cache = SQLiteCache(
+            self.path, {'OPTIONS': {'MAX_ENTRIES': 4, 'CULL_FREQUENCY': 2}}
+        )
+        cache.set('expired', 'value', 0)
+        with patch('social_connected.cache_backends.CULL_EVERY', 1):
+            for index in range(6):
+                cache.set(f'key{index}', 'value', 60 + index)
+
+        # the expired entry, then key0 and key1 once there were 5.
+        self.assertEqual(
+            ['key2', 'key3', 'key4', 'key5'],
+            sorted(cache.get_many([f'key{index}' for index in range(6)])),
+        )
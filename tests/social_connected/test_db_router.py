@@ -0,0 +1,141 @@
+from unittest import skipUnless
+from unittest.mock import patch
+
+from model_bakery import baker
+
+from django.conf import settings
+from django.db import connections, router
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+
+from django.contrib.auth.models import User
+
+from rest_framework.test import APIClient
+
+from social_connected.db_router import (
+    PRIMARY_COOKIE,
+    ReplicaRouter,
+    replica_reads,
+    stick_to_primary,
+)
+from social_connected.models import SocialRegistry
+
+
+@override_settings(DATABASE_REPLICAS=['replica0', 'replica1'])
+class TestReplicaRouter(TestCase):
+    def test_reads_routed_to_replica_in_block(self):
+        self.assertEqual('default', router.db_for_read(SocialRegistry))
+
+        with replica_reads():
+            self.assertIn(
+                router.db_for_read(SocialRegistry), ['replica0', 'replica1']
+            )
+            self.assertEqual('default', router.db_for_write(SocialRegistry))
+
+        self.assertEqual('default', router.db_for_read(SocialRegistry))
+
+    def test_sticky_client_reads_primary(self):
+        request = RequestFactory().get('/')
+        request.COOKIES[PRIMARY_COOKIE] = '1'
+
+        with replica_reads(request):
+            self.assertEqual('default', router.db_for_read(SocialRegistry))
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replica(self):
+        response = stick_to_primary(HttpResponse())
+
+        with replica_reads():
+            self.assertEqual('default', router.db_for_read(SocialRegistry))
+        self.assertNotIn(PRIMARY_COOKIE, response.cookies)
+
+    def test_migrations_on_primary_only(self):
+        replica_router = ReplicaRouter()
+
+        self.assertTrue(
+            replica_router.allow_migrate('default', 'social_connected')
+        )
+        self.assertFalse(
+            replica_router.allow_migrate('replica0', 'social_connected')
+        )
+
+
+@override_settings(
+    DATABASE_REPLICAS=['replica0'], DATABASE_REPLICA_STICKY_SECONDS=5
+)
+class TestReplicaReadsViews(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=User.objects.create())
+
+    def read_database(self):
+        def retrieve_registries():
+            return router.db_for_read(SocialRegistry), 200
+
+        with patch(
+            'social_connected.views.Registry.retrieve_registries',
+            side_effect=retrieve_registries,
+        ):
+            return self.client.get('/connected/register/dev1/dev2').data
+
+    def test_read_your_writes_after_realtime_check(self):
+        self.assertEqual('replica0', self.read_database())
+
+        with patch(
+            'social_connected.views.SocialConnected.connected'
+        ) as mock_connected:
+            mock_connected.return_value = {'connected': False}, 200
+            response = self.client.get('/connected/realtime/dev1/dev2')
+
+        self.assertEqual(5, response.cookies[PRIMARY_COOKIE]['max-age'])
+        self.assertEqual('default', self.read_database())
+
+
+# replica0 is a mirror of the default database in the test settings.
+HAS_REPLICA = 'replica0' in settings.DATABASES
+
+
+@skipUnless(HAS_REPLICA, 'needs the test settings')
+@override_settings(DATABASE_REPLICAS=['replica0'])
+class TestReplicaQueries(TransactionTestCase):
+    # committed, the rows written are visible from the replica connection.
+    databases = {'default', 'replica0'} if HAS_REPLICA else {'default'}
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=User.objects.create())
+        baker.make(
+            SocialRegistry,
+            source_developer='dev1',
+            target_developer='dev2',
+            connected=False,
+            _quantity=2,
+        )
+
+    def test_registry_read_from_replica(self):
+        replica = CaptureQueriesContext(connections['replica0'])
+        primary = CaptureQueriesContext(connections['default'])
+        with replica, primary:
+            response = self.client.get('/connected/register/dev1/dev2')
+            stats = self.client.get(
+                '/connected/register/dev1/dev2', {'stats': 'true'}
+            )
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(2, len(response.data))
+        self.assertEqual(2, stats.data['total_checks'])
+        self.assertEqual(0, stats.data['longest_connected_streak'])
+        self.assertTrue(replica.captured_queries)
+        self.assertFalse(
+            [
+                query
+                for query in primary.captured_queries
+                if SocialRegistry._meta.db_table in query['sql']
+            ]
+        )
@@ -0,0 +1,68 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+from unittest import skipIf
+from unittest.mock import MagicMock
+from uuid import UUID
+
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+
+from rest_framework.renderers import JSONRenderer
+
+from social_connected import json_codec
+from social_connected.json_codec import (
+    CodecDecoder,
+    OrjsonCodec,
+    StdlibCodec,
+    get_codec,
+    orjson,
+    response_json,
+)
+
+PAYLOAD = {
+    'registered_at': datetime(2021, 5, 1, 12, 30, 15, 123456, timezone.utc),
+    'naive': datetime(2021, 5, 1, 12, 30),
+    'id': UUID('12345678123456781234567812345678'),
+    'amount': Decimal('1.10'),
+    'connected': True,
+    'organizations': ['organization-1', 'ünicode'],
+    1: None,
+}
+
+
+class TestJsonCodec(SimpleTestCase):
+    @override_settings(JSON_CODEC='stdlib')
+    def test_stdlib_codec(self):
+        self.assertIsInstance(get_codec(), StdlibCodec)
+        self.assertEqual({'a': [1]}, json_codec.loads(b'{"a":[1]}'))
+
+    @skipIf(orjson is None, 'orjson is not installed')
+    @override_settings(JSON_CODEC='auto')
+    def test_auto_picks_orjson(self):
+        self.assertIsInstance(get_codec(), OrjsonCodec)
+
+    def test_codecs_encode_like_drf(self):
+        expected = JSONRenderer().render(PAYLOAD)
+        self.assertEqual(expected, StdlibCodec.dumps(PAYLOAD))
+        if orjson is not None:
+            self.assertEqual(expected, OrjsonCodec().dumps(PAYLOAD))
+
+    @skipIf(orjson is None, 'orjson is not installed')
+    def test_orjson_falls_back_on_big_integers(self):
+        self.assertEqual(
+            b'[18446744073709551616]', OrjsonCodec().dumps([2**64])
+        )
+
+    def test_response_json_decodes_with_the_codec(self):
+        response = MagicMock()
+        response.json.return_value = {'login': 'dev1'}
+
+        self.assertEqual({'login': 'dev1'}, response_json(response))
+        response.json.assert_called_once_with(cls=CodecDecoder)
+
+    def test_decoder(self):
+        self.assertEqual(
+            {'login': 'dev1'},
+            json.loads('{"login": "dev1"}', cls=CodecDecoder),
+        )
@@ -0,0 +1,109 @@
+import json
+import os
+import tempfile
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from rest_framework.test import APIClient
+
+from social_connected.metrics import Counter, Gauge, Histogram, MetricsRegistry
+
+# pids are lower than 2 ** 22 on linux.
+DEAD_PID = 2 ** 22 + 1
+
+
+class TestMetrics(TestCase):
+    def setUp(self) -> None:
+        self.registry = MetricsRegistry()
+        self.counter = Counter(
+            'calls_total', 'Calls.', ['provider'], registry=self.registry
+        )
+        self.histogram = Histogram(
+            'latency_seconds', 'Latency.', buckets=(0.1, 1.0),
+            registry=self.registry,
+        )
+        self.gauge = Gauge(
+            'remaining', 'Remaining.', ['provider'], registry=self.registry,
+            multiprocess_mode='min',
+        )
+
+    def test_exposition_success(self):
+        self.counter.inc(provider='github')
+        self.counter.inc(2, provider='github')
+        self.histogram.observe(0.5)
+
+        self.assertEqual(
+            '# HELP calls_total Calls.\n'
+            '# TYPE calls_total counter\n'
+            'calls_total{provider="github"} 3.0\n'
+            '# HELP latency_seconds Latency.\n'
+            '# TYPE latency_seconds histogram\n'
+            'latency_seconds_bucket{le="0.1"} 0.0\n'
+            'latency_seconds_bucket{le="1.0"} 1.0\n'
+            'latency_seconds_bucket{le="+Inf"} 1.0\n'
+            'latency_seconds_count 1.0\n'
+            'latency_seconds_sum 0.5\n'
+            '# HELP remaining Remaining.\n'
+            '# TYPE remaining gauge\n',
+            self.registry.exposition(),
+        )
+
+    def test_wrong_labels_fail(self):
+        with self.assertRaises(ValueError):
+            self.counter.inc(service='github')
+
+    def test_multiprocess_aggregation_success(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(lambda: [
+            os.remove(os.path.join(directory, name))
+            for name in os.listdir(directory)
+        ])
+        labels = [['provider', 'github']]
+        other_worker = {
+            'samples': [
+                ['calls_total', labels, 4.0],
+                ['remaining', labels, 10.0],
+            ]
+        }
+        dead_worker = {'samples': [['remaining', labels, 1.0]]}
+        for pid, samples in (
+            (os.getppid(), other_worker), (DEAD_PID, dead_worker)
+        ):
+            path = os.path.join(directory, f'metrics_{pid}.json')
+            with open(path, 'w') as samples_file:
+                json.dump(samples, samples_file)
+
+        with override_settings(METRICS_MULTIPROC_DIR=directory):
+            with patch.object(self.registry, '_ensure_flusher'):
+                self.counter.inc(provider='github')
+                self.gauge.set(50, provider='github')
+            samples = self.registry.collect()
+
+        key = (('provider', 'github'),)
+        # counters are summed over all the workers.
+        self.assertEqual(5.0, samples[('calls_total', key)])
+        # gauges of dead workers are dropped.
+        self.assertEqual(10.0, samples[('remaining', key)])
+        self.assertTrue(
+            os.path.exists(
+                os.path.join(directory, f'metrics_{os.getpid()}.json')
+            )
+        )
+
+    def test_metrics_endpoint_success(self):
+        client = APIClient()
+        with patch(
+            'social_connected.views.Registry.retrieve_registries'
+        ) as mock_registries:
+            mock_registries.return_value = [], 200
+            client.get('/connected/register/dev1/dev2')
+
+        response = client.get('/metrics')
+
+        self.assertEqual(200, response.status_code)
+        self.assertIn(
+            'http_request_duration_seconds_count'
+            '{view="registry",method="GET",status="200"}',
+            response.content.decode(),
+        )
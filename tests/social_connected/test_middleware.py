@@ -0,0 +1,49 @@
+import json
+from unittest.mock import patch
+
+from django.test import override_settings
+
+from rest_framework.test import APIClient, APITestCase
+
+from social_connected.timing import timed
+
+
+class TestServerTimingMiddleware(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=1.0)
+    def test_server_timing_header_and_log_success(self):
+        def connected():
+            with timed('github'):
+                pass
+            return {'connected': False}, 200
+
+        with patch(
+            'social_connected.views.SocialConnected.connected',
+            side_effect=connected,
+        ):
+            with self.assertLogs('social_connected.middleware') as logs:
+                response = self.client.get('/connected/realtime/dev1/dev2')
+
+        metrics = [
+            metric.split(';')[0]
+            for metric in response['Server-Timing'].split(', ')
+        ]
+        self.assertEqual(['github', 'render', 'total'], metrics)
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual('real-time-connected', record['view'])
+        self.assertEqual(200, record['status'])
+        self.assertEqual({'github', 'render'}, set(record['phases_ms']))
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=0.0)
+    def test_not_sampled_request_has_no_header(self):
+        with patch(
+            'social_connected.views.Registry.retrieve_registries'
+        ) as mock_registries:
+            mock_registries.return_value = [], 200
+            response = self.client.get('/connected/register/dev1/dev2')
+
+        self.assertEqual(200, response.status_code)
+        self.assertNotIn('Server-Timing', response)
@@ -0,0 +1,122 @@
+import threading
+import time
+from glob import glob
+from os.path import basename, join
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from django.test import override_settings
+
+from rest_framework.test import APIClient, APITestCase
+
+from social_connected.profiling import (
+    PROFILE_LIMITER,
+    REQUEST_PROFILES_SKIPPED,
+    StackSampler,
+)
+
+
+def slow_registries():
+    time.sleep(0.05)
+    return [], 200
+
+
+class TestProfiling(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        overridden = override_settings(
+            PROFILING_TOKEN='secret',
+            PROFILING_DIR=self.directory,
+            PROFILING_INTERVAL=0.001,
+        )
+        overridden.enable()
+        self.addCleanup(overridden.disable)
+        PROFILE_LIMITER.clear()
+
+    def get_registry(self, **headers):
+        with patch(
+            'social_connected.views.Registry.retrieve_registries'
+        ) as mock_retrieve:
+            mock_retrieve.side_effect = slow_registries
+            return self.client.get('/connected/register/dev1/dev2', **headers)
+
+    def skipped(self) -> float:
+        key = ('request_profiles_skipped_total', (('trigger', 'token'),))
+        return REQUEST_PROFILES_SKIPPED.registry.snapshot().get(key, 0.0)
+
+    def read_profile(self, profile_id, extension='collapsed'):
+        with open(join(self.directory, f'{profile_id}.{extension}')) as file:
+            return [line.rsplit(' ', 1) for line in file.read().splitlines()]
+
+    def test_token_stack_profile_success(self):
+        response = self.get_registry(HTTP_X_PROFILE_TOKEN='secret')
+
+        self.assertEqual(200, response.status_code)
+        profile_id = response['X-Profile-Id']
+        self.assertIn('-RegistryView-', profile_id)
+        stacks = self.read_profile(profile_id)
+        self.assertTrue(
+            any(
+                stack.endswith('test_profiling:slow_registries')
+                for stack, _ in stacks
+            )
+        )
+        self.assertTrue(all(int(count) > 0 for _, count in stacks))
+
+    def test_token_cprofile_success(self):
+        response = self.get_registry(
+            HTTP_X_PROFILE_TOKEN='secret', HTTP_X_PROFILE_MODE='cprofile'
+        )
+
+        profile_id = response['X-Profile-Id']
+        self.assertEqual(
+            {f'{profile_id}.collapsed', f'{profile_id}.prof'},
+            {basename(path) for path in glob(join(self.directory, '*'))},
+        )
+        self.assertTrue(
+            any(
+                'slow_registries' in stack
+                for stack, _ in self.read_profile(profile_id)
+            )
+        )
+
+    def test_invalid_token_not_profiled(self):
+        response = self.get_registry(HTTP_X_PROFILE_TOKEN='guess')
+
+        self.assertEqual(200, response.status_code)
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual([], glob(join(self.directory, '*')))
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0)
+    def test_sampled_requests_profiled(self):
+        with patch(
+            'social_connected.views.SocialConnected.connected'
+        ) as mock_connected:
+            mock_connected.return_value = {'connected': True}, 200
+
+            response = self.client.get('/connected/realtime/dev1/dev2')
+
+        self.assertIn('-SocialConnectedView-', response['X-Profile-Id'])
+
+    @override_settings(PROFILING_MAX_PER_MINUTE=1)
+    def test_rate_capped(self):
+        skipped = self.skipped()
+
+        first = self.get_registry(HTTP_X_PROFILE_TOKEN='secret')
+        second = self.get_registry(HTTP_X_PROFILE_TOKEN='secret')
+
+        self.assertIn('X-Profile-Id', first)
+        self.assertNotIn('X-Profile-Id', second)
+        self.assertEqual(skipped + 1, self.skipped())
+
+    @override_settings(PROFILING_MAX_OVERHEAD=0)
+    def test_sampler_backs_off_over_overhead(self):
+        sampler = StackSampler(threading.get_ident()).start()
+        time.sleep(0.02)
+        sampler.stop()
+
+        self.assertGreater(sampler.interval, 0.001)
+        self.assertTrue(sampler.stacks)
@@ -0,0 +1,60 @@
+import io
+
+from django.test import SimpleTestCase, override_settings
+
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from social_connected.renderers import CodecJSONParser, CodecJSONRenderer
+from tests.social_connected.test_json_codec import PAYLOAD
+
+
+class TestCodecJSONRenderer(SimpleTestCase):
+    def test_renders_like_drf(self):
+        for codec in ('auto', 'stdlib'):
+            with self.subTest(codec=codec), override_settings(
+                JSON_CODEC=codec
+            ):
+                self.assertEqual(
+                    JSONRenderer().render(PAYLOAD),
+                    CodecJSONRenderer().render(PAYLOAD),
+                )
+
+    def test_escapes_line_separators(self):
+        rendered = CodecJSONRenderer().render({'bio': 'a\u2028b\u2029c'})
+
+        self.assertEqual(b'{"bio":"a\\u2028b\\u2029c"}', rendered)
+
+    def test_indented(self):
+        rendered = CodecJSONRenderer().render(
+            {'a': 1}, 'application/json; indent=2'
+        )
+
+        self.assertEqual(b'{\n  "a": 1\n}', rendered)
+
+    def test_none(self):
+        self.assertEqual(b'', CodecJSONRenderer().render(None))
+
+
+class TestCodecJSONParser(SimpleTestCase):
+    def test_parse(self):
+        parsed = CodecJSONParser().parse(
+            io.BytesIO('{"source_dev": "dév1"}'.encode())
+        )
+
+        self.assertEqual({'source_dev': 'dév1'}, parsed)
+
+    def test_parse_error(self):
+        for codec in ('auto', 'stdlib'):
+            with self.subTest(codec=codec), override_settings(
+                JSON_CODEC=codec
+            ), self.assertRaises(ParseError):
+                CodecJSONParser().parse(io.BytesIO(b'{"source_dev"'))
+
+    def test_other_encodings(self):
+        parsed = CodecJSONParser().parse(
+            io.BytesIO('{"source_dev": "dév1"}'.encode('latin-1')),
+            parser_context={'encoding': 'latin-1'},
+        )
+
+        self.assertEqual({'source_dev': 'dév1'}, parsed)
@@ -0,0 +1,117 @@
+import asyncio
+from unittest.mock import patch
+
+from asgiref.testing import ApplicationCommunicator
+
+from django.test import SimpleTestCase, override_settings
+
+from challange_jobandtalent.asgi import application
+from social_connected.controller_logic.changes import CHANGE_BROKER
+from social_connected.streams import pairs_from_query_string
+
+
+class TestChangeStream(SimpleTestCase):
+    def setUp(self) -> None:
+        CHANGE_BROKER.clear()
+        enabled = patch(
+            'social_connected.streams.stream_enabled', return_value=True
+        )
+        enabled.start()
+        self.addCleanup(enabled.stop)
+
+    def scope(self, query_string: bytes) -> dict:
+        return {
+            'type': 'http',
+            'method': 'GET',
+            'path': '/connected/stream',
+            'query_string': query_string,
+            'headers': [],
+        }
+
+    def test_pairs_from_query_string(self):
+        self.assertEqual(
+            ([('dev1', 'dev2'), ('dev3', 'dev4')], []),
+            pairs_from_query_string(b'pair=dev1,dev2&pair=dev3,dev4'),
+        )
+        self.assertEqual(
+            ([], ['Pair 0 must be given as source_dev,target_dev']),
+            pairs_from_query_string(b'pair=dev1'),
+        )
+        self.assertEqual(
+            ([], ['No pair subscribed']), pairs_from_query_string(b'')
+        )
+
+    @override_settings(STREAM_HEARTBEAT=0.05)
+    def test_stream_changes_of_subscribed_pairs(self):
+        async def stream():
+            communicator = ApplicationCommunicator(
+                application, self.scope(b'pair=dev1,dev2')
+            )
+            await communicator.send_input({'type': 'http.request'})
+            start = await communicator.receive_output(1)
+            subscribed = await communicator.receive_output(1)
+
+            CHANGE_BROKER.publish({'source_dev': 'dev2', 'target_dev': 'dev1'})
+            CHANGE_BROKER.publish(
+                {'source_dev': 'dev1', 'target_dev': 'dev2', 'connected': True}
+            )
+            change = await communicator.receive_output(1)
+            keepalive = await communicator.receive_output(1)
+
+            await communicator.send_input({'type': 'http.disconnect'})
+            await communicator.wait(1)
+            return start, subscribed, change, keepalive
+
+        start, subscribed, change, keepalive = asyncio.run(stream())
+
+        self.assertEqual(200, start['status'])
+        self.assertIn(
+            (b'content-type', b'text/event-stream'), start['headers']
+        )
+        self.assertEqual(b': subscribed\n\n', subscribed['body'])
+        self.assertEqual(
+            b'event: change\n'
+            b'data: {"source_dev": "dev1", "target_dev": "dev2", '
+            b'"connected": true}\n\n',
+            change['body'],
+        )
+        self.assertEqual(b': keepalive\n\n', keepalive['body'])
+        self.assertEqual({}, CHANGE_BROKER._subscriptions)
+
+    def test_stream_without_pair_fail(self):
+        async def stream():
+            communicator = ApplicationCommunicator(
+                application, self.scope(b'')
+            )
+            await communicator.send_input({'type': 'http.request'})
+            return (
+                await communicator.receive_output(1),
+                await communicator.receive_output(1),
+            )
+
+        start, body = asyncio.run(stream())
+
+        self.assertEqual(400, start['status'])
+        self.assertEqual(b'{"errors": ["No pair subscribed"]}', body['body'])
+
+    def test_stream_disabled_fail(self):
+        async def stream():
+            communicator = ApplicationCommunicator(
+                application, self.scope(b'pair=dev1,dev2')
+            )
+            await communicator.send_input({'type': 'http.request'})
+            return (
+                await communicator.receive_output(1),
+                await communicator.receive_output(1),
+            )
+
+        with patch(
+            'social_connected.streams.stream_enabled', return_value=False
+        ):
+            start, body = asyncio.run(stream())
+
+        self.assertEqual(404, start['status'])
+        self.assertEqual(
+            b'{"errors": ["The change stream is disabled"]}', body['body']
+        )
+        self.assertEqual({}, CHANGE_BROKER._subscriptions)
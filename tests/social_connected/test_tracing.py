@@ -0,0 +1,196 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from os.path import join
+from tempfile import TemporaryDirectory
+from unittest.mock import patch, MagicMock
+
+from django.test import SimpleTestCase, override_settings
+
+from rest_framework.test import APIClient, APITestCase
+
+from social_connected.controller_logic.identity_cache import IDENTITY_CACHE
+from social_connected.controller_logic.result_cache import RESULT_CACHE
+from social_connected.tracing import EXPORTER, propagate, span, trace
+
+
+class TracingTestMixin:
+    def setUp(self):
+        super().setUp()
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.output = join(directory.name, 'spans.jsonl')
+        overridden = override_settings(
+            TRACING_SAMPLE_RATE=1.0, TRACING_OUTPUT=self.output
+        )
+        overridden.enable()
+        self.addCleanup(overridden.disable)
+        self.addCleanup(EXPORTER.close)
+
+    def spans(self):
+        EXPORTER.close()
+        try:
+            with open(self.output) as output:
+                return [json.loads(line) for line in output]
+        except FileNotFoundError:
+            return []
+
+
+class TestTracing(TracingTestMixin, SimpleTestCase):
+    def test_spans_of_a_trace(self):
+        with trace('root', source_dev='dev1') as root:
+            with span('child') as child:
+                child.set_attribute('status', 200)
+            with self.assertRaises(ValueError):
+                with span('failed'):
+                    raise ValueError('failed')
+
+        child, failed, root = self.spans()
+        self.assertEqual(
+            ('root', None, {'source_dev': 'dev1'}, None),
+            (
+                root['name'],
+                root['parent_id'],
+                root['attributes'],
+                root['error'],
+            ),
+        )
+        self.assertEqual(
+            ('child', root['span_id'], root['trace_id'], {'status': 200}),
+            (
+                child['name'],
+                child['parent_id'],
+                child['trace_id'],
+                child['attributes'],
+            ),
+        )
+        self.assertEqual('ValueError', failed['error'])
+        self.assertGreaterEqual(root['duration_ms'], child['duration_ms'])
+
+    def test_spans_outside_of_traces_not_recorded(self):
+        with span('orphan') as orphan:
+            orphan.set_attribute('status', 200)
+
+        self.assertIsNone(orphan.trace_id)
+        self.assertEqual([], self.spans())
+
+    @override_settings(TRACING_SAMPLE_RATE=0)
+    def test_unsampled_traces_not_recorded(self):
+        with trace('root') as root, span('child'):
+            pass
+
+        self.assertIsNone(root.trace_id)
+        self.assertEqual([], self.spans())
+
+    def test_export_errors_logged(self):
+        with self.assertLogs('social_connected.tracing', 'ERROR'):
+            with trace('root', developer=object()):
+                pass
+            with override_settings(TRACING_OUTPUT=self.output + '/missing'):
+                with self.assertRaises(ValueError):
+                    with trace('root'):
+                        raise ValueError('of the traced operation')
+
+        self.assertEqual([], self.spans())
+
+    def test_spans_propagated_to_threads(self):
+        def fetch(login):
+            with span('fetch', developer=login):
+                pass
+
+        with trace('root') as root:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                list(executor.map(propagate(fetch), ['dev1', 'dev2']))
+
+        spans = self.spans()
+        fetches = [span for span in spans if span['name'] == 'fetch']
+        self.assertEqual(
+            ['dev1', 'dev2'],
+            sorted(fetch['attributes']['developer'] for fetch in fetches),
+        )
+        self.assertEqual(
+            {root.span_id}, {fetch['parent_id'] for fetch in fetches}
+        )
+        self.assertNotIn('MainThread', {fetch['thread'] for fetch in fetches})
+
+
+class TestRequestTracing(TracingTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        IDENTITY_CACHE.clear()
+        RESULT_CACHE.clear()
+
+    @override_settings(TWITTER_FAST_MODE=True)
+    def test_realtime_check_traced(self):
+        organizations = MagicMock(status_code=200, headers={})
+        organizations.json.return_value = [{'login': 'organization'}]
+        relationship = MagicMock(status_code=200, headers={})
+        relationship.json.return_value = {
+            'relationship': {
+                'source': {'id': 1, 'following': True, 'followed_by': True},
+                'target': {'id': 2},
+            }
+        }
+        with patch(
+            'social_connected.controller_logic.github_connected.requests'
+        ) as mock_github, patch(
+            'social_connected.controller_logic.twitter_connected.requests'
+        ) as mock_twitter:
+            mock_github.Session().get.return_value = organizations
+            mock_twitter.get.return_value = relationship
+
+            response = self.client.get('/connected/realtime/dev1/dev2')
+
+        self.assertEqual(200, response.status_code)
+        spans = {}
+        for recorded in self.spans():
+            spans.setdefault(recorded['name'], []).append(recorded)
+        self.assertEqual(
+            {
+                'request': 1,
+                'social_connected': 1,
+                'github': 1,
+                'github.organizations': 2,
+                'twitter': 1,
+                'twitter.friendship': 1,
+                'db.save': 1,
+            },
+            {name: len(recorded) for name, recorded in spans.items()},
+        )
+        (request,) = spans['request']
+        self.assertEqual(response['X-Trace-Id'], request['trace_id'])
+        self.assertEqual(
+            {
+                'method': 'GET',
+                'path': '/connected/realtime/dev1/dev2',
+                'view': 'real-time-connected',
+                'status': 200,
+            },
+            request['attributes'],
+        )
+        (check,) = spans['social_connected']
+        self.assertEqual(request['span_id'], check['parent_id'])
+        (github,) = spans['github']
+        self.assertEqual(check['span_id'], github['parent_id'])
+        self.assertEqual(
+            {
+                ('dev1', github['span_id'], 200),
+                ('dev2', github['span_id'], 200),
+            },
+            {
+                (
+                    fetch['attributes']['developer'],
+                    fetch['parent_id'],
+                    fetch['attributes']['status'],
+                )
+                for fetch in spans['github.organizations']
+            },
+        )
+        self.assertEqual(
+            {request['trace_id']},
+            {
+                recorded['trace_id']
+                for recorded_spans in spans.values()
+                for recorded in recorded_spans
+            },
+        )
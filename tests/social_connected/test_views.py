@@ -1,9 +1,13 @@
 from unittest.mock import patch
 
 from django.contrib.auth.models import User
+from django.test import override_settings
 
 from rest_framework.test import APIClient, APITestCase
 
+from social_connected.controller_logic.admission import Overloaded
+from social_connected.models import ConnectivityJob
+
 
 class TestViews(APITestCase):
     def setUp(self):
@@ -26,6 +30,35 @@ class TestViews(APITestCase):
             self.assertEqual(200, response.status_code)
             self.assertEqual(connected, response.data)
 
+    def test_social_connected_overloaded_fail(self):
+        with patch(
+            'social_connected.views.REALTIME_ADMISSION.admit'
+        ) as mock_admit:
+            mock_admit.side_effect = Overloaded('realtime', 'queue_full')
+
+            self.client.force_authenticate(user=self.user)
+            response = self.client.get('/connected/realtime/dev1/dev2')
+
+            self.assertEqual(503, response.status_code)
+            self.assertEqual('1', response['Retry-After'])
+            self.assertEqual(
+                {'errors': ['realtime is overloaded, retry later']},
+                response.data,
+            )
+
+    def test_social_connected_invalidate_success(self):
+        with patch(
+            'social_connected.views.RESULT_CACHE.invalidate'
+        ) as mock_invalidate, patch(
+            'social_connected.views.PROVIDER_CACHE.invalidate'
+        ) as mock_provider_invalidate:
+            self.client.force_authenticate(user=self.user)
+            response = self.client.delete('/connected/realtime/dev1/dev2')
+
+            self.assertEqual(204, response.status_code)
+            mock_invalidate.assert_called_once_with('dev1', 'dev2')
+            mock_provider_invalidate.assert_called_once_with('dev1', 'dev2')
+
     def test_social_registry_endpoint_success(self):
         with patch(
             'social_connected.views.Registry.retrieve_registries'
@@ -89,3 +122,151 @@ class TestViews(APITestCase):
 
             self.assertEqual(500, response.status_code)
             self.assertEqual(error, response.data)
+
+    def test_connectivity_jobs_submit_and_poll_success(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(
+            '/connected/jobs',
+            {'source_dev': 'dev1', 'target_dev': 'dev2'},
+            format='json',
+        )
+
+        self.assertEqual(202, response.status_code)
+        self.assertEqual('pending', response.data['status'])
+        job = ConnectivityJob.objects.get()
+
+        job.status = ConnectivityJob.DONE
+        job.result, job.result_status = {'connected': False}, 200
+        job.save()
+        response = self.client.get(f'/connected/jobs/{job.id}')
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('done', response.data['status'])
+        self.assertEqual({'connected': False}, response.data['result'])
+
+    def test_connectivity_jobs_submit_many_success(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(
+            '/connected/jobs',
+            [
+                {'source_dev': 'dev1', 'target_dev': 'dev2'},
+                {'source_dev': 'dev3', 'target_dev': 'dev4'},
+            ],
+            format='json',
+        )
+
+        self.assertEqual(202, response.status_code)
+        self.assertEqual(2, len(response.data))
+        self.assertEqual(2, ConnectivityJob.objects.count())
+
+    def test_connectivity_jobs_fail(self):
+        self.client.force_authenticate(user=self.user)
+        invalid = self.client.post(
+            '/connected/jobs', {'source_dev': 'dev1'}, format='json',
+        )
+        missing = self.client.get('/connected/jobs/1')
+
+        self.assertEqual(400, invalid.status_code)
+        self.assertEqual(
+            {'errors': ['Check 0 needs a source_dev and a target_dev']},
+            invalid.data,
+        )
+        self.assertEqual(404, missing.status_code)
+        self.assertFalse(ConnectivityJob.objects.exists())
+
+    @override_settings(JOBS_MAX_SUBMIT=1)
+    def test_connectivity_jobs_too_many_fail(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(
+            '/connected/jobs',
+            [
+                {'source_dev': 'dev1', 'target_dev': 'dev2'},
+                {'source_dev': 'dev3', 'target_dev': 'dev4'},
+            ],
+            format='json',
+        )
+
+        self.assertEqual(400, response.status_code)
+        self.assertEqual(
+            {'errors': ['At most 1 checks can be submitted at once']},
+            response.data,
+        )
+        self.assertFalse(ConnectivityJob.objects.exists())
+
+    def test_social_registry_stats_success(self):
+        with patch(
+            'social_connected.views.Registry.retrieve_stats'
+        ) as mock_stats:
+            mock_stats.return_value = {'total_checks': 0}, 200
+
+            self.client.force_authenticate(user=self.user)
+            response = self.client.get(
+                '/connected/register/dev1/dev2',
+                {'stats': 'true', 'connected': 'true'},
+            )
+
+            self.assertEqual(200, response.status_code)
+            self.assertEqual({'total_checks': 0}, response.data)
+
+    def test_social_registry_daily_success(self):
+        with patch(
+            'social_connected.views.Registry.retrieve_daily'
+        ) as mock_daily:
+            mock_daily.return_value = [], 200
+
+            self.client.force_authenticate(user=self.user)
+            response = self.client.get(
+                '/connected/register/dev1/dev2', {'granularity': 'daily'}
+            )
+
+            self.assertEqual(200, response.status_code)
+            self.assertEqual([], response.data)
+
+    def test_social_registry_invalid_filter_fail(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(
+            '/connected/register/dev1/dev2', {'until': 'tomorrow'}
+        )
+
+        self.assertEqual(400, response.status_code)
+        self.assertEqual(
+            {'errors': ['until must be an ISO 8601 date']}, response.data
+        )
+
+    def test_bulk_registry_success(self):
+        with patch(
+            'social_connected.views.BulkRegistry.retrieve_registries'
+        ) as mock_registries:
+            mock_registries.return_value = [], 200
+
+            self.client.force_authenticate(user=self.user)
+            response = self.client.post(
+                '/connected/register/bulk',
+                {
+                    'pairs': [{'source_dev': 'dev1', 'target_dev': 'dev2'}],
+                    'limit': 10,
+                },
+                format='json',
+            )
+
+            self.assertEqual(200, response.status_code)
+            self.assertEqual([], response.data)
+
+    def test_bulk_registry_fail(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(
+            '/connected/register/bulk',
+            {'pairs': [{'source_dev': 'dev1'}], 'limit': 0},
+            format='json',
+        )
+
+        self.assertEqual(400, response.status_code)
+        self.assertEqual(
+            {
+                'errors': [
+                    'Pair 0 needs a source_dev and a target_dev',
+                    'limit must be a positive integer',
+                ]
+            },
+            response.data,
+        )
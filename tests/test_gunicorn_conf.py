@@ -0,0 +1,26 @@
+import os
+import runpy
+from unittest.mock import patch
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+
+def load_config():
+    return runpy.run_path(os.path.join(settings.BASE_DIR, 'gunicorn.conf.py'))
+
+
+class TestGunicornConf(SimpleTestCase):
+    @override_settings(ADMISSION_MAX_IN_FLIGHT=4, ADMISSION_MAX_QUEUE=6)
+    def test_threads_exceed_admission_limits(self):
+        with patch.dict(os.environ):
+            os.environ.pop('GUNICORN_THREADS', None)
+            config = load_config()
+
+        self.assertEqual(11, config['threads'])
+
+    def test_threads_from_environment(self):
+        with patch.dict(os.environ, {'GUNICORN_THREADS': '3'}):
+            config = load_config()
+
+        self.assertEqual(3, config['threads'])